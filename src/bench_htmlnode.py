@@ -0,0 +1,103 @@
+"""Compare cached ParentNode rendering against a plain recursive render.
+
+    python3 src/bench_htmlnode.py [blocks]
+"""
+import sys
+
+from bench_node_codec import best_time, sample_markdown
+from htmlnode import render_cache
+from leafnode import LeafNode
+from markdown import markdown_to_html_node
+from parentnode import ParentNode
+
+
+def plain_html(node) -> str:
+    """Render without the cache, as ParentNode.to_html did before it."""
+    if not isinstance(node, ParentNode):
+        return node.to_html()
+    props_html = node.props_to_html()
+    children_html = "".join([plain_html(child) for child in node.children])
+    if props_html:
+        return f"<{node.tag} {props_html}>{children_html}</{node.tag}>"
+    return f"<{node.tag}>{children_html}</{node.tag}>"
+
+
+def site_chrome(links: int) -> ParentNode:
+    items = [
+        ParentNode("li", [LeafNode("a", f"Page {i}", {"href": f"/p/{i}/"})]) for i in range(links)
+    ]
+    return ParentNode("nav", [ParentNode("ul", items)])
+
+
+def report(name: str, cached: float, plain: float) -> None:
+    print(f"  {name:<24} cached {cached * 1000:>8.2f} ms   plain {plain * 1000:>8.2f} ms")
+
+
+def main() -> None:
+    blocks = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    markdown = sample_markdown(blocks)
+
+    print(f"One page ({blocks} blocks):")
+    render_cache.clear()
+    # Fresh trees each round: nothing hashed or cached yet.
+    fresh = [markdown_to_html_node(markdown) for _ in range(10)]
+    report(
+        "first render",
+        best_time(lambda trees: trees.pop().to_html(), fresh),
+        best_time(lambda trees: plain_html(trees.pop()), fresh),
+    )
+    page = markdown_to_html_node(markdown)
+    page.to_html()
+    page.to_html()
+    report("render again", best_time(lambda node: node.to_html(), page), best_time(plain_html, page))
+
+    def edit_and_render(node):
+        paragraph = node.children[-1].children[0]
+        paragraph.value = paragraph.value + "!"
+        return node.to_html()
+
+    report("edit one block, render", best_time(edit_and_render, page), best_time(plain_html, page))
+
+    # "Plain" compares fresh, unhashed trees, as __eq__ did before hashing;
+    # the unequal pair differs only in the last block.
+    def trees(hashed: bool) -> list[ParentNode]:
+        nodes = [markdown_to_html_node(markdown + f"\n\nLast {word}.") for word in "aab"]
+        for node in nodes if hashed else ():
+            node.structural_hash()
+        return nodes
+
+    hashed, fresh = trees(True), trees(False)
+    report(
+        "== equal",
+        best_time(lambda nodes: nodes[0] == nodes[1], hashed),
+        best_time(lambda nodes: nodes[0] == nodes[1], fresh),
+    )
+    report(
+        "== unequal",
+        best_time(lambda nodes: nodes[0] == nodes[2], hashed),
+        best_time(lambda nodes: nodes[0] == nodes[2], fresh),
+    )
+
+    pages = 50
+    print(f"{pages} pages sharing one navigation subtree:")
+    render_cache.clear()
+    nav = site_chrome(500)
+    site = [
+        ParentNode("body", [nav, markdown_to_html_node(f"# Page {page}\n\nSome text.")])
+        for page in range(pages)
+    ]
+
+    def render_site(nodes):
+        for node in nodes:
+            node.to_html()
+
+    def render_site_plain(nodes):
+        for node in nodes:
+            plain_html(node)
+
+    report("render all", best_time(render_site, site, repeat=1), best_time(render_site_plain, site))
+    print(f"  render cache hit rate {render_cache.info().hit_rate:.0%}")
+
+
+if __name__ == "__main__":
+    main()
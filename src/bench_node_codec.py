@@ -0,0 +1,80 @@
+"""Compare node_codec against pickle on a synthetic document.
+
+    python3 src/bench_node_codec.py [blocks]
+"""
+import pickle
+import sys
+import time
+
+from inline_markdown import text_to_textnodes
+from markdown import markdown_to_html_node
+from node_codec import (
+    decode_html_node,
+    decode_text_nodes,
+    encode_html_node,
+    encode_text_nodes,
+)
+
+
+def sample_markdown(blocks: int) -> str:
+    parts = []
+    for i in range(blocks):
+        if i % 5 == 0:
+            parts.append(f"## Section {i}")
+        elif i % 5 == 1:
+            parts.append(f"- item **{i}**\n- see [docs](/docs/{i % 50}/)\n- `code`")
+        else:
+            parts.append(f"Paragraph {i} with _emphasis_, **bold** and a [link](/p/{i % 100}).")
+    return "\n\n".join(parts)
+
+
+def best_time(func, arg, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(arg)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def report(name: str, value, encode, decode, loads, dumps) -> None:
+    encoded, pickled = encode(value), dumps(value)
+    print(f"{name}:")
+    print(f"  size     codec {len(encoded):>10} B   pickle {len(pickled):>10} B")
+    print(
+        f"  encode   codec {best_time(encode, value) * 1000:>8.2f} ms   "
+        f"pickle {best_time(dumps, value) * 1000:>8.2f} ms"
+    )
+    print(
+        f"  decode   codec {best_time(decode, encoded) * 1000:>8.2f} ms   "
+        f"pickle {best_time(loads, pickled) * 1000:>8.2f} ms"
+    )
+
+
+def main() -> None:
+    blocks = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    markdown = sample_markdown(blocks)
+
+    def dumps(value):
+        return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+    report(
+        f"HtmlNode tree ({blocks} blocks)",
+        markdown_to_html_node(markdown),
+        encode_html_node,
+        decode_html_node,
+        pickle.loads,
+        dumps,
+    )
+    report(
+        "TextNode list",
+        text_to_textnodes(" ".join(markdown.split("\n\n"))),
+        encode_text_nodes,
+        decode_text_nodes,
+        pickle.loads,
+        dumps,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,8 @@
+import mmap
+import os
+import re
 from enum import Enum
+from typing import Iterator
 
 
 class BlockType(Enum):
@@ -26,9 +30,11 @@ def block_to_block_type(block: str) -> BlockType:
             if i >= 1 and i <= 6 and len(block) > i and block[i] == " ":
                 return BlockType.HEADING
 
-    # Code: starts with ```\n, ends with ```
-    if block.startswith("```\n") and block.endswith("```"):
-        return BlockType.CODE
+    # Code: starts with ``` and an optional info string (e.g. a language)
+    # on the first line, ends with ```
+    if block.startswith("```") and block.endswith("```") and "`" not in lines[0][3:]:
+        if len(lines) > 1:
+            return BlockType.CODE
 
     # Quote: every line starts with >
     if lines and all(line.startswith(">") for line in lines):
@@ -53,8 +59,40 @@ def markdown_to_blocks(markdown: str) -> list[str]:
 
     Blocks are separated by blank lines (double newlines).
     Leading/trailing whitespace is stripped from each block.
-    Empty blocks are removed.
+    Empty blocks are removed. CRLF line endings are read as LF.
     """
-    blocks = markdown.split("\n\n")
+    blocks = markdown.replace("\r\n", "\n").split("\n\n")
     stripped = [block.strip() for block in blocks]
     return [block for block in stripped if block]
+
+
+# A blank line in raw bytes, with LF or CRLF endings.
+BLOCK_SEPARATOR = re.compile(rb"\r?\n\r?\n")
+
+
+def markdown_file_to_blocks(path: str, offset: int = 0) -> Iterator[str]:
+    """Yield the blocks of a Markdown file without reading it into memory.
+
+    The file is memory-mapped and block boundaries are found on the raw
+    bytes; only the block being yielded is decoded. Produces the same blocks
+    as markdown_to_blocks on the file's decoded text (UTF-8 never uses the
+    newline byte inside a multi-byte sequence). Bytes before offset (e.g.
+    front matter) are skipped.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            start = offset
+            for separator in BLOCK_SEPARATOR.finditer(data, offset):
+                block = _decode_block(data[start : separator.start()])
+                if block:
+                    yield block
+                start = separator.end()
+            block = _decode_block(data[start:])
+            if block:
+                yield block
+
+
+def _decode_block(raw: bytes) -> str:
+    return raw.decode("utf-8").replace("\r\n", "\n").strip()
@@ -0,0 +1,140 @@
+"""Build state that outlives a single run, kept in one SQLite database.
+
+Holds the manifest of the last build's outputs, keyed by content digest, and
+small keyed cache entries. Everything is a point lookup on a primary key and
+writes are batched into transactions, so the cost of a build tracks what
+changed rather than the size of the site.
+
+The database runs in WAL mode: readers never block the writer, and writers
+from other threads or processes wait up to `timeout` seconds for their turn.
+Connections must not be shared between processes; each worker opens its own
+BuildState on the same path.
+"""
+import os
+import sqlite3
+from contextlib import contextmanager
+from typing import NamedTuple
+
+SCHEMA = """
+-- Older builds cached output digests by path and stat here.
+DROP TABLE IF EXISTS file_hashes;
+CREATE TABLE IF NOT EXISTS outputs (
+    path TEXT PRIMARY KEY,
+    digest TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS cache_entries (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value BLOB NOT NULL,
+    PRIMARY KEY (namespace, key)
+) WITHOUT ROWID;
+"""
+
+
+class OutputDelta(NamedTuple):
+    added: list[str]
+    changed: list[str]
+    deleted: list[str]
+
+
+def diff_manifests(previous: dict[str, str], current: dict[str, str]) -> OutputDelta:
+    """Compare two {path: digest} manifests."""
+    added, changed = [], []
+    for path, digest in current.items():
+        old = previous.get(path)
+        if old is None:
+            added.append(path)
+        elif old != digest:
+            changed.append(path)
+    deleted = [path for path in previous if path not in current]
+    return OutputDelta(sorted(added), sorted(changed), sorted(deleted))
+
+
+def connect(db_path: str, timeout: float = 30.0, **kwargs) -> sqlite3.Connection:
+    """Open db_path in WAL mode, creating its directory if needed."""
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    db = sqlite3.connect(db_path, timeout=timeout, **kwargs)
+    db.execute("PRAGMA journal_mode=WAL")
+    # WAL keeps the database consistent across crashes at NORMAL; only the
+    # last transactions before a power loss can be lost, which a rebuild redoes.
+    db.execute("PRAGMA synchronous=NORMAL")
+    db.execute(f"PRAGMA busy_timeout={int(timeout * 1000)}")
+    return db
+
+
+class BuildState:
+    def __init__(self, db_path: str, timeout: float = 30.0):
+        # Autocommit mode: every write goes through transaction(), which takes
+        # the write lock up front instead of upgrading a read lock mid-way.
+        self.db = connect(db_path, timeout, isolation_level=None)
+        with self.transaction():
+            for statement in SCHEMA.split(";"):
+                if statement.strip():
+                    self.db.execute(statement)
+
+    def close(self) -> None:
+        self.db.close()
+
+    def __enter__(self) -> "BuildState":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @contextmanager
+    def transaction(self):
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            yield self.db
+        except BaseException:
+            self.db.execute("ROLLBACK")
+            raise
+        self.db.execute("COMMIT")
+
+    def output_digest(self, path: str) -> str | None:
+        row = self.db.execute("SELECT digest FROM outputs WHERE path = ?", (path,)).fetchone()
+        return row[0] if row else None
+
+    def outputs(self) -> dict[str, str]:
+        return dict(self.db.execute("SELECT path, digest FROM outputs"))
+
+    def update_outputs(self, manifest: dict[str, str]) -> OutputDelta:
+        """Replace the stored output manifest; return how it differs from the last one."""
+        with self.transaction():
+            delta = diff_manifests(self.outputs(), manifest)
+            self.db.executemany(
+                "INSERT OR REPLACE INTO outputs VALUES (?, ?)",
+                [(path, manifest[path]) for path in delta.added + delta.changed],
+            )
+            self.db.executemany(
+                "DELETE FROM outputs WHERE path = ?", [(path,) for path in delta.deleted]
+            )
+        return delta
+
+    def cache_get(self, namespace: str, key: str) -> bytes | None:
+        row = self.db.execute(
+            "SELECT value FROM cache_entries WHERE namespace = ? AND key = ?",
+            (namespace, key),
+        ).fetchone()
+        return row[0] if row else None
+
+    def cache_items(self, namespace: str) -> dict[str, bytes]:
+        return dict(
+            self.db.execute(
+                "SELECT key, value FROM cache_entries WHERE namespace = ?", (namespace,)
+            )
+        )
+
+    def cache_put(self, namespace: str, key: str, value: bytes) -> None:
+        self.cache_put_many(namespace, {key: value})
+
+    def cache_put_many(self, namespace: str, items: dict[str, bytes]) -> None:
+        with self.transaction():
+            self.db.executemany(
+                "INSERT OR REPLACE INTO cache_entries VALUES (?, ?, ?)",
+                [(namespace, key, value) for key, value in items.items()],
+            )
+
+    def cache_clear(self, namespace: str) -> None:
+        with self.transaction():
+            self.db.execute("DELETE FROM cache_entries WHERE namespace = ?", (namespace,))
@@ -0,0 +1,139 @@
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, NamedTuple
+
+
+# Default for resize() bounds that are left as they are.
+_UNCHANGED = object()
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+    maxbytes: int | None = None
+    currbytes: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+def estimate_size(key: Hashable, value: Any) -> int:
+    """Shallow size of an entry in bytes; exact for str and bytes values."""
+    return sys.getsizeof(key) + sys.getsizeof(value)
+
+
+class LRUCache:
+    """A bounded mapping that evicts the least recently used entry when full.
+
+    Bounded by entry count, and optionally also by maxbytes, the sum of
+    sizeof(key, value) over all entries. A single entry larger than maxbytes
+    is not stored at all.
+
+    Safe to share between threads: every operation holds an internal lock,
+    including under free-threaded (no-GIL) builds.
+    """
+
+    def __init__(self, maxsize: int = 1024, maxbytes: int = None, sizeof=estimate_size):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.sizeof = sizeof
+        self._entries: OrderedDict = OrderedDict()
+        self._sizes: dict = {}
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            try:
+                value = self._entries[key]
+            except KeyError:
+                self._misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        size = self.sizeof(key, value) if self.maxbytes is not None else 0
+        with self._lock:
+            if self.maxbytes is not None:
+                if size > self.maxbytes:
+                    self._discard(key)
+                    return
+                self._bytes += size - self._sizes.get(key, 0)
+                self._sizes[key] = size
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            self._evict()
+
+    def resize(self, maxsize: int = None, maxbytes: int | None = _UNCHANGED) -> None:
+        """Change the bounds, evicting entries that no longer fit.
+
+        Bounds that are not passed stay as they are; maxbytes=None removes
+        the byte bound.
+        """
+        if maxsize is not None and maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        with self._lock:
+            if maxsize is not None:
+                self.maxsize = maxsize
+            if maxbytes is None:
+                self.maxbytes = None
+                self._sizes = {}
+                self._bytes = 0
+            elif maxbytes is not _UNCHANGED:
+                if self.maxbytes is None:
+                    self._sizes = {
+                        key: self.sizeof(key, value) for key, value in self._entries.items()
+                    }
+                    self._bytes = sum(self._sizes.values())
+                self.maxbytes = maxbytes
+            self._evict()
+
+    def _evict(self) -> None:
+        # _evict and _discard are called with the lock held.
+        while len(self._entries) > self.maxsize or (
+            self.maxbytes is not None and self._bytes > self.maxbytes
+        ):
+            key, _ = self._entries.popitem(last=False)
+            self._bytes -= self._sizes.pop(key, 0)
+
+    def _discard(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+        self._bytes -= self._sizes.pop(key, 0)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._bytes = 0
+            self._hits = 0
+            self._misses = 0
+
+    def info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(
+                self._hits,
+                self._misses,
+                self.maxsize,
+                len(self._entries),
+                self.maxbytes,
+                self._bytes,
+            )
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
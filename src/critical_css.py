@@ -0,0 +1,200 @@
+"""Inline the part of the stylesheet a page actually uses.
+
+CriticalCss is a transform plugin: while the fused pass walks a page it
+collects the tags, classes and ids in the tree, and at the end of the page
+picks the stylesheet rules whose selectors could match them. The subset goes
+into the page head as a <style> block and the full stylesheet is loaded
+without blocking rendering. Matching results are cached per unique set of
+features, which many pages share.
+
+Matching errs on the side of inclusion: pseudo-classes and attribute
+selectors are ignored, and a combinator selector is kept when every one of
+its compound parts could match somewhere on the page.
+"""
+import hashlib
+import re
+from typing import NamedTuple
+
+from cache import LRUCache
+from htmlnode import HtmlNode
+from minify import minify_css
+from transforms import Plugin
+
+COMMENT_PATTERN = re.compile(r"/\*.*?\*/", re.DOTALL)
+PSEUDO_PATTERN = re.compile(r"::?[\w-]+(?:\([^)]*\))?")
+ATTRIBUTE_PATTERN = re.compile(r"\[[^\]]*\]")
+COMBINATOR_PATTERN = re.compile(r"\s*[\s>+~]\s*")
+COMPOUND_PATTERN = re.compile(r"([#.]?)([\w-]+|\*)")
+TEMPLATE_TAG_PATTERN = re.compile(r"<([a-zA-Z][\w-]*)")
+TEMPLATE_ATTR_PATTERN = re.compile(r'\b(class|id)="([^"]*)"')
+
+# At-rules whose blocks hold more rules, filtered like the top level.
+NESTED_AT_RULES = ("@media", "@supports")
+# At-rules kept whole: fonts may be needed by any inlined rule.
+KEPT_AT_RULES = ("@font-face",)
+HEADING_TAGS = {f"h{level}" for level in range(1, 7)}
+# What {{ TOC }} adds outside the tree on pages with headings.
+TOC_FEATURES = frozenset({"nav", "ul", "li", "a", ".toc"})
+
+critical_cache = LRUCache(maxsize=1024)
+
+
+class Rule(NamedTuple):
+    prelude: str
+    # Declarations for style rules, nested rules for @media/@supports.
+    body: "str | list[Rule]"
+
+
+def parse_css(css: str) -> list[Rule]:
+    """Split a stylesheet into rules; statement at-rules (@import, @charset) are dropped."""
+    css = COMMENT_PATTERN.sub("", css)
+    rules, _ = _parse_rules(css, 0)
+    return rules
+
+
+def _parse_rules(css: str, pos: int) -> tuple[list[Rule], int]:
+    rules = []
+    while True:
+        brace = css.find("{", pos)
+        close = css.find("}", pos)
+        if close != -1 and (brace == -1 or close < brace):
+            return rules, close + 1
+        if brace == -1:
+            return rules, len(css)
+
+        prelude = css[pos:brace].strip()
+        # Statement at-rules end with ";" before the next block.
+        while prelude.startswith("@") and ";" in prelude:
+            prelude = prelude[prelude.index(";") + 1 :].strip()
+        if prelude.startswith(NESTED_AT_RULES):
+            nested, pos = _parse_rules(css, brace + 1)
+            rules.append(Rule(prelude, nested))
+            continue
+        end = _matching_brace(css, brace)
+        rules.append(Rule(prelude, css[brace + 1 : end].strip()))
+        pos = end + 1
+
+
+def _matching_brace(css: str, brace: int) -> int:
+    depth = 0
+    for i in range(brace, len(css)):
+        if css[i] == "{":
+            depth += 1
+        elif css[i] == "}":
+            depth -= 1
+            if depth == 0:
+                return i
+    return len(css)
+
+
+def selector_may_match(selector: str, features: frozenset[str]) -> bool:
+    """Whether selector could match a page using features (tags, ".class", "#id")."""
+    selector = ATTRIBUTE_PATTERN.sub("", PSEUDO_PATTERN.sub("", selector)).strip()
+    for compound in COMBINATOR_PATTERN.split(selector):
+        for prefix, name in COMPOUND_PATTERN.findall(compound):
+            if not prefix:
+                # Tag names are case-insensitive, classes and ids are not.
+                name = name.lower()
+            if name != "*" and prefix + name not in features:
+                return False
+    return True
+
+
+def _selector_features(rules: list[Rule]) -> set[str]:
+    """Every tag, ".class" and "#id" any selector in rules mentions."""
+    features = set()
+    for rule in rules:
+        if isinstance(rule.body, list):
+            features |= _selector_features(rule.body)
+        elif not rule.prelude.startswith("@"):
+            selector = ATTRIBUTE_PATTERN.sub("", PSEUDO_PATTERN.sub("", rule.prelude))
+            for prefix, name in COMPOUND_PATTERN.findall(selector):
+                features.add(prefix + (name if prefix else name.lower()))
+    return features
+
+
+def _select(rules: list[Rule], features: frozenset[str]) -> list[str]:
+    out = []
+    for rule in rules:
+        if isinstance(rule.body, list):
+            nested = _select(rule.body, features)
+            if nested:
+                out.append(f"{rule.prelude}{{{''.join(nested)}}}")
+        elif rule.prelude.startswith("@"):
+            if rule.prelude.startswith(KEPT_AT_RULES):
+                out.append(f"{rule.prelude}{{{rule.body}}}")
+        else:
+            selectors = [
+                selector.strip()
+                for selector in rule.prelude.split(",")
+                if selector_may_match(selector, features)
+            ]
+            if selectors:
+                out.append(f"{','.join(selectors)}{{{rule.body}}}")
+    return out
+
+
+def template_features(template: str) -> set[str]:
+    features = {tag.lower() for tag in TEMPLATE_TAG_PATTERN.findall(template)}
+    for attr, value in TEMPLATE_ATTR_PATTERN.findall(template):
+        prefix = "." if attr == "class" else "#"
+        features.update(prefix + name for name in value.split())
+    return features
+
+
+class CriticalCss(Plugin):
+    def __init__(self, css: str, href: str, template: str = ""):
+        self.rules = parse_css(css)
+        self.href = href
+        self._stylesheet_key = hashlib.blake2b(css.encode("utf-8"), digest_size=16).digest()
+        # Features no selector mentions cannot change the result; leaving
+        # them out of cache keys lets pages with unique ids share entries.
+        self._relevant = _selector_features(self.rules)
+        self._base = template_features(template)
+        self._features: set[str] = set()
+        self.css = ""
+
+    def begin_page(self, url: str) -> None:
+        self._features = set(self._base)
+
+    def visit(self, node: HtmlNode) -> None:
+        features = self._features
+        if node.tag:
+            features.add(node.tag)
+        if node.props:
+            for name in node.props.get("class", "").split():
+                features.add("." + name)
+            if "id" in node.props:
+                features.add("#" + node.props["id"])
+
+    def end_page(self, url: str) -> None:
+        features = self._features
+        if not features.isdisjoint(HEADING_TAGS):
+            features |= TOC_FEATURES
+        key = (self._stylesheet_key, frozenset(features & self._relevant))
+        css = critical_cache.get(key)
+        if css is None:
+            css = minify_css("".join(_select(self.rules, key[1])))
+            critical_cache.put(key, css)
+        self.css = css
+
+    def head_html(self, url: str) -> str:
+        """The <style> block for the page the pipeline last ran over."""
+        return f"<style>{self.css}</style>" if self.css else ""
+
+    def defer_stylesheet(self, template: str) -> str:
+        """Make the template's blocking <link> to the stylesheet load asynchronously.
+
+        The link keeps its place but is fetched as media="print" and switched
+        to all media once loaded; a <noscript> copy covers readers without JS.
+        """
+        pattern = re.compile(r'<link\b[^>]*\bhref="%s"[^>]*>' % re.escape(self.href))
+        match = pattern.search(template)
+        if match is None or 'rel="stylesheet"' not in match.group():
+            return template
+        deferred = (
+            f'<link href="{self.href}" rel="stylesheet" media="print" '
+            "onload=\"this.media='all'\" />"
+            f"<noscript>{match.group()}</noscript>"
+        )
+        return template[: match.start()] + deferred + template[match.end() :]
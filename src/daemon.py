@@ -0,0 +1,141 @@
+"""Long-lived build server and its thin client.
+
+    python3 src/daemon.py serve            # keep modules and caches warm
+    python3 src/daemon.py build -- --minify
+    python3 src/daemon.py stop
+
+The server accepts one JSON request per connection on a Unix domain socket
+and answers with one JSON result line. Builds run one at a time in the
+server process, so the template, image-size and render caches persist
+between them.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import socket
+import socketserver
+import sys
+import time
+import traceback
+
+from main import PROJECT_ROOT, build, parse_args
+
+DEFAULT_SOCKET = os.path.join(PROJECT_ROOT, ".fitz-daemon.sock")
+
+
+class BuildRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        line = self.rfile.readline()
+        try:
+            request = json.loads(line)
+        except ValueError:
+            self._reply({"ok": False, "error": "Malformed request"})
+            return
+
+        if request.get("command") == "stop":
+            self._reply({"ok": True})
+            self.server.stopping = True
+            return
+
+        self._reply(
+            run_build(request.get("argv", []), self.server.project_root, request.get("cwd"))
+        )
+
+    def _reply(self, response: dict) -> None:
+        self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+
+
+class BuildServer(socketserver.UnixStreamServer):
+    def __init__(self, socket_path: str, project_root: str):
+        self.project_root = project_root
+        self.stopping = False
+        super().__init__(socket_path, BuildRequestHandler)
+
+
+def resolve_paths(args: argparse.Namespace, cwd: str) -> argparse.Namespace:
+    """Make the path arguments of a client's build absolute against its cwd."""
+    for name in ("sites", "deploy_archive"):
+        value = getattr(args, name)
+        if value is not None:
+            setattr(args, name, os.path.join(cwd, value))
+    if args.merge is not None:
+        args.merge = [os.path.join(cwd, path) for path in args.merge]
+    return args
+
+
+def run_build(argv: list[str], project_root: str, cwd: str = None) -> dict:
+    """Run a build in-process, capturing its log into the structured result.
+
+    Relative paths in argv are taken relative to cwd (the client's working
+    directory), not the server's.
+    """
+    log = io.StringIO()
+    start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(log):
+            args = parse_args(argv)
+            if cwd is not None:
+                resolve_paths(args, cwd)
+            result = build(args, project_root)
+        response = {"ok": True, "result": result}
+    except SystemExit as e:
+        response = {"ok": False, "error": f"Invalid arguments (exit status {e.code})"}
+    except Exception as e:
+        response = {"ok": False, "error": str(e), "traceback": traceback.format_exc()}
+    response["seconds"] = time.perf_counter() - start
+    response["log"] = log.getvalue()
+    return response
+
+
+def serve(socket_path: str = DEFAULT_SOCKET, project_root: str = PROJECT_ROOT) -> None:
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+    with BuildServer(socket_path, project_root) as server:
+        print(f"Build daemon listening on {socket_path}")
+        try:
+            while not server.stopping:
+                server.handle_request()
+        finally:
+            os.remove(socket_path)
+
+
+def send_request(request: dict, socket_path: str = DEFAULT_SOCKET) -> dict:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        with sock.makefile("rb") as f:
+            return json.loads(f.readline())
+
+
+def request_build(argv: list[str] = None, socket_path: str = DEFAULT_SOCKET) -> dict:
+    """Ask a running daemon to build with the given main.py arguments."""
+    return send_request({"command": "build", "argv": argv or [], "cwd": os.getcwd()}, socket_path)
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Persistent build daemon.")
+    parser.add_argument("command", choices=["serve", "build", "stop"])
+    parser.add_argument("--socket", default=DEFAULT_SOCKET)
+    parser.add_argument("build_args", nargs=argparse.REMAINDER)
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        serve(args.socket)
+        return 0
+    if args.command == "stop":
+        send_request({"command": "stop"}, args.socket)
+        return 0
+
+    build_args = args.build_args
+    if build_args[:1] == ["--"]:
+        build_args = build_args[1:]
+    response = request_build(build_args, args.socket)
+    sys.stdout.write(response.pop("log", ""))
+    print(json.dumps(response, indent=2))
+    return 0 if response["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
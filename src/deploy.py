@@ -0,0 +1,156 @@
+"""Deploy only the outputs that changed since the previous build.
+
+Every build compares its output manifest with the one stored in the build
+state and writes the difference to .fitz/delta.json. From that delta:
+
+    python3 src/main.py --deploy-archive changes.tar.gz   # or .tar / .zip
+    python3 src/deploy.py apply changes.tar.gz /srv/www   # unpack into a target
+    python3 src/deploy.py sync /srv/www                   # copy from public/
+
+An archive holds the added and changed files plus DELTA_FILE, which lists
+the deletions, so applying it to a copy of the previous build reproduces the
+new one.
+"""
+import argparse
+import io
+import json
+import os
+import shutil
+import tarfile
+import zipfile
+
+from build_state import OutputDelta
+from paths import PROJECT_ROOT, STATE_DIR
+
+DELTA_FILE = ".deploy-delta.json"
+# Name of the last build's delta inside the build state directory.
+DELTA_JSON = "delta.json"
+
+
+def write_delta(delta: OutputDelta, path: str) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(delta._asdict(), f, indent=2)
+
+
+def read_delta(path: str) -> OutputDelta:
+    with open(path, encoding="utf-8") as f:
+        return OutputDelta(**json.load(f))
+
+
+def _target_path(target_dir: str, rel_path: str) -> str:
+    """Resolve a '/'-separated output path inside target_dir, refusing escapes."""
+    parts = rel_path.split("/")
+    if rel_path.startswith("/") or any(part in ("", ".", "..") for part in parts):
+        raise ValueError(f"Refusing unsafe path in delta: {rel_path!r}")
+    return os.path.join(target_dir, *parts)
+
+
+def site_archive_path(archive_path: str, site_name: str) -> str:
+    """archive_path with "-site_name" inserted before its extension."""
+    for ext in (".tar.gz", ".tgz", ".tar", ".zip"):
+        if archive_path.endswith(ext):
+            return f"{archive_path[: -len(ext)]}-{site_name}{ext}"
+    root, ext = os.path.splitext(archive_path)
+    return f"{root}-{site_name}{ext}"
+
+
+def write_archive(public_dir: str, delta: OutputDelta, archive_path: str) -> int:
+    """Write the added and changed files of public_dir to an archive.
+
+    The format follows the extension: .zip, .tar.gz/.tgz or .tar. Files are
+    streamed from disk in chunks (tars are written in stream mode, so the
+    output may be a pipe), and memory use does not depend on their size.
+    Returns the number of files written.
+    """
+    paths = delta.added + delta.changed
+    manifest = json.dumps(delta._asdict()).encode("utf-8")
+
+    if archive_path.endswith(".zip"):
+        with zipfile.ZipFile(archive_path, "w", zipfile.ZIP_DEFLATED) as archive:
+            for rel_path in paths:
+                archive.write(_target_path(public_dir, rel_path), rel_path)
+            archive.writestr(DELTA_FILE, manifest)
+        return len(paths)
+
+    if archive_path.endswith((".tar.gz", ".tgz")):
+        archive = tarfile.open(archive_path, "w|gz")
+    elif archive_path.endswith(".tar"):
+        archive = tarfile.open(archive_path, "w|")
+    else:
+        raise ValueError(f"Unknown archive format for {archive_path}, use .zip, .tar or .tar.gz")
+    with archive:
+        for rel_path in paths:
+            archive.add(_target_path(public_dir, rel_path), rel_path, recursive=False)
+        info = tarfile.TarInfo(DELTA_FILE)
+        info.size = len(manifest)
+        archive.addfile(info, io.BytesIO(manifest))
+    return len(paths)
+
+
+def _delete(target_dir: str, deleted: list[str]) -> None:
+    for rel_path in deleted:
+        path = _target_path(target_dir, rel_path)
+        if os.path.exists(path):
+            os.remove(path)
+        # Drop directories the deletion left empty, up to target_dir.
+        parent = os.path.dirname(path)
+        while parent != os.path.normpath(target_dir) and not os.listdir(parent):
+            os.rmdir(parent)
+            parent = os.path.dirname(parent)
+
+
+def sync_directory(public_dir: str, delta: OutputDelta, target_dir: str) -> None:
+    """Bring target_dir, a copy of the previous build, up to date with public_dir."""
+    for rel_path in delta.added + delta.changed:
+        dst_path = _target_path(target_dir, rel_path)
+        os.makedirs(os.path.dirname(dst_path), exist_ok=True)
+        shutil.copyfile(_target_path(public_dir, rel_path), dst_path)
+    _delete(target_dir, delta.deleted)
+
+
+def apply_archive(archive_path: str, target_dir: str) -> OutputDelta:
+    """Unpack a delta archive into target_dir and remove the files it deletes."""
+    if archive_path.endswith(".zip"):
+        with zipfile.ZipFile(archive_path) as archive:
+            delta = OutputDelta(**json.loads(archive.read(DELTA_FILE)))
+            for rel_path in delta.added + delta.changed:
+                dst_path = _target_path(target_dir, rel_path)
+                os.makedirs(os.path.dirname(dst_path), exist_ok=True)
+                with archive.open(rel_path) as src, open(dst_path, "wb") as dst:
+                    shutil.copyfileobj(src, dst)
+    else:
+        with tarfile.open(archive_path, "r:*") as archive:
+            delta = OutputDelta(**json.load(archive.extractfile(DELTA_FILE)))
+            for rel_path in delta.added + delta.changed:
+                dst_path = _target_path(target_dir, rel_path)
+                os.makedirs(os.path.dirname(dst_path), exist_ok=True)
+                with archive.extractfile(rel_path) as src, open(dst_path, "wb") as dst:
+                    shutil.copyfileobj(src, dst)
+    _delete(target_dir, delta.deleted)
+    return delta
+
+
+def main(argv: list[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Apply the changes of the last build.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    apply_parser = commands.add_parser("apply", help="unpack a delta archive into a directory")
+    apply_parser.add_argument("archive")
+    apply_parser.add_argument("target")
+    sync_parser = commands.add_parser("sync", help="copy the last build's changes from public/")
+    sync_parser.add_argument("target")
+    args = parser.parse_args(argv)
+
+    if args.command == "apply":
+        delta = apply_archive(args.archive, args.target)
+    else:
+        delta = read_delta(os.path.join(PROJECT_ROOT, STATE_DIR, DELTA_JSON))
+        sync_directory(os.path.join(PROJECT_ROOT, "public"), delta, args.target)
+    print(
+        f"Deployed {len(delta.added)} added, {len(delta.changed)} changed, "
+        f"{len(delta.deleted)} deleted file(s) to {args.target}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Front matter: a metadata header at the very top of a markdown source.
+
+    ---
+    title: The Great Gatsby
+    date: 1925-04-10
+    tags: [novel, jazz age]
+    ---
+
+Supports the small YAML subset pages need: "key: value" pairs with optional
+quotes, and lists written inline ("[a, b]") or as "- item" lines. A leading
+"---" with no closing delimiter is not front matter; the document is all body.
+"""
+DELIMITER = "---"
+
+
+def _parse_scalar(value: str) -> str:
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+        return value[1:-1]
+    return value
+
+
+def parse_front_matter_lines(lines: list[str]) -> dict:
+    metadata = {}
+    key = None
+    for line in lines:
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+        if stripped.startswith("- ") and key is not None:
+            if not isinstance(metadata[key], list):
+                metadata[key] = []
+            metadata[key].append(_parse_scalar(stripped[2:]))
+            continue
+
+        key, sep, value = line.partition(":")
+        if not sep:
+            raise ValueError(f"Invalid front matter line: {line}")
+        key = key.strip()
+        value = value.strip()
+        if value.startswith("[") and value.endswith("]"):
+            items = value[1:-1].split(",")
+            metadata[key] = [_parse_scalar(item) for item in items if item.strip()]
+        else:
+            metadata[key] = _parse_scalar(value)
+    return metadata
+
+
+def split_front_matter(markdown: str) -> tuple[dict, str]:
+    """Split a document into (metadata, body). Documents without front matter get {}."""
+    if not markdown.startswith((DELIMITER + "\n", DELIMITER + "\r\n")):
+        return {}, markdown
+    lines = markdown.split("\n")
+    for i in range(1, len(lines)):
+        if lines[i].rstrip("\r") == DELIMITER:
+            header = [line.rstrip("\r") for line in lines[1:i]]
+            return parse_front_matter_lines(header), "\n".join(lines[i + 1 :])
+    return {}, markdown
+
+
+def read_front_matter(path: str) -> tuple[dict, int]:
+    """Read only the front matter of a file.
+
+    Returns (metadata, body_offset), where body_offset is the byte offset at
+    which the markdown body starts.
+    """
+    with open(path, "rb") as f:
+        first = f.readline()
+        if first.rstrip(b"\r\n") != DELIMITER.encode():
+            return {}, 0
+        lines = []
+        for raw in f:
+            line = raw.decode("utf-8").rstrip("\r\n")
+            if line == DELIMITER:
+                return parse_front_matter_lines(lines), f.tell()
+            lines.append(line)
+    return {}, 0
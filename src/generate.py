@@ -0,0 +1,288 @@
+import os
+import shutil
+import sys
+import tempfile
+import time
+from collections import Counter
+from urllib.parse import urlsplit, urlunsplit
+
+from block_markdown import markdown_file_to_blocks
+from cache import LRUCache
+from frontmatter import read_front_matter, split_front_matter
+from htmlnode import HtmlNode
+from image_dimensions import ImageAttributes
+from markdown import (
+    markdown_file_to_html_blocks,
+    markdown_file_to_html_node,
+    markdown_to_html_node,
+)
+from parentnode import ParentNode
+from search_index import count_terms
+from shard import in_shard
+from toc import TableOfContents
+from transforms import Pipeline
+
+
+def extract_title(markdown: str) -> str:
+    """Return the text of the first h1 heading in a markdown document."""
+    for line in markdown.split("\n"):
+        if line.startswith("# "):
+            return line[2:].strip()
+    raise ValueError("No h1 heading found in markdown")
+
+
+def page_url(rel_path: str) -> str:
+    """Map a content-relative markdown path to the URL of its rendered page."""
+    stem, _ = os.path.splitext(rel_path.replace(os.sep, "/"))
+    if stem == "index":
+        return "/"
+    if stem.endswith("/index"):
+        return "/" + stem[: -len("index")]
+    return f"/{stem}.html"
+
+
+def rewrite_source_link(href: str, url: str = "") -> str:
+    """Point links written against markdown sources at the rendered pages.
+
+    "/blog/post.md#intro" becomes "/blog/post.html#intro"; relative links keep
+    being relative ("../about.md" -> "../about.html", "guide/index.md" ->
+    "guide/"). Other hrefs are returned unchanged.
+    """
+    parts = urlsplit(href)
+    if parts.scheme or parts.netloc or not parts.path.endswith(".md"):
+        return href
+    if parts.path.startswith("/"):
+        path = page_url(parts.path[1:])
+    else:
+        head, _, name = parts.path.rpartition("/")
+        prefix = head + "/" if head else ""
+        path = prefix + ("" if name == "index.md" else name[: -len(".md")] + ".html")
+        path = path or "./"
+    return urlunsplit(("", "", path, parts.query, parts.fragment))
+
+
+# Sources at least this large are memory-mapped and decoded block by block
+# instead of being read into one string, and their pages are written out
+# block by block (write_large_page) instead of being built as one tree.
+LARGE_SOURCE_BYTES = 8 * 1024 * 1024
+
+# path -> (mtime_ns, template text)
+template_cache = LRUCache(
+    maxsize=64, sizeof=lambda path, entry: sys.getsizeof(path) + sys.getsizeof(entry[1])
+)
+
+
+def load_template(template_path: str) -> str:
+    """Read a page template, reusing the cached text while its mtime is unchanged."""
+    mtime = os.stat(template_path).st_mtime_ns
+    cached = template_cache.get(template_path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    with open(template_path, encoding="utf-8") as f:
+        template = f.read()
+    template_cache.put(template_path, (mtime, template))
+    return template
+
+
+def parse_source(
+    src_path: str, workers: int = 1, toc: TableOfContents = None, pool: str = "process"
+) -> tuple[str, HtmlNode]:
+    """Return the title and rendered tree of a markdown source file.
+
+    A "title" in the front matter takes precedence over the first h1.
+    workers, toc and pool are passed through to the renderer.
+    """
+    if os.path.getsize(src_path) < LARGE_SOURCE_BYTES:
+        with open(src_path, encoding="utf-8") as f:
+            metadata, markdown = split_front_matter(f.read())
+        title = metadata.get("title") or extract_title(markdown)
+        return title, markdown_to_html_node(markdown, workers, toc, pool)
+
+    title, offset = _large_source_title(src_path)
+    return title, markdown_file_to_html_node(src_path, workers, offset, toc, pool)
+
+
+def _large_source_title(src_path: str) -> tuple[str, int]:
+    """Return the title of a large source and the byte offset of its body."""
+    metadata, offset = read_front_matter(src_path)
+    title = metadata.get("title")
+    if title:
+        return title, offset
+    for block in markdown_file_to_blocks(src_path, offset):
+        try:
+            return extract_title(block), offset
+        except ValueError:
+            continue
+    raise ValueError("No h1 heading found in markdown")
+
+
+def fill_template(
+    template: str, title: str, content: str, toc: str = "", head: str = "", related: str = ""
+) -> str:
+    return (
+        template.replace("{{ Title }}", title)
+        .replace("{{ Head }}", head)
+        .replace("{{ TOC }}", toc)
+        .replace("{{ Related }}", related)
+        .replace("{{ Content }}", content)
+    )
+
+
+def render_page(
+    src_path: str,
+    url: str,
+    template: str,
+    pipeline: Pipeline,
+    toc: TableOfContents,
+    head_hints=None,
+    workers: int = 1,
+    pool: str = "process",
+    root_props: dict[str, str] = None,
+) -> tuple[str, HtmlNode, str]:
+    """Render a source into a whole page; returns its title, tree and HTML.
+
+    The tree is run through the pipeline before it is rendered; root_props,
+    if given, are then added to its root div.
+    """
+    title, node = parse_source(src_path, workers, toc, pool)
+    pipeline.run(node, url)
+    if root_props is not None:
+        node.props = {**(node.props or {}), **root_props}
+    head = head_hints(url) if head_hints is not None else ""
+    return title, node, fill_template(template, title, node.to_html(), toc.to_html(), head)
+
+
+def write_large_page(
+    src_path: str,
+    dest_path: str,
+    template: str,
+    url: str,
+    pipeline: Pipeline,
+    toc: TableOfContents,
+    head_hints=None,
+    workers: int = 1,
+    pool: str = "process",
+    terms: Counter = None,
+) -> str:
+    """Render a large source into dest_path one block at a time; returns the title.
+
+    Each block is rendered, run through the pipeline, written out and
+    dropped, so only one block's tree is alive at once. The content is
+    spooled to a temporary file beside dest_path first, because the TOC and
+    head hints that precede it in the template are only known once every
+    block has been seen. When terms is given, the page's search terms are
+    counted into it.
+    """
+    title, offset = _large_source_title(src_path)
+    dest_dir = os.path.dirname(dest_path)
+    os.makedirs(dest_dir, exist_ok=True)
+    with tempfile.TemporaryFile("w+", encoding="utf-8", dir=dest_dir) as content:
+        pipeline.begin(url)
+        # The page div on its own, so plugins see the same tags as on a whole tree.
+        pipeline.walk(ParentNode("div", []))
+        empty = True
+        content.write("<div>")
+        for block in markdown_file_to_html_blocks(src_path, workers, offset, toc, pool):
+            pipeline.walk(block)
+            content.write(block.to_html())
+            if terms is not None:
+                terms.update(count_terms(block))
+            empty = False
+        if empty:
+            raise ValueError("Children are required for parent nodes")
+        content.write("</div>")
+        pipeline.end(url)
+
+        head = head_hints(url) if head_hints is not None else ""
+        marker = "{{ Content }}"
+        parts = fill_template(template, title, marker, toc.to_html(), head).split(marker)
+        with open(dest_path, "w", encoding="utf-8") as f:
+            f.write(parts[0])
+            for part in parts[1:]:
+                content.seek(0)
+                shutil.copyfileobj(content, f)
+                f.write(part)
+    return title
+
+
+def generate_pages_recursive(
+    content_dir: str,
+    template_path: str,
+    dest_dir: str,
+    search_index=None,
+    static_dir: str = None,
+    shard: tuple[int, int] = None,
+    workers: int = 1,
+    pipeline: Pipeline = None,
+    head_hints=None,
+    template_filter=None,
+    pool: str = "process",
+    page_timings: dict[str, float] = None,
+) -> list[str]:
+    """Render every markdown file under content_dir into dest_dir.
+
+    Returns the URLs of the generated pages. When a SearchIndex is given,
+    each page's rendered tree is added to it as the page is written. When
+    static_dir is given, img tags get dimensions read from the files there.
+    When shard is given, only pages in that partition are rendered.
+    workers other than 1 renders the blocks of very long pages in parallel,
+    in a pool of the given kind ("process" or "thread").
+    A transform Pipeline, if given, runs over each page's tree before it is
+    written, in place of the image pass that static_dir otherwise enables.
+    head_hints(url), if given, returns markup for the page's {{ Head }}; it is
+    called after the pipeline has run over the page. template_filter, if
+    given, rewrites the template text once before any page is filled in.
+    page_timings, if given, receives each page's render time in seconds.
+    """
+    template = load_template(template_path)
+    if template_filter is not None:
+        template = template_filter(template)
+    if pipeline is None:
+        pipeline = Pipeline([ImageAttributes(static_dir)] if static_dir is not None else [])
+
+    urls = []
+    for dirpath, dirnames, filenames in os.walk(content_dir):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            if not filename.endswith(".md"):
+                continue
+            src_path = os.path.join(dirpath, filename)
+            rel_path = os.path.relpath(src_path, content_dir)
+            if shard is not None and not in_shard(rel_path, shard):
+                continue
+            dest_path = os.path.join(dest_dir, os.path.splitext(rel_path)[0] + ".html")
+            print(f"Generating page from {src_path} to {dest_path}")
+
+            url = page_url(rel_path)
+            start = time.perf_counter()
+            toc = TableOfContents()
+            if os.path.getsize(src_path) >= LARGE_SOURCE_BYTES:
+                terms = Counter() if search_index is not None else None
+                title = write_large_page(
+                    src_path,
+                    dest_path,
+                    template,
+                    url,
+                    pipeline,
+                    toc,
+                    head_hints,
+                    workers,
+                    pool,
+                    terms,
+                )
+                if search_index is not None:
+                    search_index.add_page_terms(url, terms, title)
+            else:
+                title, node, html = render_page(
+                    src_path, url, template, pipeline, toc, head_hints, workers, pool
+                )
+                os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+                with open(dest_path, "w", encoding="utf-8") as f:
+                    f.write(html)
+
+                if search_index is not None:
+                    search_index.add_page(url, node, title)
+            if page_timings is not None:
+                page_timings[url] = time.perf_counter() - start
+            urls.append(url)
+    return urls
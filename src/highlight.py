@@ -0,0 +1,143 @@
+"""Syntax highlighting for fenced code blocks.
+
+Each lexer is one regex of named alternatives; the group that matched names
+the token class, emitted as <span class="tok-NAME">. Text no alternative
+matches is emitted escaped but unwrapped. Results are cached by language and
+a digest of the code, so a snippet repeated across pages is tokenized once.
+"""
+import hashlib
+import html
+import re
+
+from cache import LRUCache
+
+KEYWORDS = {
+    "python": (
+        "False None True and as assert async await break class continue def del "
+        "elif else except finally for from global if import in is lambda "
+        "nonlocal not or pass raise return try while with yield"
+    ),
+    "javascript": (
+        "async await break case catch class const continue default delete do "
+        "else export extends false finally for function if import in instanceof "
+        "let new null of return super switch this throw true try typeof "
+        "undefined var void while yield"
+    ),
+    "bash": (
+        "case do done elif else esac export fi for function if in local "
+        "return then until while"
+    ),
+}
+
+NUMBER = r"(?P<number>\b\d[\d_]*(?:\.\d+)?(?:[eE][+-]?\d+)?\b)"
+DOUBLE_QUOTED = r'"(?:[^"\\\n]|\\.)*"'
+SINGLE_QUOTED = r"'(?:[^'\\\n]|\\.)*'"
+
+
+def _keywords(language: str) -> str:
+    return r"(?P<keyword>\b(?:%s)\b)" % "|".join(KEYWORDS[language].split())
+
+
+LEXER_PATTERNS = {
+    "python": [
+        r"(?P<comment>#[^\n]*)",
+        r'(?P<string>[rbfuRBFU]{0,2}(?:"""[\s\S]*?"""|\'\'\'[\s\S]*?\'\'\'|%s|%s))'
+        % (DOUBLE_QUOTED, SINGLE_QUOTED),
+        r"(?P<decorator>@[\w.]+)",
+        _keywords("python"),
+        r"(?P<builtin>\b(?:self|cls|print|len|range|dict|list|set|tuple|str|int|float|bool)\b)",
+        NUMBER,
+    ],
+    "javascript": [
+        r"(?P<comment>//[^\n]*|/\*[\s\S]*?\*/)",
+        r"(?P<string>%s|%s|`(?:[^`\\]|\\.)*`)" % (DOUBLE_QUOTED, SINGLE_QUOTED),
+        _keywords("javascript"),
+        NUMBER,
+    ],
+    "json": [
+        r'(?P<attr>"(?:[^"\\\n]|\\.)*"(?=\s*:))',
+        r"(?P<string>%s)" % DOUBLE_QUOTED,
+        r"(?P<keyword>\b(?:true|false|null)\b)",
+        r"(?P<number>-?\b\d+(?:\.\d+)?(?:[eE][+-]?\d+)?\b)",
+    ],
+    "bash": [
+        r"(?P<comment>(?<![\w$])#[^\n]*)",
+        r"(?P<string>%s|%s)" % (DOUBLE_QUOTED, SINGLE_QUOTED),
+        r"(?P<variable>\$(?:\{[^}\n]*\}|\w+|[@#?$!*-]))",
+        _keywords("bash"),
+    ],
+    "css": [
+        r"(?P<comment>/\*[\s\S]*?\*/)",
+        r"(?P<string>%s|%s)" % (DOUBLE_QUOTED, SINGLE_QUOTED),
+        r"(?P<attr>[\w-]+(?=\s*:[^;{}]*[;}]))",
+        r"(?P<number>-?\d*\.?\d+(?:%|[a-z]+)?|#[0-9a-fA-F]{3,8}\b)",
+    ],
+}
+
+LEXERS = {language: re.compile("|".join(parts)) for language, parts in LEXER_PATTERNS.items()}
+
+ALIASES = {
+    "py": "python",
+    "python3": "python",
+    "js": "javascript",
+    "mjs": "javascript",
+    "sh": "bash",
+    "shell": "bash",
+    "zsh": "bash",
+}
+
+# Names that are safe to put in a class attribute ("c++", "c#", "objective-c").
+LANGUAGE_NAME = re.compile(r"[\w+#.-]+")
+
+highlight_cache = LRUCache(maxsize=4096)
+
+
+def normalize_language(info: str) -> str:
+    """The language named by a fence info string ("Python {linenos}" -> "python").
+
+    Returns "" when there is none, or when the name has other characters.
+    """
+    words = info.split()
+    if not words or not LANGUAGE_NAME.fullmatch(words[0]):
+        return ""
+    language = words[0].lower()
+    return ALIASES.get(language, language)
+
+
+def tokenize(code: str, language: str) -> list[tuple[str | None, str]]:
+    """Split code into (token class or None, text) pairs covering all of it."""
+    lexer = LEXERS[language]
+    tokens = []
+    pos = 0
+    for match in lexer.finditer(code):
+        if match.start() > pos:
+            tokens.append((None, code[pos : match.start()]))
+        tokens.append((match.lastgroup, match.group()))
+        pos = match.end()
+    if pos < len(code):
+        tokens.append((None, code[pos:]))
+    return tokens
+
+
+def _render(code: str, language: str) -> str:
+    parts = []
+    for token_class, text in tokenize(code, language):
+        text = html.escape(text, quote=False)
+        if token_class is None:
+            parts.append(text)
+        else:
+            parts.append(f'<span class="tok-{token_class}">{text}</span>')
+    return "".join(parts)
+
+
+def highlight(code: str, language: str) -> str | None:
+    """Highlighted, HTML-escaped code, or None if there is no lexer for language."""
+    if language not in LEXERS:
+        return None
+    digest = hashlib.blake2b(code.encode("utf-8"), digest_size=16).digest()
+    key = (language, digest)
+    result = highlight_cache.get(key)
+    if result is None:
+        result = _render(code, language)
+        highlight_cache.put(key, result)
+    return result
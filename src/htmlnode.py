@@ -1,4 +1,96 @@
+import hashlib
+import weakref
+
+from cache import LRUCache
+
+# Rendered HTML of ParentNode subtrees that recur, keyed by structural hash.
+render_cache = LRUCache(maxsize=4096, maxbytes=32 << 20)
+
+FIELDS = frozenset(("tag", "value", "props", "children"))
+
+
+def _tracking(base: type, name: str):
+    method = getattr(base, name)
+
+    def tracked(self, *args, **kwargs):
+        owner = self._owner()
+        if owner is not None:
+            owner._invalidate()
+        return method(self, *args, **kwargs)
+
+    tracked.__name__ = name
+    return tracked
+
+
+class _Props(dict):
+    """Props of a hashed node: in-place changes clear its structural hash."""
+
+    __slots__ = ("_owner",)
+
+    def __init__(self, owner: "HtmlNode", props: dict[str, str]):
+        super().__init__(props)
+        self._owner = weakref.ref(owner)
+
+    def __reduce__(self):
+        return dict, (dict(self),)
+
+
+class _Children(list):
+    """Children of a hashed node: in-place changes clear its structural hash."""
+
+    __slots__ = ("_owner",)
+
+    def __init__(self, owner: "HtmlNode", children: list["HtmlNode"]):
+        super().__init__(children)
+        self._owner = weakref.ref(owner)
+
+    def __reduce__(self):
+        return list, (list(self),)
+
+
+for _name in ("__setitem__", "__delitem__", "__ior__", "clear", "pop", "popitem", "setdefault",
+              "update"):
+    setattr(_Props, _name, _tracking(dict, _name))
+for _name in ("__setitem__", "__delitem__", "__iadd__", "__imul__", "append", "clear", "extend",
+              "insert", "pop", "remove", "reverse", "sort"):
+    setattr(_Children, _name, _tracking(list, _name))
+del _name
+
+
+def _track(node: "HtmlNode") -> None:
+    """Swap the node's props and children for tracked copies."""
+    fields = node.__dict__
+    props, children = fields["props"], fields["children"]
+    if isinstance(props, dict) and not (isinstance(props, _Props) and props._owner() is node):
+        fields["props"] = _Props(node, props)
+    if isinstance(children, list) and not (
+        isinstance(children, _Children) and children._owner() is node
+    ):
+        fields["children"] = _Children(node, children)
+
+
+def _adopt(child: "HtmlNode", parent_ref: weakref.ref) -> None:
+    # weakref.ref(node) returns the same object on every call, so identity
+    # suffices (and avoids comparing nodes).
+    parents = child._parents
+    for ref in parents:
+        if ref is parent_ref:
+            return
+    child.__dict__["_parents"] = parents + (parent_ref,)
+
+
 class HtmlNode:
+    # Structural hash, computed on first use and cleared (here and in every
+    # ancestor) when the subtree changes. Hashing a node also swaps its props
+    # and children for tracked copies and links its children back to it, so
+    # both assignment and in-place changes are seen. Invariant: a node with
+    # children but no stored hash has no ancestor with one.
+    _digest = None
+    # Weak references to the hashed nodes holding this one as a child.
+    _parents = ()
+    # Set by ParentNode.to_html: a second render goes through render_cache.
+    _rendered = False
+
     def __init__(
         self,
         tag: str = None,
@@ -6,10 +98,35 @@ class HtmlNode:
         props: dict[str, str] = None,
         children: list["HtmlNode"] = None,
     ):
-        self.tag = tag
-        self.value = value
-        self.children = children
-        self.props = props
+        fields = self.__dict__
+        fields["tag"] = tag
+        fields["value"] = value
+        fields["children"] = children
+        fields["props"] = props
+
+    def __setattr__(self, name, value):
+        if name in FIELDS:
+            # Before the change: whether the walk may stop here depends on
+            # the children the node was hashed with.
+            self._invalidate()
+        self.__dict__[name] = value
+
+    def __getstate__(self):
+        state = self.__dict__
+        if len(state) == len(FIELDS):
+            return state
+        return {name: value for name, value in state.items() if not name.startswith("_")}
+
+    def _invalidate(self) -> None:
+        # A leaf is hashed into its parent without a digest of its own, so
+        # the walk always steps past one.
+        if self.__dict__.pop("_digest", None) is None and self.children is not None:
+            return
+        pending = [ref() for ref in self._parents]
+        while pending:
+            node = pending.pop()
+            if node is not None and node.__dict__.pop("_digest", None) is not None:
+                pending.extend(ref() for ref in node._parents)
 
     def to_html(self) -> str:
         raise NotImplementedError("to_html is not implemented")
@@ -20,7 +137,55 @@ class HtmlNode:
 
         return " ".join([f'{key}="{value}"' for key, value in self.props.items()])
 
+    def structural_hash(self) -> bytes:
+        """Return a Merkle-style digest of this subtree.
+
+        The digest covers the node type, tag, value, props (in order) and the
+        digests of its children. It is stored on the node and cleared when
+        the node or any descendant is changed, by assignment or in place
+        through its props or children.
+        """
+        digest = self._digest
+        if digest is not None:
+            return digest
+        _track(self)
+        props = self.props
+        if isinstance(props, dict):
+            props = tuple(props.items())
+        children = self.children
+        parts = [type(self).__name__, self.tag, self.value, props]
+        if children is not None:
+            parts.append(len(children))
+            parent_ref = weakref.ref(self)
+            for child in children:
+                if not isinstance(child, HtmlNode):
+                    parts.append(repr(child))
+                    continue
+                _adopt(child, parent_ref)
+                if child.children is None:
+                    # Leaves are hashed into their parent: one digest per
+                    # leaf would cost more than rendering it.
+                    _track(child)
+                    props = child.props
+                    if isinstance(props, dict):
+                        props = tuple(props.items())
+                    parts.append((type(child).__name__, child.tag, child.value, props))
+                else:
+                    parts.append(child.structural_hash())
+        digest = hashlib.blake2b(repr(parts).encode(), digest_size=16).digest()
+        self.__dict__["_digest"] = digest
+        return digest
+
     def __eq__(self, other) -> bool:
+        if self is other:
+            return True
+        if not isinstance(other, HtmlNode):
+            return NotImplemented
+        # Stored digests settle equality for free when both are present;
+        # computing them here would cost more than the comparison itself.
+        digest = self._digest
+        if digest is not None and digest == other._digest:
+            return True
         return (
             self.tag == other.tag
             and self.value == other.value
@@ -0,0 +1,135 @@
+import os
+import struct
+
+from cache import LRUCache
+from htmlnode import HtmlNode
+from transforms import Pipeline, Plugin
+
+# Bytes needed to identify a format and, for everything but JPEG, its size.
+HEADER_SIZE = 30
+
+# path -> (mtime_ns, (width, height) or None)
+size_cache = LRUCache(maxsize=65536)
+
+
+def _png_size(header: bytes) -> tuple[int, int] | None:
+    if len(header) < 24 or header[12:16] != b"IHDR":
+        return None
+    return struct.unpack(">II", header[16:24])
+
+
+def _gif_size(header: bytes) -> tuple[int, int] | None:
+    if len(header) < 10:
+        return None
+    return struct.unpack("<HH", header[6:10])
+
+
+def _webp_size(header: bytes) -> tuple[int, int] | None:
+    if len(header) < HEADER_SIZE:
+        return None
+    chunk = header[12:16]
+    if chunk == b"VP8 " and header[23:26] == b"\x9d\x01\x2a":
+        width, height = struct.unpack("<HH", header[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b"VP8L" and header[20:21] == b"\x2f":
+        bits = int.from_bytes(header[21:25], "little")
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b"VP8X":
+        width = int.from_bytes(header[24:27], "little") + 1
+        height = int.from_bytes(header[27:30], "little") + 1
+        return width, height
+    return None
+
+
+def _jpeg_size(f) -> tuple[int, int] | None:
+    """Walk JPEG segment headers until a start-of-frame marker, skipping payloads."""
+    f.seek(2)
+    while True:
+        marker = f.read(2)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            return None
+        code = marker[1]
+        if code == 0xFF:
+            f.seek(-1, os.SEEK_CUR)
+            continue
+        if code in (0x01, 0xD8) or 0xD0 <= code <= 0xD7:
+            continue
+        length_bytes = f.read(2)
+        if len(length_bytes) < 2:
+            return None
+        (length,) = struct.unpack(">H", length_bytes)
+        if 0xC0 <= code <= 0xCF and code not in (0xC4, 0xC8, 0xCC):
+            frame = f.read(5)
+            if len(frame) < 5:
+                return None
+            height, width = struct.unpack(">HH", frame[1:5])
+            return width, height
+        f.seek(length - 2, os.SEEK_CUR)
+
+
+def read_image_size(path: str) -> tuple[int, int] | None:
+    """Return (width, height) for a PNG, JPEG, GIF or WebP file.
+
+    Only the header bytes are read. Returns None for unrecognized formats
+    and for files cut off before the size.
+    """
+    with open(path, "rb") as f:
+        header = f.read(HEADER_SIZE)
+        if header.startswith(b"\x89PNG\r\n\x1a\n"):
+            return _png_size(header)
+        if header[:6] in (b"GIF87a", b"GIF89a"):
+            return _gif_size(header)
+        if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+            return _webp_size(header)
+        if header[:2] == b"\xff\xd8":
+            return _jpeg_size(f)
+    return None
+
+
+def image_size(path: str) -> tuple[int, int] | None:
+    """Cached read_image_size, invalidated when the file's mtime changes."""
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+    cached = size_cache.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    size = read_image_size(path)
+    size_cache.put(path, (mtime, size))
+    return size
+
+
+class ImageAttributes(Plugin):
+    """Add width/height and lazy-loading hints to img tags.
+
+    Site-absolute sources ("/images/x.png") are resolved against static_dir,
+    then each of fallback_dirs; images that cannot be found or measured still
+    get the loading hints.
+    """
+
+    tags = frozenset({"img"})
+
+    def __init__(self, static_dir: str, *fallback_dirs: str):
+        self.static_dir = static_dir
+        self.fallback_dirs = fallback_dirs
+
+    def visit(self, node: HtmlNode) -> None:
+        props = dict(node.props or {})
+        src = props.get("src", "")
+        if src.startswith("/") and "width" not in props:
+            size = None
+            for static_dir in (self.static_dir, *self.fallback_dirs):
+                size = image_size(os.path.join(static_dir, src.lstrip("/")))
+                if size is not None:
+                    break
+            if size is not None:
+                props["width"], props["height"] = str(size[0]), str(size[1])
+        props.setdefault("loading", "lazy")
+        props.setdefault("decoding", "async")
+        node.props = props
+
+
+def add_image_attributes(node: HtmlNode, static_dir: str) -> None:
+    """Apply ImageAttributes to every img in a rendered tree."""
+    Pipeline([ImageAttributes(static_dir)]).run(node)
@@ -1,6 +1,19 @@
 import re
+import sys
 
-from textnode import TextNode, TextType
+from cache import LRUCache
+from textnode import FrozenTextNode, TextNode, TextType
+
+# Labels cannot contain brackets and URLs cannot contain "]", so a failed match
+# attempt never scans past the next candidate start and extraction stays
+# linear on inputs like "[[[[..." or "[a]([a]([a](...".
+IMAGE_PATTERN = re.compile(r"!\[([^\[\]]*)\]\(([^\)\]]+)\)")
+LINK_PATTERN = re.compile(r"(?<!!)\[([^\[\]]+)\]\(([^\)\]]+)\)")
+
+# Parsed inline text shared across pages: list items, link labels and
+# boilerplate sentences repeat thousands of times in a build. Long texts are
+# mostly unique paragraphs and would only push the short ones out.
+INLINE_CACHE_MAX_CHARS = 256
 
 
 def split_nodes_delimiter(old_nodes, delimiter, text_type):
@@ -11,13 +24,15 @@ def split_nodes_delimiter(old_nodes, delimiter, text_type):
             new_nodes.append(node)
             continue
 
-        parts = node.text.split(delimiter)
-
-        if len(parts) % 2 == 0:
+        # Check before splitting so unbalanced input fails without building
+        # the full list of parts.
+        if node.text.count(delimiter) % 2 != 0:
             raise ValueError(
                 f"Unmatched delimiter '{delimiter}' found in text: {node.text}"
             )
 
+        parts = node.text.split(delimiter)
+
         for i, part in enumerate(parts):
             if part == "":
                 continue
@@ -31,41 +46,14 @@ def split_nodes_delimiter(old_nodes, delimiter, text_type):
 
 
 def split_nodes_image(old_nodes):
-    new_nodes = []
-
-    for node in old_nodes:
-        if node.text_type != TextType.TEXT:
-            new_nodes.append(node)
-            continue
-
-        images = extract_markdown_images(node.text)
-        if not images:
-            new_nodes.append(node)
-            continue
-
-        remaining_text = node.text
-        for alt_text, url in images:
-            markdown_syntax = f"![{alt_text}]({url})"
-
-            parts = remaining_text.split(markdown_syntax, 1)
-
-            if len(parts) != 2:
-                raise ValueError(f"Image markdown syntax not found: {markdown_syntax}")
-
-            if parts[0]:
-                new_nodes.append(TextNode(parts[0], TextType.TEXT))
-
-            new_nodes.append(TextNode(alt_text, TextType.IMAGE, url))
-
-            remaining_text = parts[1]
+    return _split_nodes_pattern(old_nodes, IMAGE_PATTERN, TextType.IMAGE)
 
-        if remaining_text:
-            new_nodes.append(TextNode(remaining_text, TextType.TEXT))
 
-    return new_nodes
+def split_nodes_link(old_nodes):
+    return _split_nodes_pattern(old_nodes, LINK_PATTERN, TextType.LINK)
 
 
-def split_nodes_link(old_nodes):
+def _split_nodes_pattern(old_nodes, pattern, text_type):
     new_nodes = []
 
     for node in old_nodes:
@@ -73,29 +61,20 @@ def split_nodes_link(old_nodes):
             new_nodes.append(node)
             continue
 
-        links = extract_markdown_links(node.text)
-        if not links:
+        # Slice around match spans rather than re-splitting the remaining
+        # text once per match, which copied it over and over.
+        text = node.text
+        position = 0
+        for match in pattern.finditer(text):
+            if match.start() > position:
+                new_nodes.append(TextNode(text[position : match.start()], TextType.TEXT))
+            new_nodes.append(TextNode(match.group(1), text_type, match.group(2)))
+            position = match.end()
+
+        if position == 0:
             new_nodes.append(node)
-            continue
-
-        remaining_text = node.text
-        for anchor_text, url in links:
-            markdown_syntax = f"[{anchor_text}]({url})"
-
-            parts = remaining_text.split(markdown_syntax, 1)
-
-            if len(parts) != 2:
-                raise ValueError(f"Link markdown syntax not found: {markdown_syntax}")
-
-            if parts[0]:
-                new_nodes.append(TextNode(parts[0], TextType.TEXT))
-
-            new_nodes.append(TextNode(anchor_text, TextType.LINK, url))
-
-            remaining_text = parts[1]
-
-        if remaining_text:
-            new_nodes.append(TextNode(remaining_text, TextType.TEXT))
+        elif position < len(text):
+            new_nodes.append(TextNode(text[position:], TextType.TEXT))
 
     return new_nodes
 
@@ -113,13 +92,40 @@ def text_to_textnodes(text):
     return nodes
 
 
+def _inline_size(text, nodes):
+    return sys.getsizeof(text) + sum(
+        sys.getsizeof(node) + sys.getsizeof(node.text) + sys.getsizeof(node.url)
+        for node in nodes
+    )
+
+
+inline_cache = LRUCache(maxsize=8192, sizeof=_inline_size)
+
+
+def _frozen_textnodes(text: str) -> tuple[FrozenTextNode, ...]:
+    return tuple(
+        FrozenTextNode(node.text, node.text_type, node.url) for node in text_to_textnodes(text)
+    )
+
+
+def parse_inline(text: str) -> tuple[FrozenTextNode, ...]:
+    """Like text_to_textnodes, but memoized and returning a shared tuple.
+
+    The nodes may be handed to any number of callers, so they are frozen:
+    assigning to one raises AttributeError.
+    """
+    if len(text) > INLINE_CACHE_MAX_CHARS:
+        return _frozen_textnodes(text)
+    nodes = inline_cache.get(text)
+    if nodes is None:
+        nodes = _frozen_textnodes(text)
+        inline_cache.put(text, nodes)
+    return nodes
+
+
 def extract_markdown_images(text):
-    pattern = r"!\[([^\]]*)\]\(([^\)]+)\)"
-    matches = re.findall(pattern, text)
-    return matches
+    return IMAGE_PATTERN.findall(text)
 
 
 def extract_markdown_links(text):
-    pattern = r"(?<!!)\[([^\]]+)\]\(([^\)]+)\)"
-    matches = re.findall(pattern, text)
-    return matches
+    return LINK_PATTERN.findall(text)
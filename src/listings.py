@@ -0,0 +1,74 @@
+"""Tag pages, built from the metadata index instead of the sources.
+
+    /tags/          every tag, with the number of pages carrying it
+    /tags/<slug>/   the pages carrying a tag, newest first
+
+Tags are mapped to URL-safe slugs ("Jazz Age" -> "jazz-age"); tags that
+share a slug share a page. They are written before the content is rendered,
+so a content page at the same path replaces them.
+"""
+import html
+import os
+import re
+
+from generate import fill_template
+from metadata_index import MetadataIndex, PageMetadata
+from shard import in_shard
+
+TAGS_DIR = "tags"
+
+
+def tag_slug(tag: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", tag.lower()).strip("-")
+
+
+def _page_list(pages: list[PageMetadata]) -> str:
+    items = []
+    for page in pages:
+        item = f'<a href="{html.escape(page.url)}">{html.escape(page.title or page.url)}</a>'
+        if page.date:
+            date = html.escape(page.date)
+            item += f' <time datetime="{date}">{date}</time>'
+        items.append(f"<li>{item}</li>")
+    return f"<ul>{''.join(items)}</ul>"
+
+
+def write_tag_pages(
+    index: MetadataIndex, template: str, public_dir: str, shard: tuple[int, int] = None
+) -> list[str]:
+    """Write the tag pages into public_dir; returns their URLs.
+
+    When shard is given, only pages in that partition are written.
+    """
+    by_slug: dict[str, list[str]] = {}
+    for tag in index.tags():
+        slug = tag_slug(tag)
+        if slug:
+            by_slug.setdefault(slug, []).append(tag)
+    if not by_slug:
+        return []
+
+    pages, items = {}, []
+    for slug, tags in sorted(by_slug.items()):
+        tagged = {page.source_path: page for tag in tags for page in index.pages(tag=tag)}
+        # Same order as MetadataIndex.pages: newest first, undated last.
+        ordered = sorted(tagged.values(), key=lambda page: page.source_path)
+        ordered.sort(key=lambda page: page.date or "", reverse=True)
+        label = ", ".join(tags)
+        pages[f"{TAGS_DIR}/{slug}/index.html"] = (f"Tagged {label}", _page_list(ordered))
+        items.append(
+            f'<li><a href="/{TAGS_DIR}/{slug}/">{html.escape(label)}</a> ({len(ordered)})</li>'
+        )
+    pages[f"{TAGS_DIR}/index.html"] = ("Tags", f"<ul>{''.join(items)}</ul>")
+
+    urls = []
+    for rel_path, (title, content) in pages.items():
+        if shard is not None and not in_shard(rel_path, shard):
+            continue
+        dest_path = os.path.join(public_dir, *rel_path.split("/"))
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        title = html.escape(title)
+        with open(dest_path, "w", encoding="utf-8") as f:
+            f.write(fill_template(template, title, f"<h1>{title}</h1>{content}"))
+        urls.append("/" + rel_path[: -len("index.html")])
+    return urls
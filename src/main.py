@@ -1,20 +1,60 @@
+import argparse
+import contextlib
+import json
 import os
 import shutil
+import time
+from typing import Callable, NamedTuple
 
-from textnode import TextNode, TextType
+from build_state import BuildState
+from critical_css import CriticalCss
+from deploy import DELTA_JSON, site_archive_path, write_archive, write_delta
+from generate import generate_pages_recursive, load_template, rewrite_source_link
+from image_dimensions import ImageAttributes
+from listings import write_tag_pages
+from memory import cache_stats, format_bytes, memory_budget, parse_size, peak_rss
+from metadata_index import MetadataIndex
+from minify import format_savings, minify_directory
+from paths import PROJECT_ROOT, STATE_DIR
+from profiling import Profiler, page_outliers
+from related import (
+    HAVE_NUMPY,
+    RELATED_COUNT,
+    fill_related,
+    load_related,
+    mark_related,
+    related_posts,
+    save_related,
+)
+from search_index import SearchIndex
+from shard import (
+    SEARCH_DIR,
+    in_shard,
+    merge_shards,
+    output_manifest,
+    parse_shard,
+    write_shard_manifest,
+)
+from sites import Site, default_site, find_static, link_tree, load_sites, stage_tree
+from transforms import ExternalLinks, LinkGraph, LinkRewriter, PageStats, Pipeline
 
 
-def copy_static_to_public(source_dir: str, dest_dir: str) -> None:
+def copy_static_to_public(
+    source_dir: str, dest_dir: str, shard: tuple[int, int] = None
+) -> None:
     """
     Recursively copy all contents from source_dir to dest_dir.
     First deletes all contents of dest_dir to ensure a clean copy.
+    When shard is given, only files in that partition are copied.
     """
     # Delete destination directory if it exists
     if os.path.exists(dest_dir):
         shutil.rmtree(dest_dir)
 
     # Create destination directory
-    os.mkdir(dest_dir)
+    os.makedirs(dest_dir)
+    if not os.path.isdir(source_dir):
+        return
 
     def copy_recursive(src: str, dst: str) -> None:
         for item in os.listdir(src):
@@ -22,6 +62,9 @@ def copy_static_to_public(source_dir: str, dest_dir: str) -> None:
             dst_path = os.path.join(dst, item)
 
             if os.path.isfile(src_path):
+                rel_path = os.path.relpath(src_path, source_dir)
+                if shard is not None and not in_shard(rel_path, shard):
+                    continue
                 shutil.copy(src_path, dst_path)
                 print(f"Copied: {src_path} -> {dst_path}")
             else:
@@ -31,15 +74,375 @@ def copy_static_to_public(source_dir: str, dest_dir: str) -> None:
     copy_recursive(source_dir, dest_dir)
 
 
-def main():
-    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    static_dir = os.path.join(project_root, "static")
-    public_dir = os.path.join(project_root, "public")
+def parse_args(argv: list[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Build the site into public/.")
+    parser.add_argument(
+        "--minify",
+        action="store_true",
+        help="minify the generated HTML and CSS in place after the build",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="worker processes for parallel stages (default: one per CPU)",
+    )
+    parser.add_argument(
+        "--parallel-blocks",
+        action="store_true",
+        help="render the blocks of very long pages across --workers processes",
+    )
+    parser.add_argument(
+        "--threads",
+        action="store_true",
+        help="with --parallel-blocks, use a thread pool instead of processes",
+    )
+    parser.add_argument(
+        "--shard",
+        type=parse_shard,
+        default=None,
+        metavar="i/N",
+        help="build only the i-th of N path-hash partitions and write a partial manifest",
+    )
+    parser.add_argument(
+        "--max-memory",
+        type=parse_size,
+        default=None,
+        metavar="SIZE",
+        help="build in one process with caches bounded by a share of SIZE (e.g. 512M)",
+    )
+    parser.add_argument(
+        "--deploy-archive",
+        default=None,
+        metavar="PATH",
+        help="write the files changed since the previous build to a .zip, .tar or .tar.gz",
+    )
+    parser.add_argument(
+        "--sites",
+        default=None,
+        metavar="FILE",
+        help="build every site listed in a JSON sites file, sharing caches and static files",
+    )
+    parser.add_argument(
+        "--related",
+        type=int,
+        default=RELATED_COUNT,
+        metavar="N",
+        help="list N related posts where the template has {{ Related }} (0 to skip; needs NumPy)",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="run in one process under cProfile and tracemalloc and write reports to .fitz/profile",
+    )
+    parser.add_argument(
+        "--merge",
+        nargs="+",
+        default=None,
+        metavar="PART",
+        help="combine the outputs of every --shard build into public/ instead of building",
+    )
+    return parser.parse_args(argv)
 
-    copy_static_to_public(static_dir, public_dir)
 
-    text_node = TextNode("Hello", TextType.TEXT, "https://www.justinhill.xyz")
-    print(text_node)
+# The build state database, under STATE_DIR.
+STATE_DB = "state.sqlite3"
+# Per-site build state under STATE_DIR, and the staged shared static tree.
+SITES_DIR = "sites"
+SHARED_STATIC = "shared-static"
+# Reports written by --profile, under STATE_DIR.
+PROFILE_DIR = "profile"
+# Build state namespace holding each page's links to other pages, most linked
+# first; the next build ranks prefetch targets with it.
+LINK_GRAPH_NAMESPACE = "link-graph"
+# The site stylesheet; the rules each page uses are inlined into its head.
+STYLESHEET = "index.css"
+# Static files every page needs early, with their preload "as" destination.
+CRITICAL_ASSETS = {STYLESHEET: "style"}
+
+
+def critical_assets(static_dirs: list[str]) -> dict[str, str]:
+    """Preload hints ({url: destination}) for the CRITICAL_ASSETS present in static_dirs."""
+    return {
+        "/" + rel_path: destination
+        for rel_path, destination in CRITICAL_ASSETS.items()
+        if find_static(rel_path, static_dirs) is not None
+    }
+
+
+def load_link_graph(state_path: str) -> dict[str, list[str]]:
+    """The link graph stored by the previous build, if there was one."""
+    if not os.path.exists(state_path):
+        return {}
+    with BuildState(state_path) as state:
+        return {
+            url: json.loads(value)
+            for url, value in state.cache_items(LINK_GRAPH_NAMESPACE).items()
+        }
+
+
+class PageRendering(NamedTuple):
+    pipeline: Pipeline
+    link_graph: LinkGraph
+    stats: PageStats
+    # url -> markup for the page's {{ Head }}, once the pipeline has run over it.
+    head_hints: Callable[[str], str]
+    # Rewrites the template text once before pages are filled in.
+    template_filter: Callable[[str], str]
+
+
+def page_rendering(
+    template_path: str,
+    static_dirs: list[str],
+    previous_links: dict[str, list[str]] = None,
+    related: bool = False,
+) -> PageRendering:
+    """Set up the transforms, head hints and template rewrites pages are built with.
+
+    With related, the template's {{ Related }} is left as a marker for
+    fill_related.
+    """
+    stats = PageStats()
+    link_graph = LinkGraph(preload=critical_assets(static_dirs), previous=previous_links)
+    pipeline = Pipeline(
+        [
+            ImageAttributes(*static_dirs),
+            LinkRewriter(rewrite_source_link),
+            ExternalLinks(),
+            link_graph,
+            stats,
+        ]
+    )
+    head_parts = [link_graph.head_hints]
+    template_filters = []
+    stylesheet_path = find_static(STYLESHEET, static_dirs)
+    if stylesheet_path is not None:
+        with open(stylesheet_path, encoding="utf-8") as f:
+            critical_css = CriticalCss(f.read(), "/" + STYLESHEET, load_template(template_path))
+        pipeline.add(critical_css)
+        head_parts.append(critical_css.head_html)
+        template_filters.append(critical_css.defer_stylesheet)
+    if related:
+        template_filters.append(mark_related)
+
+    def head_hints(url: str) -> str:
+        return "\n    ".join(part for part in (hint(url) for hint in head_parts) if part)
+
+    def template_filter(template: str) -> str:
+        for rewrite in template_filters:
+            template = rewrite(template)
+        return template
+
+    return PageRendering(pipeline, link_graph, stats, head_hints, template_filter)
+
+
+def build(args: argparse.Namespace, project_root: str = PROJECT_ROOT) -> dict:
+    """Run one build as described by parsed command-line args.
+
+    Returns a summary of what was done, suitable for serializing as JSON.
+    """
+    start = time.perf_counter()
+
+    if args.merge:
+        public_dir = default_site(project_root).public_dir
+        merged = merge_shards(args.merge, public_dir)
+        print(f"Merged {len(args.merge)} shard(s), {len(merged)} file(s) into {public_dir}")
+        return {"merged_files": len(merged), "seconds": time.perf_counter() - start}
+
+    # The caches outlive the build (in the daemon), so the budget is lifted
+    # again once it is done.
+    budget = contextlib.nullcontext()
+    if args.max_memory is not None:
+        budget = memory_budget(args.max_memory)
+    profiler = None
+    if args.profile:
+        profiler = Profiler(os.path.join(project_root, STATE_DIR, PROFILE_DIR))
+
+    with budget:
+        with profiler if profiler is not None else contextlib.nullcontext():
+            result = _build_sites(args, project_root, profiler)
+        # The caches live for the whole process, so with --sites these counts
+        # show how much each site reused from the ones built before it.
+        result["caches"] = cache_stats()
+    if profiler is not None:
+        result["profile"] = profiler.reports
+        outliers = page_outliers(profiler.page_timings)
+        result["slow_pages"] = outliers
+        print(f"Profile written to {profiler.out_dir}")
+        for url in outliers:
+            print(f"Slow page: {url} ({profiler.page_timings[url] * 1000:.1f} ms)")
+
+    result["seconds"] = time.perf_counter() - start
+    result["peak_rss"] = peak_rss()
+    if args.max_memory is not None:
+        print(
+            f"Peak RSS: {format_bytes(result['peak_rss'])} "
+            f"(budget {format_bytes(args.max_memory)})"
+        )
+    return result
+
+
+def _build_sites(args: argparse.Namespace, project_root: str, profiler: Profiler) -> dict:
+    if args.sites is None:
+        return build_site(args, default_site(project_root), project_root, profiler=profiler)
+    sites, shared_static = load_sites(args.sites, project_root)
+    if shared_static is not None:
+        shared_static = stage_tree(
+            shared_static, os.path.join(project_root, STATE_DIR, SHARED_STATIC)
+        )
+    return {
+        "sites": {
+            site.name: build_site(args, site, project_root, shared_static, profiler)
+            for site in sites
+        }
+    }
+
+
+def build_site(
+    args: argparse.Namespace,
+    site: Site,
+    project_root: str,
+    shared_static: str = None,
+    profiler: Profiler = None,
+) -> dict:
+    """Build one site into its public directory; see build for the result.
+
+    With a Profiler, each stage of the build and every page are timed.
+    """
+    static_dir, content_dir, public_dir = site.static_dir, site.content_dir, site.public_dir
+    template_path = site.template_path
+    static_dirs = [static_dir] + ([shared_static] if shared_static else [])
+    start = time.perf_counter()
+
+    # Worker processes would each hold their own copy of every cache, and
+    # would escape the profiler, so these builds run in this process only.
+    workers = 1 if args.max_memory is not None or profiler is not None else args.workers
+    stage_prefix = f"{site.name}:" if site.name else ""
+    stage = profiler.stage if profiler is not None else contextlib.nullcontext
+
+    state_dir = os.path.join(project_root, STATE_DIR, *([SITES_DIR, site.name] if site.name else []))
+    state_path = os.path.join(state_dir, STATE_DB)
+    with stage(stage_prefix + "static"):
+        copy_static_to_public(static_dir, public_dir, args.shard)
+        result = {"pages": []}
+        if shared_static is not None:
+            linked, copied = link_tree(shared_static, public_dir, args.shard)
+            print(f"Linked {linked}, copied {copied} shared static file(s) into {public_dir}")
+            result["shared_static"] = {"linked": linked, "copied": copied}
+
+    links = related = None
+    if os.path.isdir(content_dir):
+        with stage(stage_prefix + "metadata"):
+            metadata_index = MetadataIndex(state_path)
+            try:
+                update = metadata_index.update(content_dir)
+                tag_pages = write_tag_pages(
+                    metadata_index, load_template(template_path), public_dir, args.shard
+                )
+            finally:
+                metadata_index.close()
+        result["metadata"] = update._asdict()
+        result["tag_pages"] = tag_pages
+
+        # The index lives in the build state and is updated in place, so only
+        # shards whose tokens changed are rewritten; public/ gets links to it.
+        # A shard's partial index is merged later and is always built fresh.
+        search_dir = os.path.join(state_dir, SEARCH_DIR)
+        search_index = SearchIndex() if args.shard is not None else SearchIndex.load(search_dir)
+        # Neighbours need every page, so a shard cannot list them.
+        related_count = args.related if args.shard is None else 0
+        if related_count and "{{ Related }}" not in load_template(template_path):
+            related_count = 0
+        if related_count and not HAVE_NUMPY:
+            print("Skipping related posts: NumPy is not installed")
+            related_count = 0
+        rendering = page_rendering(
+            template_path, static_dirs, load_link_graph(state_path), bool(related_count)
+        )
+        pipeline, link_graph, stats = rendering.pipeline, rendering.link_graph, rendering.stats
+
+        page_timings = {}
+        with stage(stage_prefix + "render"):
+            result["pages"] = generate_pages_recursive(
+                content_dir,
+                template_path,
+                public_dir,
+                search_index,
+                shard=args.shard,
+                workers=workers if args.parallel_blocks else 1,
+                pool="thread" if args.threads else "process",
+                pipeline=pipeline,
+                head_hints=rendering.head_hints,
+                template_filter=rendering.template_filter,
+                page_timings=page_timings,
+            )
+            if args.shard is not None:
+                written = search_index.write(os.path.join(public_dir, SEARCH_DIR))
+            else:
+                for url in search_index.documents().keys() - set(result["pages"]):
+                    search_index.remove_page(url)
+                written = search_index.write(search_dir)
+                link_tree(search_dir, os.path.join(public_dir, SEARCH_DIR))
+        result["search"] = {"written": len(written)}
+        if profiler is not None:
+            profiler.page_timings.update(
+                (stage_prefix + url, seconds) for url, seconds in page_timings.items()
+            )
+        if related_count:
+            with stage(stage_prefix + "related"):
+                with BuildState(state_path) as state:
+                    previous = load_related(state)
+                documents = search_index.documents()
+                related, recomputed = related_posts(
+                    {url: terms for url, (_, terms) in documents.items()}, related_count, previous
+                )
+                fill_related(
+                    public_dir, related, {url: title for url, (title, _) in documents.items()}
+                )
+            result["related"] = {"pages": len(related), "recomputed": recomputed}
+        result["stats"] = stats.totals()
+        result["transforms"] = pipeline.timings
+        links = link_graph.links
+
+    if args.minify:
+        with stage(stage_prefix + "minify"):
+            totals = minify_directory(public_dir, workers)
+        print(format_savings(totals))
+        result["minified"] = {ext: list(counts) for ext, counts in totals.items()}
+
+    with stage(stage_prefix + "state"):
+        with BuildState(state_path) as state:
+            if links is not None:
+                state.cache_clear(LINK_GRAPH_NAMESPACE)
+                state.cache_put_many(
+                    LINK_GRAPH_NAMESPACE,
+                    {url: json.dumps(targets).encode("utf-8") for url, targets in links.items()},
+                )
+            if related is not None:
+                save_related(state, related)
+            manifest = output_manifest(public_dir)
+            delta = state.update_outputs(manifest)
+            if args.shard is not None:
+                write_shard_manifest(public_dir, args.shard)
+    write_delta(delta, os.path.join(state_dir, DELTA_JSON))
+    result["outputs"] = {
+        "total": len(manifest),
+        "added": len(delta.added),
+        "changed": len(delta.changed),
+        "deleted": len(delta.deleted),
+    }
+    if args.deploy_archive is not None:
+        archive_path = args.deploy_archive
+        if site.name:
+            archive_path = site_archive_path(archive_path, site.name)
+        write_archive(public_dir, delta, archive_path)
+
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def main(argv: list[str] = None):
+    build(parse_args(argv))
 
 
 if __name__ == "__main__":
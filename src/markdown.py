@@ -1,10 +1,24 @@
+import html
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import islice
+from typing import Iterable, Iterator
+
 from htmlnode import HtmlNode
 from leafnode import LeafNode
 from parentnode import ParentNode
 from textnode import TextNode, TextType
 
-from block_markdown import BlockType, block_to_block_type, markdown_to_blocks
-from inline_markdown import text_to_textnodes
+from block_markdown import (
+    BlockType,
+    block_to_block_type,
+    markdown_file_to_blocks,
+    markdown_to_blocks,
+)
+from highlight import highlight, normalize_language
+from inline_markdown import parse_inline
+from toc import HEADING_TAGS, TableOfContents, plain_text
 
 
 def text_node_to_html_node(text_node: TextNode) -> HtmlNode:
@@ -27,8 +41,7 @@ def text_node_to_html_node(text_node: TextNode) -> HtmlNode:
 
 def text_to_children(text: str) -> list[HtmlNode]:
     """Convert inline markdown text to a list of HTMLNode children."""
-    text_nodes = text_to_textnodes(text)
-    return [text_node_to_html_node(node) for node in text_nodes]
+    return [text_node_to_html_node(node) for node in parse_inline(text)]
 
 
 def _block_to_html_paragraph(block: str) -> HtmlNode:
@@ -36,17 +49,27 @@ def _block_to_html_paragraph(block: str) -> HtmlNode:
     return ParentNode("p", text_to_children(text))
 
 
-def _block_to_html_heading(block: str) -> HtmlNode:
+def _block_to_html_heading(block: str, toc: TableOfContents = None) -> HtmlNode:
     level = 0
     while level < len(block) and level < 6 and block[level] == "#":
         level += 1
     text = block[level + 1 :].strip()
-    return ParentNode(f"h{level}", text_to_children(text))
+    children = text_to_children(text)
+    if toc is None:
+        return ParentNode(f"h{level}", children)
+    return ParentNode(f"h{level}", children, {"id": toc.add(level, plain_text(children))})
 
 
 def _block_to_html_code(block: str) -> HtmlNode:
-    content = block[4:-3]
-    code_node = LeafNode("code", content)
+    fence, _, content = block.partition("\n")
+    content = content[:-3]
+    language = normalize_language(fence[3:])
+    if not language:
+        return ParentNode("pre", [LeafNode("code", html.escape(content, quote=False))])
+
+    highlighted = highlight(content, language)
+    content = highlighted if highlighted is not None else html.escape(content, quote=False)
+    code_node = LeafNode("code", content, {"class": f"language-{language}"})
     return ParentNode("pre", [code_node])
 
 
@@ -72,12 +95,12 @@ def _block_to_html_ordered_list(block: str) -> HtmlNode:
     return ParentNode("ol", li_nodes)
 
 
-def _block_to_html_node(block: str) -> HtmlNode:
+def _block_to_html_node(block: str, toc: TableOfContents = None) -> HtmlNode:
     block_type = block_to_block_type(block)
     if block_type == BlockType.PARAGRAPH:
         return _block_to_html_paragraph(block)
     if block_type == BlockType.HEADING:
-        return _block_to_html_heading(block)
+        return _block_to_html_heading(block, toc)
     if block_type == BlockType.CODE:
         return _block_to_html_code(block)
     if block_type == BlockType.QUOTE:
@@ -89,8 +112,111 @@ def _block_to_html_node(block: str) -> HtmlNode:
     return _block_to_html_paragraph(block)
 
 
-def markdown_to_html_node(markdown: str) -> HtmlNode:
-    """Convert a full markdown document into a single parent HTMLNode (div)."""
+# Parallel rendering only pays for its process start-up and pickling on
+# documents at least this long; shorter ones always render serially.
+PARALLEL_MIN_BLOCKS = 2000
+PARALLEL_CHUNK_BLOCKS = 500
+
+# Rendering keeps no shared mutable state outside thread-safe caches, so
+# blocks can also be rendered by threads: no start-up or pickling cost, and
+# real parallelism on free-threaded Python builds.
+POOLS = {"process": ProcessPoolExecutor, "thread": ThreadPoolExecutor}
+
+
+def _render_blocks(blocks: list[str], toc: TableOfContents = None) -> list[HtmlNode]:
+    return [_block_to_html_node(block, toc) for block in blocks]
+
+
+def _chunks(blocks: Iterable[str]) -> Iterator[list[str]]:
+    chunk = []
+    for block in blocks:
+        chunk.append(block)
+        if len(chunk) == PARALLEL_CHUNK_BLOCKS:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _render_blocks_parallel(
+    blocks: Iterable[str],
+    workers: int = None,
+    toc: TableOfContents = None,
+    pool: str = "process",
+) -> Iterator[HtmlNode]:
+    """Render chunks of blocks in a process or thread pool, yielding them in document order.
+
+    Heading ids must be unique across the whole page, so chunks render
+    without them and they are assigned while stitching, in document order.
+    """
+    # Executor.map would submit (and so read and decode) every chunk up
+    # front; a window of about two chunks per worker keeps them all busy.
+    window = 2 * (workers or os.cpu_count() or 1)
+    pending = deque()
+    with POOLS[pool](max_workers=workers) as executor:
+        chunks = _chunks(blocks)
+        while True:
+            for chunk in islice(chunks, window - len(pending)):
+                pending.append(executor.submit(_render_blocks, chunk))
+            if not pending:
+                break
+            for child in pending.popleft().result():
+                if toc is not None and child.tag in HEADING_TAGS:
+                    child.props = {"id": toc.add(int(child.tag[1]), plain_text(child.children))}
+                yield child
+
+
+def markdown_to_html_node(
+    markdown: str, workers: int = 1, toc: TableOfContents = None, pool: str = "process"
+) -> HtmlNode:
+    """Convert a full markdown document into a single parent HTMLNode (div).
+
+    With workers other than 1 (None meaning one per CPU), documents of at
+    least PARALLEL_MIN_BLOCKS blocks are rendered in chunks across a pool
+    ("process" or "thread") and stitched back together in order. When a
+    TableOfContents is given, headings get unique id anchors and are
+    recorded in it as they render.
+
+    Reentrant: any number of threads may call this at once.
+    """
     blocks = markdown_to_blocks(markdown)
-    children = [_block_to_html_node(block) for block in blocks]
+    if workers != 1 and len(blocks) >= PARALLEL_MIN_BLOCKS:
+        children = list(_render_blocks_parallel(blocks, workers, toc, pool))
+    else:
+        children = _render_blocks(blocks, toc)
     return ParentNode("div", children)
+
+
+def markdown_file_to_html_node(
+    path: str,
+    workers: int = 1,
+    offset: int = 0,
+    toc: TableOfContents = None,
+    pool: str = "process",
+) -> HtmlNode:
+    """Like markdown_to_html_node, but reads the source block by block from disk.
+
+    Callers use this for large files, so workers other than 1 always render
+    in parallel rather than checking PARALLEL_MIN_BLOCKS.
+    """
+    return ParentNode("div", list(markdown_file_to_html_blocks(path, workers, offset, toc, pool)))
+
+
+def markdown_file_to_html_blocks(
+    path: str,
+    workers: int = 1,
+    offset: int = 0,
+    toc: TableOfContents = None,
+    pool: str = "process",
+) -> Iterator[HtmlNode]:
+    """Yield the rendered blocks of a file (the children of its page div) in order.
+
+    Blocks are read and rendered as they are consumed, so a caller that
+    drops each one holds a single block's tree at a time.
+    """
+    blocks = markdown_file_to_blocks(path, offset)
+    if workers != 1:
+        yield from _render_blocks_parallel(blocks, workers, toc, pool)
+    else:
+        for block in blocks:
+            yield _block_to_html_node(block, toc)
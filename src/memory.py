@@ -0,0 +1,87 @@
+"""Memory budget for builds on machines with little RAM (--max-memory)."""
+import contextlib
+import re
+import resource
+import sys
+
+from cache import LRUCache
+from critical_css import critical_cache
+from generate import template_cache
+from highlight import highlight_cache
+from htmlnode import render_cache
+from image_dimensions import size_cache
+from inline_markdown import inline_cache
+
+SIZE_PATTERN = re.compile(r"(\d+(?:\.\d+)?)\s*([KMG]?)(?:i?B)?", re.IGNORECASE)
+SIZE_UNITS = {"": 1, "K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+
+# Fraction of the budget each cache may hold. The rest is left for the
+# interpreter, the page being rendered and the search index.
+CACHE_SHARES: dict[str, tuple[LRUCache, float]] = {
+    "render": (render_cache, 0.25),
+    "highlight": (highlight_cache, 0.1),
+    "inline": (inline_cache, 0.05),
+    "critical_css": (critical_cache, 0.05),
+    "template": (template_cache, 0.02),
+    "image_size": (size_cache, 0.02),
+}
+
+
+def parse_size(text: str) -> int:
+    """Parse a byte count such as "512M", "1.5G" or "65536"."""
+    match = SIZE_PATTERN.fullmatch(text.strip())
+    if match is None:
+        raise ValueError(f"Invalid size '{text}', expected e.g. 512M or 2G")
+    number, unit = match.groups()
+    return int(float(number) * SIZE_UNITS[unit.upper()])
+
+
+def apply_memory_budget(max_bytes: int) -> dict[str, int]:
+    """Bound every in-memory cache by its share of max_bytes; return the byte limits."""
+    limits = {}
+    for name, (cache, share) in CACHE_SHARES.items():
+        limits[name] = int(max_bytes * share)
+        cache.resize(maxbytes=limits[name])
+    return limits
+
+
+@contextlib.contextmanager
+def memory_budget(max_bytes: int):
+    """Apply a memory budget for the duration of a with block.
+
+    Yields the byte limits; every cache gets its previous byte bound back
+    on exit, so the budget of one build does not outlive it.
+    """
+    previous = [(cache, cache.maxbytes) for cache, _ in CACHE_SHARES.values()]
+    try:
+        yield apply_memory_budget(max_bytes)
+    finally:
+        for cache, maxbytes in previous:
+            cache.resize(maxbytes=maxbytes)
+
+
+def cache_stats() -> dict[str, dict]:
+    """Hit/miss counts, hit rate and occupancy of every budgeted cache, JSON-ready."""
+    stats = {}
+    for name, (cache, _) in CACHE_SHARES.items():
+        info = cache.info()
+        stats[name] = {**info._asdict(), "hit_rate": info.hit_rate}
+    return stats
+
+
+def peak_rss() -> int:
+    """Peak resident set size in bytes of this process or any of its finished children."""
+    peak = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+    # ru_maxrss is in bytes on macOS and kilobytes everywhere else.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def format_bytes(count: int) -> str:
+    for unit in ("B", "KiB", "MiB"):
+        if count < 1024:
+            return f"{count:.0f} {unit}" if unit == "B" else f"{count:.1f} {unit}"
+        count /= 1024
+    return f"{count:.1f} GiB"
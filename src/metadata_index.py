@@ -0,0 +1,163 @@
+import hashlib
+import json
+import os
+from typing import NamedTuple
+
+from build_state import connect
+from frontmatter import split_front_matter
+from generate import extract_title, page_url
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    source_path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    source_hash TEXT NOT NULL,
+    title TEXT NOT NULL,
+    date TEXT,
+    tags TEXT NOT NULL,
+    url TEXT NOT NULL,
+    output_path TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pages_by_date ON pages (date);
+CREATE TABLE IF NOT EXISTS page_tags (
+    tag TEXT NOT NULL,
+    source_path TEXT NOT NULL,
+    PRIMARY KEY (tag, source_path)
+) WITHOUT ROWID;
+"""
+
+
+class PageMetadata(NamedTuple):
+    source_path: str
+    title: str
+    date: str | None
+    tags: list[str]
+    url: str
+    output_path: str
+
+
+class IndexUpdate(NamedTuple):
+    changed: list[str]
+    removed: list[str]
+    unchanged: int
+
+
+def _page_metadata(rel_path: str, markdown: str) -> PageMetadata:
+    metadata, body = split_front_matter(markdown)
+    title = metadata.get("title")
+    if not title:
+        try:
+            title = extract_title(body)
+        except ValueError:
+            title = ""
+    tags = metadata.get("tags", [])
+    if isinstance(tags, str):
+        tags = [tags] if tags else []
+    return PageMetadata(
+        rel_path,
+        title,
+        metadata.get("date") or None,
+        tags,
+        page_url(rel_path),
+        os.path.splitext(rel_path)[0] + ".html",
+    )
+
+
+class MetadataIndex:
+    """SQLite index of page metadata, kept current from source mtimes and hashes.
+
+    update() only opens files whose mtime changed since the last update, and
+    only re-parses those whose content hash changed too, so listing, tag and
+    archive pages can be built from queries instead of rereading every source.
+    Paths are content-relative and '/'-separated.
+    """
+
+    def __init__(self, db_path: str):
+        self.db = connect(db_path)
+        self.db.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.db.close()
+
+    def update(self, content_dir: str) -> IndexUpdate:
+        known = dict(self.db.execute("SELECT source_path, mtime_ns FROM pages"))
+        changed, unchanged = [], 0
+        with self.db:
+            for dirpath, _, filenames in os.walk(content_dir):
+                for filename in filenames:
+                    if not filename.endswith(".md"):
+                        continue
+                    path = os.path.join(dirpath, filename)
+                    rel_path = os.path.relpath(path, content_dir).replace(os.sep, "/")
+                    mtime = os.stat(path).st_mtime_ns
+                    if known.pop(rel_path, None) == mtime:
+                        unchanged += 1
+                        continue
+                    if self._refresh(rel_path, path, mtime):
+                        changed.append(rel_path)
+                    else:
+                        unchanged += 1
+
+            removed = sorted(known)
+            for rel_path in removed:
+                self.db.execute("DELETE FROM pages WHERE source_path = ?", (rel_path,))
+                self.db.execute("DELETE FROM page_tags WHERE source_path = ?", (rel_path,))
+        return IndexUpdate(sorted(changed), removed, unchanged)
+
+    def _refresh(self, rel_path: str, path: str, mtime: int) -> bool:
+        """Re-read one source; returns whether its content actually changed."""
+        with open(path, "rb") as f:
+            data = f.read()
+        digest = hashlib.sha256(data).hexdigest()
+        row = self.db.execute(
+            "SELECT source_hash FROM pages WHERE source_path = ?", (rel_path,)
+        ).fetchone()
+        if row is not None and row[0] == digest:
+            self.db.execute(
+                "UPDATE pages SET mtime_ns = ? WHERE source_path = ?", (mtime, rel_path)
+            )
+            return False
+
+        page = _page_metadata(rel_path, data.decode("utf-8"))
+        self.db.execute(
+            "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                rel_path,
+                mtime,
+                digest,
+                page.title,
+                page.date,
+                json.dumps(page.tags),
+                page.url,
+                page.output_path,
+            ),
+        )
+        self.db.execute("DELETE FROM page_tags WHERE source_path = ?", (rel_path,))
+        self.db.executemany(
+            "INSERT OR IGNORE INTO page_tags VALUES (?, ?)",
+            [(tag, rel_path) for tag in page.tags],
+        )
+        return True
+
+    def pages(self, tag: str = None, limit: int = None) -> list[PageMetadata]:
+        """Pages newest first (undated last), optionally only those with a tag."""
+        query = "SELECT source_path, title, date, tags, url, output_path FROM pages"
+        params = []
+        if tag is not None:
+            query += " WHERE source_path IN (SELECT source_path FROM page_tags WHERE tag = ?)"
+            params.append(tag)
+        query += " ORDER BY date IS NULL, date DESC, source_path"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        return [
+            PageMetadata(path, title, date, json.loads(tags), url, output_path)
+            for path, title, date, tags, url, output_path in self.db.execute(query, params)
+        ]
+
+    def tags(self) -> dict[str, int]:
+        """Every tag with the number of pages carrying it."""
+        rows = self.db.execute(
+            "SELECT tag, COUNT(*) FROM page_tags GROUP BY tag ORDER BY tag"
+        )
+        return dict(rows)
@@ -0,0 +1,146 @@
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+# Elements whose content is whitespace-sensitive and left untouched.
+PRESERVE_ELEMENTS = {"pre", "code", "textarea", "script", "style"}
+
+# Whitespace-only text next to these tags never renders, so it is dropped.
+BLOCK_ELEMENTS = {
+    "html", "head", "body", "title", "meta", "link", "article", "aside", "div",
+    "footer", "header", "main", "nav", "section", "p", "h1", "h2", "h3", "h4",
+    "h5", "h6", "ul", "ol", "li", "blockquote", "pre", "table", "thead",
+    "tbody", "tr", "td", "th", "hr", "br", "script", "style", "!doctype",
+}
+
+HTML_TOKEN = re.compile(r"<!--.*?-->|<[^>]*>|[^<]+", re.DOTALL)
+TAG_NAME = re.compile(r"</?\s*([!\w-]+)")
+WHITESPACE = re.compile(r"\s+")
+
+CSS_TOKEN = re.compile(
+    r"""/\*.*?\*/|"(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*'|[^"'/]+|/""", re.DOTALL
+)
+CSS_SPACE_AROUND = re.compile(r"\s*([{};,>])\s*")
+CSS_SPACE_AFTER_COLON = re.compile(r":\s+")
+
+
+def _tag_name(tag: str) -> str:
+    match = TAG_NAME.match(tag)
+    return match.group(1).lower() if match else ""
+
+
+def minify_html(html: str) -> str:
+    """Collapse insignificant whitespace and drop comments from HTML.
+
+    Content inside pre, code, textarea, script and style is copied verbatim.
+    """
+    tokens = HTML_TOKEN.findall(html)
+    out = []
+    preserve_depth = 0
+    for i, token in enumerate(tokens):
+        if token.startswith("<!--"):
+            if preserve_depth:
+                out.append(token)
+            continue
+
+        if token.startswith("<"):
+            name = _tag_name(token)
+            if name in PRESERVE_ELEMENTS:
+                if token.startswith("</"):
+                    preserve_depth = max(preserve_depth - 1, 0)
+                elif not token.endswith("/>"):
+                    preserve_depth += 1
+            out.append(token)
+            continue
+
+        if preserve_depth:
+            out.append(token)
+            continue
+
+        text = WHITESPACE.sub(" ", token)
+        if text == " ":
+            prev_tag = _tag_name(tokens[i - 1]) if i > 0 else "!doctype"
+            next_tag = _tag_name(tokens[i + 1]) if i + 1 < len(tokens) else "!doctype"
+            if prev_tag in BLOCK_ELEMENTS or next_tag in BLOCK_ELEMENTS:
+                continue
+        out.append(text)
+    return "".join(out).strip()
+
+
+def minify_css(css: str) -> str:
+    """Strip comments and insignificant whitespace from a stylesheet."""
+    out = []
+    for token in CSS_TOKEN.findall(css):
+        if token.startswith("/*"):
+            continue
+        if token[0] in "\"'":
+            out.append(token)
+            continue
+        token = WHITESPACE.sub(" ", token)
+        token = CSS_SPACE_AROUND.sub(r"\1", token)
+        token = CSS_SPACE_AFTER_COLON.sub(":", token)
+        out.append(token)
+    return "".join(out).replace(";}", "}").strip()
+
+
+MINIFIERS = {".html": minify_html, ".css": minify_css}
+
+
+def minify_file(path: str) -> tuple[str, int, int]:
+    """Minify a file in place. Returns (extension, bytes_before, bytes_after).
+
+    The result replaces the file rather than overwriting it, so files
+    hardlinked from a shared static tree are not changed for other sites.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    with open(path, "rb") as f:
+        data = f.read()
+    minified = MINIFIERS[ext](data.decode("utf-8")).encode("utf-8")
+    if len(minified) < len(data):
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(minified)
+        os.replace(tmp_path, path)
+        return ext, len(data), len(minified)
+    return ext, len(data), len(data)
+
+
+def _minifiable_paths(root: str):
+    for dirpath, _, filenames in os.walk(root):
+        for filename in sorted(filenames):
+            if os.path.splitext(filename)[1].lower() in MINIFIERS:
+                yield os.path.join(dirpath, filename)
+
+
+def minify_directory(root: str, workers: int = None) -> dict[str, tuple[int, int, int]]:
+    """Minify every HTML and CSS file under root in a pool of worker processes.
+
+    Only paths cross the process boundary: each worker reads, minifies and
+    writes its own files, so the output tree is never held in memory as a
+    whole. Returns a mapping of extension to (files, bytes_before, bytes_after).
+    """
+    totals = {}
+
+    def record(results):
+        for ext, before, after in results:
+            files, total_before, total_after = totals.get(ext, (0, 0, 0))
+            totals[ext] = (files + 1, total_before + before, total_after + after)
+
+    if workers == 1:
+        record(map(minify_file, _minifiable_paths(root)))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            record(executor.map(minify_file, _minifiable_paths(root), chunksize=16))
+    return totals
+
+
+def format_savings(totals: dict[str, tuple[int, int, int]]) -> str:
+    lines = []
+    for ext, (files, before, after) in sorted(totals.items()):
+        saved = before - after
+        percent = 100 * saved / before if before else 0
+        lines.append(
+            f"Minified {files} {ext} file(s): {before} -> {after} bytes "
+            f"(saved {saved}, {percent:.1f}%)"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,242 @@
+"""Compact binary encoding for HtmlNode trees and TextNode lists.
+
+Layout (all integers are unsigned LEB128 varints):
+
+    magic              4 bytes, b"FZH1" for HtmlNodes, b"FZT1" for TextNodes
+    string table       count, then (byte length, UTF-8 bytes) per string
+    node count         number of top-level nodes
+    nodes              pre-order
+
+An HtmlNode is a kind byte (0 HtmlNode, 1 LeafNode, 2 ParentNode) followed by
+its tag, value, props and children. Tags and prop keys/values are string-table
+references, stored as index + 1 with 0 meaning None. Values are inline
+strings, stored as byte length + 1 with 0 meaning None. Props and children
+are a count + 1 (0 meaning None) followed by that many key/value index
+pairs or child nodes. A TextNode is its text (inline), its TextType ordinal
+and its url (a string-table reference).
+"""
+from htmlnode import HtmlNode
+from leafnode import LeafNode
+from parentnode import ParentNode
+from textnode import TextNode, TextType
+
+HTML_MAGIC = b"FZH1"
+TEXT_MAGIC = b"FZT1"
+
+NODE_CLASSES = (HtmlNode, LeafNode, ParentNode)
+TEXT_TYPES = tuple(TextType)
+TEXT_TYPE_CODES = {text_type: code for code, text_type in enumerate(TEXT_TYPES)}
+
+
+def _write_varint(out: bytearray, value: int) -> None:
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+class _StringTable:
+    def __init__(self):
+        self.strings: list[str] = []
+        self.indexes: dict[str, int] = {}
+
+    def ref(self, value: str | None) -> int:
+        if value is None:
+            return 0
+        index = self.indexes.get(value)
+        if index is None:
+            index = self.indexes[value] = len(self.strings)
+            self.strings.append(value)
+        return index + 1
+
+    def encode(self, magic: bytes, body: bytearray, count: int) -> bytes:
+        out = bytearray(magic)
+        _write_varint(out, len(self.strings))
+        for value in self.strings:
+            encoded = value.encode("utf-8")
+            _write_varint(out, len(encoded))
+            out += encoded
+        _write_varint(out, count)
+        return bytes(out + body)
+
+
+class _Reader:
+    def __init__(self, data: bytes, magic: bytes):
+        if data[:4] != magic:
+            raise ValueError(f"Not an encoded node stream: expected magic {magic!r}")
+        self.data = data
+        self.pos = 4
+        self.strings = [self.read_str() for _ in range(self.read_varint())]
+
+    def read_varint(self) -> int:
+        data, pos = self.data, self.pos
+        byte = data[pos]
+        pos += 1
+        value = byte & 0x7F
+        shift = 7
+        while byte & 0x80:
+            byte = data[pos]
+            pos += 1
+            value |= (byte & 0x7F) << shift
+            shift += 7
+        self.pos = pos
+        return value
+
+    def read_str(self) -> str:
+        length = self.read_varint()
+        start = self.pos
+        self.pos = start + length
+        return self.data[start : self.pos].decode("utf-8")
+
+    def read_ref(self) -> str | None:
+        index = self.read_varint()
+        return self.strings[index - 1] if index else None
+
+
+def _encode_html_node(node: HtmlNode, out: bytearray, table: _StringTable) -> None:
+    out.append(NODE_CLASSES.index(type(node)))
+    _write_varint(out, table.ref(node.tag))
+
+    if node.value is None:
+        out.append(0)
+    else:
+        encoded = node.value.encode("utf-8")
+        _write_varint(out, len(encoded) + 1)
+        out += encoded
+
+    if node.props is None:
+        out.append(0)
+    else:
+        _write_varint(out, len(node.props) + 1)
+        for key, value in node.props.items():
+            _write_varint(out, table.ref(key))
+            _write_varint(out, table.ref(value))
+
+    if node.children is None:
+        out.append(0)
+    else:
+        _write_varint(out, len(node.children) + 1)
+        for child in node.children:
+            _encode_html_node(child, out, table)
+
+
+def encode_html_nodes(nodes: list[HtmlNode]) -> bytes:
+    table = _StringTable()
+    body = bytearray()
+    for node in nodes:
+        _encode_html_node(node, body, table)
+    return table.encode(HTML_MAGIC, body, len(nodes))
+
+
+def encode_html_node(node: HtmlNode) -> bytes:
+    return encode_html_nodes([node])
+
+
+def _varint_tail(data: bytes, pos: int, value: int) -> tuple[int, int]:
+    """Finish reading a varint whose first byte (value) had the high bit set."""
+    value &= 0x7F
+    shift = 7
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, pos
+        shift += 7
+
+
+def decode_html_nodes(data: bytes) -> list[HtmlNode]:
+    reader = _Reader(data, HTML_MAGIC)
+    strings = [None] + reader.strings
+    total = reader.read_varint()
+    pos = reader.pos
+    new = object.__new__
+
+    # Iterative pre-order decode with varints read inline: almost every
+    # varint is a single byte, and this loop dominates load time.
+    roots: list[HtmlNode] = []
+    stack = [(roots, total)]
+    while stack:
+        siblings, remaining = stack[-1]
+        if not remaining:
+            stack.pop()
+            continue
+        stack[-1] = (siblings, remaining - 1)
+
+        cls = NODE_CLASSES[data[pos]]
+        tag = data[pos + 1]
+        pos += 2
+        if tag & 0x80:
+            tag, pos = _varint_tail(data, pos, tag)
+
+        length = data[pos]
+        pos += 1
+        if length & 0x80:
+            length, pos = _varint_tail(data, pos, length)
+        if length:
+            value = data[pos : pos + length - 1].decode("utf-8")
+            pos += length - 1
+        else:
+            value = None
+
+        count = data[pos]
+        pos += 1
+        if count & 0x80:
+            count, pos = _varint_tail(data, pos, count)
+        props = None
+        if count:
+            props = {}
+            for _ in range(count - 1):
+                key = data[pos]
+                pos += 1
+                if key & 0x80:
+                    key, pos = _varint_tail(data, pos, key)
+                prop = data[pos]
+                pos += 1
+                if prop & 0x80:
+                    prop, pos = _varint_tail(data, pos, prop)
+                props[strings[key]] = strings[prop]
+
+        count = data[pos]
+        pos += 1
+        if count & 0x80:
+            count, pos = _varint_tail(data, pos, count)
+        children = [] if count else None
+
+        # Skip __init__: the fields are known to be complete.
+        node = new(cls)
+        node.__dict__.update(tag=strings[tag], value=value, props=props, children=children)
+        siblings.append(node)
+        if count > 1:
+            stack.append((children, count - 1))
+    return roots
+
+
+def decode_html_node(data: bytes) -> HtmlNode:
+    nodes = decode_html_nodes(data)
+    if len(nodes) != 1:
+        raise ValueError(f"Expected one encoded node, found {len(nodes)}")
+    return nodes[0]
+
+
+def encode_text_nodes(nodes: list[TextNode]) -> bytes:
+    table = _StringTable()
+    body = bytearray()
+    for node in nodes:
+        encoded = node.text.encode("utf-8")
+        _write_varint(body, len(encoded))
+        body += encoded
+        body.append(TEXT_TYPE_CODES[node.text_type])
+        _write_varint(body, table.ref(node.url))
+    return table.encode(TEXT_MAGIC, body, len(nodes))
+
+
+def decode_text_nodes(data: bytes) -> list[TextNode]:
+    reader = _Reader(data, TEXT_MAGIC)
+    nodes = []
+    for _ in range(reader.read_varint()):
+        text = reader.read_str()
+        text_type = TEXT_TYPES[data[reader.pos]]
+        reader.pos += 1
+        nodes.append(TextNode(text, text_type, reader.read_ref()))
+    return nodes
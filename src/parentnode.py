@@ -1,4 +1,4 @@
-from htmlnode import HtmlNode
+from htmlnode import HtmlNode, render_cache
 
 
 class ParentNode(HtmlNode):
@@ -12,12 +12,30 @@ class ParentNode(HtmlNode):
         if not self.children:
             raise ValueError("Children are required for parent nodes")
 
+        # Identical subtrees (navigation, footers, lists) share a structural
+        # hash, so each distinct one is serialized only once. Hashing costs
+        # about as much as rendering, so only subtrees that recur go through
+        # the cache: ones rendered before, or already hashed as part of one
+        # that was. A node holding only leaves renders faster than a lookup.
+        key = None
+        if self._digest is None and not self._rendered:
+            self.__dict__["_rendered"] = True
+        elif any([isinstance(child, ParentNode) for child in self.children]):
+            key = self.structural_hash()
+            html = render_cache.get(key)
+            if html is not None:
+                return html
+
         props_html = self.props_to_html()
         children_html = "".join([child.to_html() for child in self.children])
 
         if props_html:
-            return f"<{self.tag} {props_html}>{children_html}</{self.tag}>"
-        return f"<{self.tag}>{children_html}</{self.tag}>"
+            html = f"<{self.tag} {props_html}>{children_html}</{self.tag}>"
+        else:
+            html = f"<{self.tag}>{children_html}</{self.tag}>"
+        if key is not None:
+            render_cache.put(key, html)
+        return html
 
     def __repr__(self) -> str:
         return f"ParentNode(tag={self.tag}, children={self.children}, props={self.props})"
@@ -0,0 +1,6 @@
+"""Locations shared by the build and the tools that work on its results."""
+import os
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Build state kept between runs (indexes, caches); never deployed.
+STATE_DIR = ".fitz"
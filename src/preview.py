@@ -0,0 +1,278 @@
+"""Local preview server with block-level live reload.
+
+    python3 src/preview.py [--port 8888]
+
+Serves public/ and watches content/. When a page's source changes, only that
+page is re-rendered; its new block list is diffed against the previous one
+and the changed blocks are pushed to open browsers over Server-Sent Events.
+A small script injected into every HTML response splices them into the page.
+"""
+import argparse
+import difflib
+import functools
+import json
+import os
+import queue
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from build_state import BuildState
+from generate import load_template, page_url, render_page
+from main import STATE_DB, build, load_link_graph, page_rendering, parse_args
+from paths import PROJECT_ROOT, STATE_DIR
+from related import RELATED_MARKER, load_related, related_html
+from search_index import SearchIndex
+from shard import SEARCH_DIR
+from sites import default_site
+from toc import TableOfContents
+
+EVENTS_PATH = "/__fitz/events"
+LIVE_ROOT_ATTR = "data-fitz-live"
+POLL_SECONDS = 0.3
+KEEPALIVE_SECONDS = 15
+
+LIVE_RELOAD_SCRIPT = """<script>
+(() => {
+  const events = new EventSource("%s");
+  events.onmessage = (message) => {
+    const update = JSON.parse(message.data);
+    if (update.url !== location.pathname) return;
+    const root = document.querySelector("[%s]");
+    if (update.reload || !root) return location.reload();
+    for (const patch of update.patches) {
+      for (let i = 0; i < patch.remove; i++) root.children[patch.index].remove();
+      const template = document.createElement("template");
+      template.innerHTML = patch.html.join("");
+      root.insertBefore(template.content, root.children[patch.index] || null);
+    }
+  };
+})();
+</script>""" % (EVENTS_PATH, LIVE_ROOT_ATTR)
+
+
+def diff_blocks(old: list[str], new: list[str]) -> list[dict]:
+    """Return splices that turn the old list of block HTML into the new one.
+
+    Each patch replaces `remove` blocks starting at `index` with the blocks in
+    `html`. Patches are ordered last to first, so indexes stay valid as they
+    are applied in sequence.
+    """
+    matcher = difflib.SequenceMatcher(a=old, b=new, autojunk=False)
+    patches = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag != "equal":
+            patches.append({"index": i1, "remove": i2 - i1, "html": new[j1:j2]})
+    patches.reverse()
+    return patches
+
+
+def inject_live_reload(html: str) -> str:
+    index = html.rfind("</body>")
+    if index == -1:
+        return html + LIVE_RELOAD_SCRIPT
+    return html[:index] + LIVE_RELOAD_SCRIPT + html[index:]
+
+
+class LiveReloadHub:
+    """Fan-out of page updates to every connected event stream."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clients: set[queue.Queue] = set()
+
+    def subscribe(self) -> queue.Queue:
+        client = queue.Queue()
+        with self._lock:
+            self._clients.add(client)
+        return client
+
+    def unsubscribe(self, client: queue.Queue) -> None:
+        with self._lock:
+            self._clients.discard(client)
+
+    def publish(self, update: dict) -> None:
+        with self._lock:
+            for client in self._clients:
+                client.put(update)
+
+
+class PageWatcher:
+    """Re-renders changed content pages and publishes their block diffs.
+
+    Pages are rendered the way the build renders them (same transforms, head
+    hints and template rewrites, with related posts from the last build);
+    only the live-reload root attribute is added.
+    """
+
+    def __init__(self, project_root: str, hub: LiveReloadHub):
+        site = default_site(project_root)
+        self.content_dir = site.content_dir
+        self.template_path = site.template_path
+        self.public_dir = site.public_dir
+        self.hub = hub
+        state_dir = os.path.join(project_root, STATE_DIR)
+        state_path = os.path.join(state_dir, STATE_DB)
+        self._related, self._titles = {}, {}
+        if os.path.exists(state_path):
+            with BuildState(state_path) as state:
+                self._related = load_related(state)
+        if self._related:
+            documents = SearchIndex.load(os.path.join(state_dir, SEARCH_DIR)).documents()
+            self._titles = {url: title for url, (title, _) in documents.items()}
+        self.rendering = page_rendering(
+            site.template_path,
+            [site.static_dir],
+            load_link_graph(state_path),
+            related=bool(self._related),
+        )
+        self._mtimes: dict[str, int] = {}
+        # url -> (title, TOC entries, block HTML)
+        self._pages: dict[str, tuple[str, list, list[str]]] = {}
+
+    def _changed_sources(self) -> list[str]:
+        changed = []
+        for dirpath, _, filenames in os.walk(self.content_dir):
+            for filename in filenames:
+                if not filename.endswith(".md"):
+                    continue
+                src_path = os.path.join(dirpath, filename)
+                mtime = os.stat(src_path).st_mtime_ns
+                if self._mtimes.get(src_path) != mtime:
+                    self._mtimes[src_path] = mtime
+                    changed.append(src_path)
+        return changed
+
+    def prime(self) -> None:
+        """Take the sources as they are to be built already; only later edits render."""
+        self._changed_sources()
+
+    def poll(self) -> list[str]:
+        """Render pages whose sources changed since the last poll; return their URLs."""
+        changed = []
+        for src_path in self._changed_sources():
+            try:
+                changed.append(self.render(src_path))
+            except ValueError as e:
+                print(f"Skipping {src_path}: {e}")
+        return changed
+
+    def render(self, src_path: str) -> str:
+        rel_path = os.path.relpath(src_path, self.content_dir)
+        url = page_url(rel_path)
+        toc = TableOfContents()
+        rendering = self.rendering
+        template = rendering.template_filter(load_template(self.template_path))
+        title, node, html = render_page(
+            src_path,
+            url,
+            template,
+            rendering.pipeline,
+            toc,
+            rendering.head_hints,
+            root_props={LIVE_ROOT_ATTR: ""},
+        )
+        if RELATED_MARKER in html:
+            related = self._related.get(url)
+            html = html.replace(
+                RELATED_MARKER, related_html(related, self._titles) if related else ""
+            )
+        blocks = [child.to_html() for child in node.children or ()]
+
+        dest_path = os.path.join(self.public_dir, os.path.splitext(rel_path)[0] + ".html")
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        with open(dest_path, "w", encoding="utf-8") as f:
+            f.write(html)
+
+        # Only the blocks are patched in place; the title and the TOC (outside
+        # the live root) need a reload.
+        previous = self._pages.get(url)
+        self._pages[url] = (title, toc.entries, blocks)
+        if previous is None or previous[:2] != (title, toc.entries):
+            self.hub.publish({"url": url, "reload": True})
+        else:
+            self.hub.publish({"url": url, "patches": diff_blocks(previous[2], blocks)})
+        return url
+
+    def watch(self, stop: threading.Event) -> None:
+        while not stop.wait(POLL_SECONDS):
+            self.poll()
+
+
+class PreviewRequestHandler(SimpleHTTPRequestHandler):
+    def __init__(self, *args, hub: LiveReloadHub, **kwargs):
+        self.hub = hub
+        super().__init__(*args, **kwargs)
+
+    def do_GET(self) -> None:
+        if self.path == EVENTS_PATH:
+            self.stream_events()
+            return
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            path = os.path.join(path, "index.html")
+        if not path.endswith(".html") or not os.path.isfile(path):
+            super().do_GET()
+            return
+
+        with open(path, encoding="utf-8") as f:
+            body = inject_live_reload(f.read()).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def stream_events(self) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        client = self.hub.subscribe()
+        try:
+            while True:
+                try:
+                    update = client.get(timeout=KEEPALIVE_SECONDS)
+                    self.wfile.write(f"data: {json.dumps(update)}\n\n".encode("utf-8"))
+                except queue.Empty:
+                    self.wfile.write(b": keepalive\n\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            self.hub.unsubscribe(client)
+
+
+def serve(project_root: str = PROJECT_ROOT, port: int = 8888) -> None:
+    build(parse_args([]), project_root)
+    hub = LiveReloadHub()
+    watcher = PageWatcher(project_root, hub)
+    # The build just wrote every page; pages are re-rendered (with the live
+    # root) as they are edited, and a page without one reloads on its first.
+    watcher.prime()
+
+    handler = functools.partial(
+        PreviewRequestHandler, hub=hub, directory=os.path.join(project_root, "public")
+    )
+    stop = threading.Event()
+    threading.Thread(target=watcher.watch, args=(stop,), daemon=True).start()
+    with ThreadingHTTPServer(("127.0.0.1", port), handler) as server:
+        server.daemon_threads = True
+        print(f"Previewing on http://127.0.0.1:{port}/")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            stop.set()
+
+
+def main(argv: list[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Serve public/ with live reload.")
+    parser.add_argument("--port", type=int, default=8888)
+    args = parser.parse_args(argv)
+    serve(port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""Profile a build without instrumenting it by hand (--profile).
+
+Profiler runs the build under cProfile and tracemalloc, and a background
+thread samples the building thread's stack. On close it writes to out_dir:
+
+    build.pstats        cProfile stats, for pstats or snakeviz
+    stacks.collapsed    sampled stacks, one "a;b;c count" line each, for
+                        flamegraph.pl or speedscope
+    allocations.txt     the top allocation sites of every stage
+    pages.txt           per-page render times, slowest first, outliers marked
+"""
+import contextlib
+import cProfile
+import os
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+
+PSTATS_FILE = "build.pstats"
+STACKS_FILE = "stacks.collapsed"
+ALLOCATIONS_FILE = "allocations.txt"
+PAGES_FILE = "pages.txt"
+# Allocation sites listed per stage.
+TOP_ALLOCATIONS = 10
+# A page is an outlier when it takes this many times the median page.
+OUTLIER_FACTOR = 5.0
+# Frames from these files are dropped from allocation reports.
+IGNORED_FILES = (tracemalloc.__file__, __file__, "<frozen importlib._bootstrap>")
+
+
+def frame_label(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def page_outliers(timings: dict[str, float], factor: float = OUTLIER_FACTOR) -> list[str]:
+    """URLs of pages that took more than factor times the median page, slowest first."""
+    if len(timings) < 2:
+        return []
+    limit = statistics.median(timings.values()) * factor
+    return sorted(
+        (url for url, seconds in timings.items() if seconds > limit),
+        key=lambda url: -timings[url],
+    )
+
+
+class StackSampler(threading.Thread):
+    """Count the stacks of one thread, sampled every interval seconds."""
+
+    def __init__(self, thread_id: int, interval: float = 0.005):
+        super().__init__(name="stack-sampler", daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.counts: dict[str, int] = {}
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            labels = []
+            while frame is not None:
+                labels.append(frame_label(frame.f_code))
+                frame = frame.f_back
+            if labels:
+                stack = ";".join(reversed(labels))
+                self.counts[stack] = self.counts.get(stack, 0) + 1
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(self.counts.items()))
+
+
+class Profiler:
+    """Collect a CPU profile, sampled stacks and per-stage allocations.
+
+    Wrap each part of the build in stage(name); record page render times in
+    page_timings. Use as a context manager, or call start() and close().
+    """
+
+    def __init__(self, out_dir: str, interval: float = 0.005):
+        self.out_dir = out_dir
+        self.page_timings: dict[str, float] = {}
+        self.stages: list[tuple[str, float, list]] = []
+        # Report name -> path, once close() has written them.
+        self.reports: dict[str, str] = {}
+        self._profile = cProfile.Profile()
+        self._sampler = StackSampler(threading.get_ident(), interval)
+        self._started_tracemalloc = False
+
+    def start(self) -> "Profiler":
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        self._sampler.start()
+        self._profile.enable()
+        return self
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        """Time the enclosed block and record its top allocation sites."""
+        before = tracemalloc.take_snapshot()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            filters = [tracemalloc.Filter(False, path) for path in IGNORED_FILES]
+            after = tracemalloc.take_snapshot().filter_traces(filters)
+            diff = after.compare_to(before.filter_traces(filters), "lineno")
+            self.stages.append((name, seconds, diff[:TOP_ALLOCATIONS]))
+
+    def close(self) -> dict[str, str]:
+        """Stop profiling and write the reports; returns {report: path}."""
+        self._profile.disable()
+        self._sampler.stop()
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+
+        os.makedirs(self.out_dir, exist_ok=True)
+        paths = {
+            name: os.path.join(self.out_dir, filename)
+            for name, filename in (
+                ("pstats", PSTATS_FILE),
+                ("stacks", STACKS_FILE),
+                ("allocations", ALLOCATIONS_FILE),
+                ("pages", PAGES_FILE),
+            )
+        }
+        self._profile.dump_stats(paths["pstats"])
+        with open(paths["stacks"], "w", encoding="utf-8") as f:
+            f.write(self._sampler.collapsed())
+        with open(paths["allocations"], "w", encoding="utf-8") as f:
+            f.write(self.format_allocations())
+        with open(paths["pages"], "w", encoding="utf-8") as f:
+            f.write(self.format_pages())
+        self.reports = paths
+        return paths
+
+    def format_allocations(self) -> str:
+        lines = []
+        for name, seconds, top in self.stages:
+            lines.append(f"== {name} ({seconds * 1000:.1f} ms)")
+            for stat in top:
+                frame = stat.traceback[0]
+                lines.append(
+                    f"{stat.size_diff / 1024:+10.1f} KiB {stat.count_diff:+8d} blocks  "
+                    f"{frame.filename}:{frame.lineno}"
+                )
+            lines.append("")
+        return "\n".join(lines)
+
+    def format_pages(self) -> str:
+        timings = self.page_timings
+        outliers = set(page_outliers(timings))
+        lines = [
+            f"{timings[url] * 1000:10.2f} ms  {url}{'  <- outlier' if url in outliers else ''}"
+            for url in sorted(timings, key=lambda url: -timings[url])
+        ]
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def __enter__(self) -> "Profiler":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,278 @@
+"""Related posts: every page's nearest neighbours by TF-IDF cosine similarity.
+
+Term counts come from the search index, which already tokenizes the text of
+every page's tree during the render pass and keeps each page's counts in the
+build state between builds. They become a sparse TF-IDF matrix
+(CSR, rows L2-normalized) and a batch of rows is scored against every page
+at once: the batch's terms gather the matching postings from a CSC copy of
+the matrix, and one bincount sums the products into a dense
+batch x pages block. Nothing is ever compared pair by pair in Python. The
+weighted matrix is rebuilt on every build: IDF depends on every page, so a
+stored per-page vector would go stale as soon as any page changed.
+
+Between builds each page's neighbours are kept in the build state under its
+content digest, with the k they were found for. Only rows whose page
+changed, whose neighbours changed or disappeared, or that were kept for a
+smaller k are scored again; the other rows merge in the scores of the
+changed pages. IDF weights shift as pages change, so when more than
+FULL_RECOMPUTE_FRACTION of the rows are affected everything is recomputed.
+
+Needs NumPy; without it the stage is skipped and pages get no list.
+"""
+import hashlib
+import html
+import json
+import os
+from typing import NamedTuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+HAVE_NUMPY = np is not None
+
+RELATED_COUNT = 5
+# Build state namespace: url -> {"digest": ..., "k": ..., "neighbors": [[url, score], ...]}.
+RELATED_NAMESPACE = "related-posts"
+# What {{ Related }} becomes until the list for the page is known.
+RELATED_MARKER = "<!--fitz:related-->"
+# Scores are computed a batch of rows at a time, in a dense block of about
+# this many cells, from at most about this many gathered postings.
+BATCH_CELLS = 1 << 22
+BATCH_POSTINGS = 1 << 22
+FULL_RECOMPUTE_FRACTION = 0.25
+
+
+class Related(NamedTuple):
+    digest: str
+    # (url, cosine similarity), most similar first.
+    neighbors: list[tuple[str, float]]
+    # How many neighbours were asked for (at most one less than the pages).
+    k: int = 0
+
+
+def content_digest(terms: dict[str, int]) -> str:
+    data = json.dumps(sorted(terms.items()), separators=(",", ":")).encode("utf-8")
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _ranges(starts, lengths):
+    """Concatenated aranges [start, start + length) for each pair."""
+    offsets = np.cumsum(lengths) - lengths
+    return np.arange(lengths.sum()) - np.repeat(offsets - starts, lengths)
+
+
+class TermMatrix:
+    """Row-normalized TF-IDF weights in CSR form, with a CSC copy for gathering."""
+
+    def __init__(self, documents: list[dict[str, int]]):
+        vocabulary: dict[str, int] = {}
+        indptr, indices, counts = [0], [], []
+        for terms in documents:
+            for term, count in terms.items():
+                indices.append(vocabulary.setdefault(term, len(vocabulary)))
+                counts.append(count)
+            indptr.append(len(indices))
+        self.rows = len(documents)
+        self.indptr = np.array(indptr, dtype=np.int64)
+        self.indices = np.array(indices, dtype=np.int64)
+        lengths = np.diff(self.indptr)
+        self.row_of = np.repeat(np.arange(self.rows), lengths)
+
+        document_frequency = np.bincount(self.indices, minlength=len(vocabulary))
+        idf = np.log((1 + self.rows) / (1 + document_frequency)) + 1.0
+        data = (1.0 + np.log(np.array(counts, dtype=np.float64))) * idf[self.indices]
+        norms = np.sqrt(self._row_sums(data * data))
+        self.data = data / np.repeat(np.where(norms > 0, norms, 1.0), lengths)
+        # Postings a row gathers when it is scored.
+        self.row_costs = self._row_sums(document_frequency[self.indices])
+
+        order = np.argsort(self.indices, kind="stable")
+        self.col_rows = self.row_of[order]
+        self.col_data = self.data[order]
+        self.col_ptr = np.concatenate(([0], np.cumsum(document_frequency))).astype(np.int64)
+
+    def _row_sums(self, values) -> "np.ndarray":
+        """Sum of values (one per stored entry) for each row."""
+        sums = np.zeros(self.rows, dtype=values.dtype)
+        # reduceat would give an empty row its next row's first value, so
+        # only non-empty rows are reduced; their starts bound the segments.
+        nonempty = np.diff(self.indptr) > 0
+        if values.size:
+            sums[nonempty] = np.add.reduceat(values, self.indptr[:-1][nonempty])
+        return sums
+
+    def batches(self, rows, max_rows: int, max_postings: int):
+        """Split rows into runs of at most max_rows rows and about max_postings postings."""
+        total = np.cumsum(self.row_costs[rows])
+        start = 0
+        while start < len(rows):
+            limit = (total[start - 1] if start else 0) + max_postings
+            stop = int(np.searchsorted(total, limit, side="right"))
+            stop = max(start + 1, min(start + max_rows, stop))
+            yield rows[start:stop]
+            start = stop
+
+    def scores(self, rows) -> "np.ndarray":
+        """Cosine similarity of each of rows to every row, as a len(rows) x rows array."""
+        starts = self.indptr[rows]
+        lengths = self.indptr[rows + 1] - starts
+        entries = _ranges(starts, lengths)
+        terms = self.indices[entries]
+        weights = self.data[entries]
+        batch_rows = np.repeat(np.arange(len(rows)), lengths)
+
+        posting_starts = self.col_ptr[terms]
+        posting_lengths = self.col_ptr[terms + 1] - posting_starts
+        postings = _ranges(posting_starts, posting_lengths)
+        cells = np.repeat(batch_rows, posting_lengths) * self.rows + self.col_rows[postings]
+        products = self.col_data[postings] * np.repeat(weights, posting_lengths)
+        return np.bincount(cells, weights=products, minlength=len(rows) * self.rows).reshape(
+            len(rows), self.rows
+        )
+
+
+def _top_k(candidates, scores, k: int):
+    """The k best (candidate, score) pairs of each row, best first; ties by index."""
+    if candidates.shape[1] > k:
+        keep = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        candidates = np.take_along_axis(candidates, keep, axis=1)
+        scores = np.take_along_axis(scores, keep, axis=1)
+    order = np.lexsort((candidates, -scores), axis=1)
+    return np.take_along_axis(candidates, order, axis=1), np.take_along_axis(scores, order, axis=1)
+
+
+def related_posts(
+    documents: dict[str, dict[str, int]],
+    k: int = RELATED_COUNT,
+    previous: dict[str, Related] = None,
+) -> tuple[dict[str, Related], int]:
+    """Each page's k most similar pages, reusing previous results where possible.
+
+    documents maps url to term counts. Returns the results for every page
+    and the number of rows that were scored against all pages.
+    """
+    if np is None:
+        raise RuntimeError("related posts need NumPy")
+    urls = list(documents)
+    n = len(urls)
+    if n == 0:
+        return {}, 0
+    index = {url: i for i, url in enumerate(urls)}
+    digests = [content_digest(documents[url]) for url in urls]
+    previous = previous or {}
+    k = min(k, n - 1)
+    changed = np.array(
+        [url not in previous or previous[url].digest != digest for url, digest in zip(urls, digests)]
+    )
+
+    dirty = changed.copy()
+    for url, old in previous.items():
+        row = index.get(url)
+        if row is not None and not dirty[row]:
+            # A neighbour that changed or went away may leave a gap that an
+            # unchanged page should fill, so the row is scored from scratch;
+            # so is a row kept for fewer neighbours than are now asked for.
+            dirty[row] = old.k < k or any(
+                neighbor not in index or changed[index[neighbor]] for neighbor, _ in old.neighbors
+            )
+    if dirty.sum() > FULL_RECOMPUTE_FRACTION * n:
+        dirty[:] = True
+
+    matrix = TermMatrix([documents[url] for url in urls])
+    best_rows = np.zeros((n, k), dtype=np.int64)
+    best_scores = np.zeros((n, k))
+
+    # Clean rows start from their stored neighbours and take in the scores
+    # of changed pages as those pages' rows are computed.
+    clean = np.flatnonzero(~dirty)
+    for row in clean:
+        neighbors = previous[urls[row]].neighbors[:k]
+        best_rows[row, : len(neighbors)] = [index[url] for url, _ in neighbors]
+        best_scores[row, : len(neighbors)] = [score for _, score in neighbors]
+
+    dirty_rows = np.flatnonzero(dirty)
+    for rows in matrix.batches(dirty_rows, max(1, BATCH_CELLS // n), BATCH_POSTINGS):
+        scores = matrix.scores(rows)
+        scores[np.arange(len(rows)), rows] = 0.0
+        if k:
+            candidates = np.broadcast_to(np.arange(n), scores.shape)
+            best_rows[rows], best_scores[rows] = _top_k(candidates, scores, k)
+            changed_rows = rows[changed[rows]]
+            if len(clean) and len(changed_rows):
+                incoming = scores[changed[rows]][:, clean].T
+                best_rows[clean], best_scores[clean] = _top_k(
+                    np.hstack([best_rows[clean], np.broadcast_to(changed_rows, incoming.shape)]),
+                    np.hstack([best_scores[clean], incoming]),
+                    k,
+                )
+
+    results = {}
+    for row, url in enumerate(urls):
+        neighbors = [
+            (urls[other], round(float(score), 6))
+            for other, score in zip(best_rows[row], best_scores[row])
+            if score > 0
+        ]
+        results[url] = Related(digests[row], neighbors, k)
+    return results, len(dirty_rows)
+
+
+def load_related(state) -> dict[str, Related]:
+    """Results of the previous build, from a BuildState."""
+    results = {}
+    for url, value in state.cache_items(RELATED_NAMESPACE).items():
+        data = json.loads(value)
+        neighbors = [tuple(pair) for pair in data["neighbors"]]
+        results[url] = Related(data["digest"], neighbors, data.get("k", 0))
+    return results
+
+
+def save_related(state, results: dict[str, Related]) -> None:
+    state.cache_clear(RELATED_NAMESPACE)
+    state.cache_put_many(
+        RELATED_NAMESPACE,
+        {
+            url: json.dumps(related._asdict()).encode("utf-8")
+            for url, related in results.items()
+        },
+    )
+
+
+def mark_related(template: str) -> str:
+    """Leave RELATED_MARKER where the template asks for {{ Related }}."""
+    return template.replace("{{ Related }}", RELATED_MARKER)
+
+
+def related_html(related: Related, titles: dict[str, str]) -> str:
+    if not related.neighbors:
+        return ""
+    items = "".join(
+        f'<li><a href="{html.escape(url)}">{html.escape(titles.get(url) or url)}</a></li>'
+        for url, _ in related.neighbors
+    )
+    return f'<nav class="related"><h2>Related posts</h2><ul>{items}</ul></nav>'
+
+
+def output_path(public_dir: str, url: str) -> str:
+    """The file a page URL (as generate.page_url makes them) is written to."""
+    rel_path = url.lstrip("/")
+    if not rel_path or rel_path.endswith("/"):
+        rel_path += "index.html"
+    return os.path.join(public_dir, *rel_path.split("/"))
+
+
+def fill_related(public_dir: str, results: dict[str, Related], titles: dict[str, str]) -> int:
+    """Replace RELATED_MARKER in every page with its list; returns the pages filled."""
+    filled = 0
+    for url, related in results.items():
+        path = output_path(public_dir, url)
+        with open(path, encoding="utf-8") as f:
+            page = f.read()
+        if RELATED_MARKER not in page:
+            continue
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(page.replace(RELATED_MARKER, related_html(related, titles)))
+        filled += 1
+    return filled
@@ -0,0 +1,215 @@
+import json
+import os
+import re
+from collections import Counter
+from typing import Iterator
+
+from htmlnode import HtmlNode
+
+TOKEN_PATTERN = re.compile(r"[^\W_]+")
+MIN_TOKEN_LENGTH = 2
+SHARD_PREFIX_LENGTH = 2
+PAGES_FILE = "pages.json"
+
+
+def node_text(node: HtmlNode) -> Iterator[str]:
+    """Yield the text content of a rendered tree: leaf values and image alt text."""
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if current.children:
+            stack.extend(reversed(current.children))
+            continue
+        if current.value:
+            yield current.value
+        elif current.tag == "img" and current.props:
+            yield current.props.get("alt", "")
+
+
+def tokenize(text: str) -> list[str]:
+    return [
+        token
+        for token in TOKEN_PATTERN.findall(text.lower())
+        if len(token) >= MIN_TOKEN_LENGTH
+    ]
+
+
+def count_terms(node: HtmlNode) -> Counter:
+    """Count the search terms in a rendered tree; counts of parts add up."""
+    terms = Counter()
+    for text in node_text(node):
+        terms.update(tokenize(text))
+    return terms
+
+
+def shard_name(token: str) -> str:
+    """Return the shard a token lives in, safe for use as a file name."""
+    prefix = token[:SHARD_PREFIX_LENGTH]
+    if prefix.isascii():
+        return prefix
+    return "u" + prefix.encode("utf-8").hex()
+
+
+class SearchIndex:
+    """An inverted index of page text, written as prefix-sharded JSON.
+
+    The output directory holds pages.json (page URLs and titles, indexed by
+    page id, plus the list of shards) and one <shard>.json per token prefix
+    mapping each token to a flat [page_id, term_frequency, ...] list. The
+    browser fetches pages.json once and a shard only when a query needs it.
+    """
+
+    def __init__(self):
+        self.pages: list[list[str] | None] = []
+        self.postings: dict[str, dict[str, dict[int, int]]] = {}
+        self._ids: dict[str, int] = {}
+        self._page_terms: dict[int, Counter] = {}
+        self._dirty_shards: set[str] = set()
+        self._listed_shards: list[str] = []
+        self._pages_dirty = False
+
+    def add_page(self, url: str, node: HtmlNode, title: str = "") -> None:
+        """Index (or re-index) a page from its rendered tree."""
+        self.add_page_terms(url, count_terms(node), title)
+
+    def add_page_terms(self, url: str, terms: Counter, title: str = "") -> None:
+        """Index (or re-index) a page from its term counts (see count_terms)."""
+        page_id = self._ids.get(url)
+        if page_id is None:
+            page_id = self._ids[url] = len(self.pages)
+            self.pages.append([url, title])
+            self._pages_dirty = True
+        elif self.pages[page_id][1] != title:
+            self.pages[page_id][1] = title
+            self._pages_dirty = True
+
+        old_terms = self._page_terms.get(page_id, Counter())
+        for token in old_terms.keys() | terms.keys():
+            count = terms.get(token, 0)
+            if old_terms.get(token, 0) == count:
+                continue
+            self._set_posting(token, page_id, count)
+        self._page_terms[page_id] = terms
+
+    def documents(self) -> dict[str, tuple[str, Counter]]:
+        """url -> (title, term counts) for every indexed page."""
+        return {
+            page[0]: (page[1], self._page_terms.get(page_id, Counter()))
+            for page_id, page in enumerate(self.pages)
+            if page is not None
+        }
+
+    def remove_page(self, url: str) -> None:
+        page_id = self._ids.pop(url, None)
+        if page_id is None:
+            return
+        for token in self._page_terms.pop(page_id, ()):
+            self._set_posting(token, page_id, 0)
+        self.pages[page_id] = None
+        self._pages_dirty = True
+
+    def merge(self, other: "SearchIndex") -> None:
+        """Add every page of another index (e.g. one build shard's) to this one."""
+        for page_id, page in enumerate(other.pages):
+            if page is None:
+                continue
+            url, title = page
+            if url in self._ids:
+                raise ValueError(f"Page {url} is indexed twice")
+            new_id = self._ids[url] = len(self.pages)
+            self.pages.append([url, title])
+            self._pages_dirty = True
+            terms = other._page_terms.get(page_id, Counter())
+            for token, count in terms.items():
+                self._set_posting(token, new_id, count)
+            self._page_terms[new_id] = Counter(terms)
+
+    def _set_posting(self, token: str, page_id: int, count: int) -> None:
+        shard = shard_name(token)
+        tokens = self.postings.setdefault(shard, {})
+        docs = tokens.setdefault(token, {})
+        if count:
+            docs[page_id] = count
+        else:
+            docs.pop(page_id, None)
+            if not docs:
+                del tokens[token]
+            if not tokens:
+                del self.postings[shard]
+        self._dirty_shards.add(shard)
+
+    def write(self, out_dir: str) -> list[str]:
+        """Write shards changed since the last load or write.
+
+        Returns the names of the files written. Shards whose file is missing
+        from out_dir are written as well, so a fresh directory gets everything.
+        """
+        os.makedirs(out_dir, exist_ok=True)
+        written = []
+        for shard in sorted(self.postings):
+            path = os.path.join(out_dir, f"{shard}.json")
+            if shard not in self._dirty_shards and os.path.exists(path):
+                continue
+            data = {
+                token: [value for page_id in sorted(docs) for value in (page_id, docs[page_id])]
+                for token, docs in sorted(self.postings[shard].items())
+            }
+            _write_json(path, data)
+            written.append(f"{shard}.json")
+
+        for shard in self._dirty_shards - self.postings.keys():
+            path = os.path.join(out_dir, f"{shard}.json")
+            if os.path.exists(path):
+                os.remove(path)
+
+        shards = sorted(self.postings)
+        pages_path = os.path.join(out_dir, PAGES_FILE)
+        if self._pages_dirty or shards != self._listed_shards or not os.path.exists(pages_path):
+            data = {
+                "prefix_length": SHARD_PREFIX_LENGTH,
+                "pages": self.pages,
+                "shards": shards,
+            }
+            _write_json(pages_path, data)
+            written.append(PAGES_FILE)
+            self._listed_shards = shards
+
+        self._dirty_shards.clear()
+        self._pages_dirty = False
+        return written
+
+    @classmethod
+    def load(cls, out_dir: str) -> "SearchIndex":
+        """Load a previously written index so it can be updated incrementally."""
+        index = cls()
+        pages_path = os.path.join(out_dir, PAGES_FILE)
+        if not os.path.exists(pages_path):
+            return index
+
+        with open(pages_path, encoding="utf-8") as f:
+            data = json.load(f)
+        index.pages = data["pages"]
+        index._listed_shards = data["shards"]
+        for page_id, page in enumerate(index.pages):
+            if page is not None:
+                index._ids[page[0]] = page_id
+                index._page_terms[page_id] = Counter()
+
+        for shard in data["shards"]:
+            with open(os.path.join(out_dir, f"{shard}.json"), encoding="utf-8") as f:
+                tokens = json.load(f)
+            index.postings[shard] = {}
+            for token, flat in tokens.items():
+                docs = dict(zip(flat[::2], flat[1::2]))
+                index.postings[shard][token] = docs
+                for page_id, count in docs.items():
+                    index._page_terms[page_id][token] = count
+        return index
+
+
+def _write_json(path: str, data) -> None:
+    # Replace rather than overwrite: the build hardlinks these files into public/.
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp_path, path)
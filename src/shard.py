@@ -0,0 +1,110 @@
+import hashlib
+import json
+import os
+import shutil
+
+from search_index import SearchIndex
+
+MANIFEST_FILE = ".shard-manifest.json"
+SEARCH_DIR = "search"
+
+
+def parse_shard(spec: str) -> tuple[int, int]:
+    """Parse an "i/N" shard spec (1-based) into (i, N)."""
+    index, sep, count = spec.partition("/")
+    if not sep or not index.isdigit() or not count.isdigit():
+        raise ValueError(f"Invalid shard spec '{spec}', expected i/N")
+    index, count = int(index), int(count)
+    if not 1 <= index <= count:
+        raise ValueError(f"Shard index must be between 1 and {count}: '{spec}'")
+    return index, count
+
+
+def in_shard(rel_path: str, shard: tuple[int, int]) -> bool:
+    """Whether a source path belongs to the given shard.
+
+    Assignment hashes the '/'-separated path, so it is the same on every
+    machine and independent of directory listing order.
+    """
+    index, count = shard
+    key = rel_path.replace(os.sep, "/").encode("utf-8")
+    digest = hashlib.sha1(key).digest()
+    return int.from_bytes(digest[:8], "big") % count == index - 1
+
+
+def file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def output_manifest(out_dir: str) -> dict[str, str]:
+    """Map every file under out_dir ('/'-separated relative path) to its sha256.
+
+    Every file is hashed: outputs are rewritten on each build, so their stat
+    says nothing about whether their content changed.
+    """
+    manifest = {}
+    for dirpath, _, filenames in os.walk(out_dir):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            rel_path = os.path.relpath(path, out_dir).replace(os.sep, "/")
+            if rel_path != MANIFEST_FILE:
+                manifest[rel_path] = file_digest(path)
+    return manifest
+
+
+def write_shard_manifest(out_dir: str, shard: tuple[int, int]) -> dict:
+    manifest = {"shard": shard[0], "count": shard[1], "files": output_manifest(out_dir)}
+    with open(os.path.join(out_dir, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+def merge_shards(part_dirs: list[str], dest_dir: str) -> dict[str, str]:
+    """Combine the outputs of every shard of a build into dest_dir.
+
+    Each part must contain the manifest written by its shard, and together
+    the parts must cover shards 1..N exactly once. Files are copied as listed
+    in the manifests; per-shard search indexes are merged into one. Returns
+    the combined manifest.
+    """
+    manifests = []
+    for part_dir in part_dirs:
+        with open(os.path.join(part_dir, MANIFEST_FILE), encoding="utf-8") as f:
+            manifests.append(json.load(f))
+
+    counts = {manifest["count"] for manifest in manifests}
+    if len(counts) != 1:
+        raise ValueError(f"Shards come from builds with different counts: {sorted(counts)}")
+    count = counts.pop()
+    shards = sorted(manifest["shard"] for manifest in manifests)
+    if shards != list(range(1, count + 1)):
+        raise ValueError(f"Expected shards 1..{count} exactly once, got {shards}")
+
+    if os.path.exists(dest_dir):
+        shutil.rmtree(dest_dir)
+    os.makedirs(dest_dir)
+
+    merged = {}
+    search_index = SearchIndex()
+    for part_dir, manifest in zip(part_dirs, manifests):
+        for rel_path, digest in manifest["files"].items():
+            if rel_path.startswith(SEARCH_DIR + "/"):
+                continue
+            if merged.get(rel_path, digest) != digest:
+                raise ValueError(f"Shards disagree on the contents of {rel_path}")
+            merged[rel_path] = digest
+            dst_path = os.path.join(dest_dir, *rel_path.split("/"))
+            os.makedirs(os.path.dirname(dst_path), exist_ok=True)
+            shutil.copy(os.path.join(part_dir, *rel_path.split("/")), dst_path)
+        search_index.merge(SearchIndex.load(os.path.join(part_dir, SEARCH_DIR)))
+
+    if search_index.pages:
+        search_dir = os.path.join(dest_dir, SEARCH_DIR)
+        search_index.write(search_dir)
+        for rel_path, digest in output_manifest(search_dir).items():
+            merged[f"{SEARCH_DIR}/{rel_path}"] = digest
+    return merged
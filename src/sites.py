@@ -0,0 +1,122 @@
+"""Build several sites (locales, branded variants) in one run.
+
+A sites file is JSON, with paths relative to the file:
+
+    {
+      "shared_static": "shared",
+      "sites": [
+        {"name": "en", "content": "content/en", "output": "public/en"},
+        {"name": "de", "content": "content/de", "output": "public/de",
+         "static": "static/de", "template": "template.de.html"}
+      ]
+    }
+
+"static" and "template" default to the project's static/ and template.html,
+"output" to public/<name>.
+Sites are built one after another in one process, so the render, inline
+and highlight caches filled by one site serve the next. The shared_static
+tree is copied once into the build state directory and hardlinked into
+every site's output; a site's own static files take precedence over it.
+"""
+import json
+import os
+import shutil
+from typing import NamedTuple
+
+from shard import in_shard
+
+
+class Site(NamedTuple):
+    name: str
+    content_dir: str
+    static_dir: str
+    template_path: str
+    public_dir: str
+
+
+def default_site(project_root: str) -> Site:
+    """The single site of a project laid out as content/, static/ and template.html."""
+    return Site(
+        "",
+        os.path.join(project_root, "content"),
+        os.path.join(project_root, "static"),
+        os.path.join(project_root, "template.html"),
+        os.path.join(project_root, "public"),
+    )
+
+
+def load_sites(path: str, project_root: str) -> tuple[list[Site], str | None]:
+    """Read a sites file; returns the sites and the shared static directory, if any."""
+    with open(path, encoding="utf-8") as f:
+        config = json.load(f)
+    base = os.path.dirname(os.path.abspath(path))
+    defaults = default_site(project_root)
+
+    def resolve(value: str | None, default: str) -> str:
+        return os.path.join(base, value) if value is not None else default
+
+    sites = []
+    for entry in config["sites"]:
+        name = entry["name"]
+        if not name or os.path.basename(name) != name or name in (".", ".."):
+            raise ValueError(f"Invalid site name {name!r}: must be a plain directory name")
+        if any(site.name == name for site in sites):
+            raise ValueError(f"Duplicate site name {name!r}")
+        sites.append(
+            Site(
+                name,
+                resolve(entry["content"], defaults.content_dir),
+                resolve(entry.get("static"), defaults.static_dir),
+                resolve(entry.get("template"), defaults.template_path),
+                resolve(entry.get("output"), os.path.join(defaults.public_dir, name)),
+            )
+        )
+    shared_static = config.get("shared_static")
+    return sites, (os.path.join(base, shared_static) if shared_static else None)
+
+
+def stage_tree(src_dir: str, stage_dir: str) -> str:
+    """Replace stage_dir with a copy of src_dir and return it."""
+    if os.path.exists(stage_dir):
+        shutil.rmtree(stage_dir)
+    shutil.copytree(src_dir, stage_dir)
+    return stage_dir
+
+
+def link_tree(
+    src_dir: str, dest_dir: str, shard: tuple[int, int] = None
+) -> tuple[int, int]:
+    """Hardlink every file under src_dir into dest_dir, skipping files already there.
+
+    Files are copied instead where a hardlink cannot be made (another
+    filesystem, or one without links). When shard is given, only files in
+    that partition are linked. Returns (linked, copied).
+    """
+    linked = copied = 0
+    for dirpath, _, filenames in os.walk(src_dir):
+        rel_dir = os.path.relpath(dirpath, src_dir)
+        for filename in sorted(filenames):
+            rel_path = os.path.normpath(os.path.join(rel_dir, filename))
+            if shard is not None and not in_shard(rel_path, shard):
+                continue
+            dst_path = os.path.join(dest_dir, rel_path)
+            if os.path.exists(dst_path):
+                continue
+            os.makedirs(os.path.dirname(dst_path), exist_ok=True)
+            src_path = os.path.join(dirpath, filename)
+            try:
+                os.link(src_path, dst_path)
+                linked += 1
+            except OSError:
+                shutil.copy2(src_path, dst_path)
+                copied += 1
+    return linked, copied
+
+
+def find_static(rel_path: str, static_dirs: list[str]) -> str | None:
+    """The first of static_dirs holding rel_path, as a full path."""
+    for static_dir in static_dirs:
+        path = os.path.join(static_dir, rel_path)
+        if os.path.isfile(path):
+            return path
+    return None
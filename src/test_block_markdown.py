@@ -1,6 +1,13 @@
+import os
+import tempfile
 import unittest
 
-from block_markdown import BlockType, block_to_block_type, markdown_to_blocks
+from block_markdown import (
+    BlockType,
+    block_to_block_type,
+    markdown_file_to_blocks,
+    markdown_to_blocks,
+)
 
 
 class TestBlockToBlockType(unittest.TestCase):
@@ -56,6 +63,14 @@ class TestBlockToBlockType(unittest.TestCase):
         block = "```\nunclosed code block"
         self.assertEqual(block_to_block_type(block), BlockType.PARAGRAPH)
 
+    def test_code_block_with_info_string(self):
+        block = "```python {linenos}\nx = 1\n```"
+        self.assertEqual(block_to_block_type(block), BlockType.CODE)
+
+    def test_code_block_not_code_backtick_in_info_string(self):
+        block = "```a`b\nx = 1\n```"
+        self.assertEqual(block_to_block_type(block), BlockType.PARAGRAPH)
+
     def test_quote_block_single_line(self):
         block = "> This is a quote"
         self.assertEqual(block_to_block_type(block), BlockType.QUOTE)
@@ -145,3 +160,37 @@ This is the same paragraph on a new line
                 "- This is a list\n- with items",
             ],
         )
+
+    def test_crlf_line_endings(self):
+        self.assertEqual(
+            markdown_to_blocks("# T\r\n\r\npara\r\nline\r\n\r\n- a"),
+            ["# T", "para\nline", "- a"],
+        )
+
+
+class TestMarkdownFileToBlocks(unittest.TestCase):
+    def blocks(self, data: bytes, offset: int = 0) -> list[str]:
+        with tempfile.NamedTemporaryFile(suffix=".md", delete=False) as f:
+            f.write(data)
+        try:
+            return list(markdown_file_to_blocks(f.name, offset))
+        finally:
+            os.remove(f.name)
+
+    def test_matches_markdown_to_blocks(self):
+        for text in (
+            "# T\n\npara\nline\n\n\n- a\n",
+            "# T\r\n\r\npara\r\nline\r\n\r\n- a",
+            "no separators",
+            "\n\n\n\n",
+        ):
+            with self.subTest(text=text):
+                self.assertEqual(self.blocks(text.encode()), markdown_to_blocks(text))
+
+    def test_offset_skips_leading_bytes(self):
+        data = b"---\r\ntitle: x\r\n---\r\n# T\r\n\r\nbody"
+        offset = data.index(b"# T")
+        self.assertEqual(self.blocks(data, offset), ["# T", "body"])
+
+    def test_empty_file(self):
+        self.assertEqual(self.blocks(b""), [])
@@ -0,0 +1,95 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+from build_state import BuildState
+from shard import output_manifest
+
+
+def _put_entries(db_path: str, worker: int) -> None:
+    with BuildState(db_path) as state:
+        for batch in range(5):
+            state.cache_put_many(
+                "pages", {f"{worker}-{batch}-{i}": b"x" * i for i in range(20)}
+            )
+
+
+class TestBuildState(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, "state", "state.sqlite3")
+        self.state = BuildState(self.db_path)
+
+    def tearDown(self):
+        self.state.close()
+        self.tmp.cleanup()
+
+    def test_wal_mode(self):
+        mode = self.state.db.execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(mode, "wal")
+
+    def test_drops_stat_keyed_digests(self):
+        self.state.close()
+        db = sqlite3.connect(self.db_path)
+        db.execute("CREATE TABLE file_hashes (path TEXT PRIMARY KEY, digest TEXT)")
+        db.commit()
+        db.close()
+        self.state = BuildState(self.db_path)
+        tables = [row[0] for row in self.state.db.execute("SELECT name FROM sqlite_master")]
+        self.assertNotIn("file_hashes", tables)
+
+    def test_update_outputs(self):
+        delta = self.state.update_outputs({"a.html": "1", "b.html": "2"})
+        self.assertEqual(delta, (["a.html", "b.html"], [], []))
+
+        delta = self.state.update_outputs({"a.html": "1", "b.html": "4", "c.html": "3"})
+        self.assertEqual(delta, (["c.html"], ["b.html"], []))
+
+        delta = self.state.update_outputs({"a.html": "1", "c.html": "3"})
+        self.assertEqual(delta, ([], [], ["b.html"]))
+        self.assertEqual(self.state.outputs(), {"a.html": "1", "c.html": "3"})
+        self.assertEqual(self.state.output_digest("c.html"), "3")
+        self.assertIsNone(self.state.output_digest("b.html"))
+
+    def test_output_manifest_sees_same_size_rewrite(self):
+        out_dir = os.path.join(self.tmp.name, "public")
+        os.makedirs(out_dir)
+        path = os.path.join(out_dir, "index.html")
+        with open(path, "w") as f:
+            f.write("one")
+        stat = os.stat(path)
+        first = output_manifest(out_dir)
+        with open(path, "w") as f:
+            f.write("two")
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        self.assertNotEqual(output_manifest(out_dir), first)
+
+    def test_cache_entries(self):
+        self.state.cache_put("images", "a.png", b"\x01")
+        self.state.cache_put_many("images", {"b.png": b"\x02"})
+        self.assertEqual(self.state.cache_get("images", "a.png"), b"\x01")
+        self.assertIsNone(self.state.cache_get("pages", "a.png"))
+        self.assertEqual(
+            self.state.cache_items("images"), {"a.png": b"\x01", "b.png": b"\x02"}
+        )
+        self.state.cache_clear("images")
+        self.assertIsNone(self.state.cache_get("images", "b.png"))
+
+    def test_failed_transaction_rolls_back(self):
+        with self.assertRaises(RuntimeError):
+            with self.state.transaction() as db:
+                db.execute("INSERT INTO outputs VALUES ('a.html', '1')")
+                raise RuntimeError
+        self.assertEqual(self.state.outputs(), {})
+
+    def test_concurrent_writers(self):
+        with ProcessPoolExecutor(max_workers=4) as pool:
+            list(pool.map(_put_entries, [self.db_path] * 4, range(4)))
+        count = self.state.db.execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0]
+        self.assertEqual(count, 4 * 5 * 20)
+
+
+if __name__ == "__main__":
+    unittest.main()
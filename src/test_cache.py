@@ -0,0 +1,74 @@
+import unittest
+
+from cache import LRUCache
+
+
+class TestLRUCache(unittest.TestCase):
+    def test_get_put(self):
+        cache = LRUCache(maxsize=2)
+        cache.put("a", 1)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(maxsize=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertIn("c", cache)
+
+    def test_info_counts_hits_and_misses(self):
+        cache = LRUCache(maxsize=4)
+        cache.put("a", 1)
+        cache.get("a")
+        cache.get("missing")
+        info = cache.info()
+        self.assertEqual((info.hits, info.misses, info.currsize), (1, 1, 1))
+        self.assertEqual(info.hit_rate, 0.5)
+        self.assertEqual(LRUCache().info().hit_rate, 0.0)
+
+    def test_invalid_maxsize(self):
+        with self.assertRaises(ValueError):
+            LRUCache(maxsize=0)
+
+    def test_byte_budget_evicts_least_recently_used(self):
+        cache = LRUCache(maxsize=100, maxbytes=25, sizeof=lambda key, value: len(value))
+        cache.put("a", "x" * 10)
+        cache.put("b", "x" * 10)
+        cache.get("a")
+        cache.put("c", "x" * 10)
+        self.assertEqual([key in cache for key in "abc"], [True, False, True])
+        self.assertEqual(cache.info().currbytes, 20)
+
+        cache.put("a", "x" * 16)
+        self.assertEqual([key in cache for key in "abc"], [True, False, False])
+        self.assertEqual(cache.info().currbytes, 16)
+
+    def test_oversized_entry_not_stored(self):
+        cache = LRUCache(maxbytes=10, sizeof=lambda key, value: len(value))
+        cache.put("a", "small")
+        cache.put("a", "x" * 11)
+        self.assertNotIn("a", cache)
+        self.assertEqual(cache.info().currbytes, 0)
+
+    def test_resize_to_byte_budget(self):
+        cache = LRUCache(maxsize=100, sizeof=lambda key, value: len(value))
+        for key in "abcd":
+            cache.put(key, "x" * 10)
+        cache.resize(maxbytes=20)
+        self.assertEqual([key in cache for key in "abcd"], [False, False, True, True])
+        self.assertEqual(cache.info().currbytes, 20)
+
+        cache.resize(maxsize=50)
+        self.assertEqual(cache.maxbytes, 20)
+        cache.resize(maxbytes=None)
+        cache.put("e", "x" * 30)
+        self.assertEqual([key in cache for key in "cde"], [True, True, True])
+        self.assertEqual(cache.info()[4:], (None, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
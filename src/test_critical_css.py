@@ -0,0 +1,91 @@
+import unittest
+
+import critical_css
+from critical_css import CriticalCss, parse_css, selector_may_match
+from markdown import markdown_to_html_node
+from transforms import Pipeline
+
+STYLESHEET = """
+@charset "utf-8";
+/* comment { with braces } */
+body { margin: 0; }
+h1, h2 { color: red; }
+pre code, blockquote p { padding: 0; }
+.toc > ul li { list-style: none; }
+a:hover { color: blue; }
+.missing { display: none; }
+@media (max-width: 600px) {
+  h2 { font-size: 1em; }
+  table { width: 100%; }
+}
+@keyframes pulse { from { opacity: 0; } to { opacity: 1; } }
+@font-face { font-family: "X"; src: url(x.woff2); }
+"""
+
+TEMPLATE = '<html><head><link href="/index.css" rel="stylesheet" /></head><body>{{ Content }}</body></html>'
+
+
+class TestParseCss(unittest.TestCase):
+    def test_rules_and_nesting(self):
+        rules = parse_css(STYLESHEET)
+        self.assertEqual(rules[0].prelude, "body")
+        self.assertEqual(rules[0].body, "margin: 0;")
+        media = rules[6]
+        self.assertEqual(media.prelude, "@media (max-width: 600px)")
+        self.assertEqual([rule.prelude for rule in media.body], ["h2", "table"])
+        self.assertEqual(rules[7].prelude, "@keyframes pulse")
+        self.assertEqual(len(rules), 9)
+
+
+class TestSelectorMayMatch(unittest.TestCase):
+    def test_matching(self):
+        features = frozenset({"p", "a", ".note", "#intro", "div"})
+        self.assertTrue(selector_may_match("a:hover", features))
+        self.assertTrue(selector_may_match("div > p.note", features))
+        self.assertTrue(selector_may_match("P#intro", features))
+        self.assertTrue(selector_may_match("*", features))
+        self.assertTrue(selector_may_match("a[target=_blank]", features))
+        self.assertFalse(selector_may_match("ul li", features))
+        self.assertFalse(selector_may_match("p.Note", features))
+
+
+class TestCriticalCss(unittest.TestCase):
+    def setUp(self):
+        critical_css.critical_cache.clear()
+        self.plugin = CriticalCss(STYLESHEET, "/index.css", TEMPLATE)
+        self.pipeline = Pipeline([self.plugin])
+
+    def test_inlines_matching_rules(self):
+        self.pipeline.run(markdown_to_html_node("Some [link](/x)"), "/")
+        self.assertEqual(
+            self.plugin.head_html("/"),
+            '<style>body{margin:0}a:hover{color:blue}@font-face{font-family:"X";src:url(x.woff2)}</style>',
+        )
+
+    def test_headings_bring_in_toc_and_media_rules(self):
+        self.pipeline.run(markdown_to_html_node("## Title\n\n```\nx\n```"), "/")
+        self.assertEqual(
+            self.plugin.css,
+            "body{margin:0}h2{color:red}pre code{padding:0}.toc>ul li{list-style:none}"
+            "a:hover{color:blue}@media (max-width:600px){h2{font-size:1em}}"
+            '@font-face{font-family:"X";src:url(x.woff2)}',
+        )
+
+    def test_pages_with_the_same_features_share_a_cache_entry(self):
+        for i in range(3):
+            self.pipeline.run(markdown_to_html_node(f"## Heading {i}\n\nText"), f"/{i}.html")
+        info = critical_css.critical_cache.info()
+        self.assertEqual((info.misses, info.hits), (1, 2))
+
+    def test_defer_stylesheet(self):
+        self.assertEqual(
+            self.plugin.defer_stylesheet(TEMPLATE),
+            '<html><head><link href="/index.css" rel="stylesheet" media="print" '
+            "onload=\"this.media='all'\" /><noscript><link href=\"/index.css\" "
+            'rel="stylesheet" /></noscript></head><body>{{ Content }}</body></html>',
+        )
+        self.assertEqual(self.plugin.defer_stylesheet("<html></html>"), "<html></html>")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from daemon import request_build, send_request, serve
+from htmlnode import render_cache
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Seconds to wait for the server to start listening.
+STARTUP_TIMEOUT = 10
+
+
+class TestBuildDaemon(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.project_root = self.tmp.name
+        shutil.copytree(os.path.join(PROJECT_ROOT, "static"), os.path.join(self.project_root, "static"))
+        shutil.copy(os.path.join(PROJECT_ROOT, "template.html"), self.project_root)
+        os.mkdir(os.path.join(self.project_root, "content"))
+        with open(os.path.join(self.project_root, "content", "index.md"), "w") as f:
+            f.write("# Home\n\nHello")
+
+        self.socket_path = os.path.join(self.project_root, "daemon.sock")
+        self.thread = threading.Thread(target=serve, args=(self.socket_path, self.project_root))
+        self.thread.start()
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        while not os.path.exists(self.socket_path):
+            if not self.thread.is_alive() or time.monotonic() > deadline:
+                self.tmp.cleanup()
+                self.fail("Build daemon did not start")
+            self.thread.join(0.01)
+
+    def tearDown(self):
+        send_request({"command": "stop"}, self.socket_path)
+        self.thread.join()
+        self.tmp.cleanup()
+
+    def test_build_returns_structured_result(self):
+        response = request_build([], self.socket_path)
+        self.assertTrue(response["ok"])
+        self.assertEqual(response["result"]["pages"], ["/"])
+        self.assertIn("Generating page", response["log"])
+        self.assertTrue(os.path.exists(os.path.join(self.project_root, "public", "index.html")))
+
+        again = request_build([], self.socket_path)
+        self.assertTrue(again["ok"])
+
+    def test_build_error_is_reported(self):
+        with open(os.path.join(self.project_root, "content", "index.md"), "w") as f:
+            f.write("no title")
+        response = request_build([], self.socket_path)
+        self.assertFalse(response["ok"])
+        self.assertIn("No h1 heading", response["error"])
+
+    def test_relative_paths_resolve_against_client_cwd(self):
+        client_dir = os.path.join(self.project_root, "client")
+        os.mkdir(client_dir)
+        with open(os.path.join(client_dir, "sites.json"), "w") as f:
+            json.dump({"sites": [{"name": "en", "content": "../content", "output": "../out"}]}, f)
+        request = {"command": "build", "argv": ["--sites", "sites.json"], "cwd": client_dir}
+        response = send_request(request, self.socket_path)
+        self.assertTrue(response["ok"], response.get("error"))
+        self.assertTrue(os.path.exists(os.path.join(self.project_root, "out", "index.html")))
+
+    def test_memory_budget_ends_with_its_build(self):
+        maxbytes = render_cache.maxbytes
+        response = request_build(["--max-memory", "1M"], self.socket_path)
+        self.assertTrue(response["ok"])
+        self.assertEqual(response["result"]["caches"]["render"]["maxbytes"], 1 << 18)
+        self.assertEqual(render_cache.maxbytes, maxbytes)
+
+    def test_invalid_arguments(self):
+        response = request_build(["--shard", "9/2"], self.socket_path)
+        self.assertFalse(response["ok"])
+
+
+if __name__ == "__main__":
+    unittest.main()
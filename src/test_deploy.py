@@ -0,0 +1,124 @@
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from build_state import OutputDelta, diff_manifests
+from deploy import apply_archive, read_delta, sync_directory, write_archive
+from main import STATE_DIR, build, parse_args
+from shard import output_manifest
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestDiffManifests(unittest.TestCase):
+    def test_diff(self):
+        delta = diff_manifests({"a": "1", "b": "2", "c": "3"}, {"a": "1", "b": "4", "d": "5"})
+        self.assertEqual(delta, OutputDelta(["d"], ["b"], ["c"]))
+
+
+class TestDeploy(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.project_root = os.path.join(self.tmp.name, "site")
+        shutil.copytree(
+            os.path.join(PROJECT_ROOT, "static"), os.path.join(self.project_root, "static")
+        )
+        shutil.copy(os.path.join(PROJECT_ROOT, "template.html"), self.project_root)
+        os.makedirs(os.path.join(self.project_root, "content", "blog"))
+        self.write("index.md", "# Home\n\nHello")
+        self.write("blog/post.md", "# Post\n\nWords")
+        self.write("blog/old.md", "# Old\n\nGone soon")
+        self.public_dir = os.path.join(self.project_root, "public")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, rel_path: str, markdown: str) -> None:
+        with open(os.path.join(self.project_root, "content", rel_path), "w") as f:
+            f.write(markdown)
+
+    def build(self, *argv: str) -> dict:
+        with contextlib.redirect_stdout(io.StringIO()):
+            return build(parse_args(list(argv)), self.project_root)
+
+    def rebuild_with_changes(self) -> str:
+        """Build, keep a copy as the deployed target, change the content and build again."""
+        self.build()
+        target = os.path.join(self.tmp.name, "target")
+        shutil.copytree(self.public_dir, target)
+        self.write("blog/post.md", "# Post\n\nMore words")
+        self.write("about.md", "# About")
+        os.remove(os.path.join(self.project_root, "content", "blog", "old.md"))
+        return target
+
+    def test_build_reports_delta(self):
+        first = self.build()
+        self.assertEqual(first["outputs"]["added"], first["outputs"]["total"])
+        self.rebuild_with_changes()
+        result = self.build()
+
+        delta = read_delta(os.path.join(self.project_root, STATE_DIR, "delta.json"))
+        self.assertIn("about.html", delta.added)
+        self.assertIn("blog/post.html", delta.changed)
+        self.assertNotIn("index.html", delta.changed)
+        self.assertIn("blog/old.html", delta.deleted)
+        self.assertEqual(result["outputs"]["changed"], len(delta.changed))
+
+    def test_archives_reproduce_the_build(self):
+        for extension in ("zip", "tar", "tar.gz"):
+            with self.subTest(extension=extension):
+                target = self.rebuild_with_changes()
+                archive = os.path.join(self.tmp.name, f"changes.{extension}")
+                result = self.build("--deploy-archive", archive)
+
+                delta = apply_archive(archive, target)
+                self.assertEqual(result["outputs"]["added"], len(delta.added))
+                self.assertEqual(output_manifest(target), output_manifest(self.public_dir))
+                self.assertFalse(os.path.exists(os.path.join(target, "blog", "old.html")))
+
+                shutil.rmtree(target)
+                self.write("blog/old.md", "# Old\n\nGone soon")
+
+    def test_sync_directory(self):
+        target = self.rebuild_with_changes()
+        self.build()
+        delta = read_delta(os.path.join(self.project_root, STATE_DIR, "delta.json"))
+        sync_directory(self.public_dir, delta, target)
+        self.assertEqual(output_manifest(target), output_manifest(self.public_dir))
+
+    def test_write_archive(self):
+        os.makedirs(os.path.join(self.public_dir, "blog"))
+        for rel_path in ("index.html", "blog/post.html", "unchanged.html"):
+            with open(os.path.join(self.public_dir, rel_path), "w") as f:
+                f.write(rel_path)
+        delta = OutputDelta(["blog/post.html"], ["index.html"], ["old.html"])
+        for extension in ("zip", "tar", "tgz"):
+            with self.subTest(extension=extension):
+                archive = os.path.join(self.tmp.name, f"changes.{extension}")
+                self.assertEqual(write_archive(self.public_dir, delta, archive), 2)
+                target = os.path.join(self.tmp.name, extension)
+                os.makedirs(target)
+                with open(os.path.join(target, "old.html"), "w") as f:
+                    f.write("old")
+                self.assertEqual(apply_archive(archive, target), delta)
+                self.assertEqual(
+                    output_manifest(target),
+                    {
+                        rel_path: digest
+                        for rel_path, digest in output_manifest(self.public_dir).items()
+                        if rel_path != "unchanged.html"
+                    },
+                )
+        with self.assertRaises(ValueError):
+            write_archive(self.public_dir, delta, os.path.join(self.tmp.name, "changes.rar"))
+
+    def test_rejects_unsafe_paths(self):
+        with self.assertRaises(ValueError):
+            sync_directory(self.public_dir, OutputDelta(["../escape"], [], []), self.tmp.name)
+
+
+if __name__ == "__main__":
+    unittest.main()
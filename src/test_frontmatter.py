@@ -0,0 +1,73 @@
+import os
+import tempfile
+import unittest
+
+from frontmatter import read_front_matter, split_front_matter
+
+
+class TestSplitFrontMatter(unittest.TestCase):
+    def test_parses_scalars_and_lists(self):
+        markdown = (
+            "---\n"
+            'title: "The Great Gatsby"\n'
+            "date: 1925-04-10\n"
+            "tags: [novel, jazz age]\n"
+            "authors:\n"
+            "  - F. Scott Fitzgerald\n"
+            "---\n"
+            "# Chapter 1\n"
+        )
+        metadata, body = split_front_matter(markdown)
+        self.assertEqual(
+            metadata,
+            {
+                "title": "The Great Gatsby",
+                "date": "1925-04-10",
+                "tags": ["novel", "jazz age"],
+                "authors": ["F. Scott Fitzgerald"],
+            },
+        )
+        self.assertEqual(body, "# Chapter 1\n")
+
+    def test_without_front_matter(self):
+        self.assertEqual(split_front_matter("# Title\n\n---\n"), ({}, "# Title\n\n---\n"))
+
+    def test_crlf(self):
+        metadata, body = split_front_matter("---\r\ntitle: T\r\ntags: [a]\r\n---\r\n# H\r\n")
+        self.assertEqual(metadata, {"title": "T", "tags": ["a"]})
+        self.assertEqual(body, "# H\r\n")
+
+    def test_unclosed_is_body(self):
+        markdown = "---\n\nnot: front matter\n\n# Title"
+        self.assertEqual(split_front_matter(markdown), ({}, markdown))
+
+    def test_invalid_line(self):
+        with self.assertRaises(ValueError):
+            split_front_matter("---\nnot a pair\n---\n")
+
+
+class TestReadFrontMatter(unittest.TestCase):
+    def test_returns_body_offset(self):
+        markdown = "---\ntitle: Ünicode\n---\n# Body\n"
+        with tempfile.NamedTemporaryFile("wb", suffix=".md", delete=False) as f:
+            f.write(markdown.encode("utf-8"))
+        try:
+            metadata, offset = read_front_matter(f.name)
+            with open(f.name, "rb") as source:
+                body = source.read()[offset:]
+        finally:
+            os.remove(f.name)
+        self.assertEqual(metadata, {"title": "Ünicode"})
+        self.assertEqual(body, b"# Body\n")
+
+    def test_unclosed_is_body(self):
+        with tempfile.NamedTemporaryFile("wb", suffix=".md", delete=False) as f:
+            f.write(b"---\n\n# Title\n")
+        try:
+            self.assertEqual(read_front_matter(f.name), ({}, 0))
+        finally:
+            os.remove(f.name)
+
+
+if __name__ == "__main__":
+    unittest.main()
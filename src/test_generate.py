@@ -0,0 +1,175 @@
+import os
+import tempfile
+import tracemalloc
+import unittest
+
+import generate
+from generate import (
+    extract_title,
+    generate_pages_recursive,
+    page_url,
+    parse_source,
+    rewrite_source_link,
+)
+from search_index import SearchIndex
+from transforms import ExternalLinks, LinkGraph, LinkRewriter, Pipeline
+
+
+class TestExtractTitle(unittest.TestCase):
+    def test_extract_title(self):
+        self.assertEqual(extract_title("# Hello  \n\nbody"), "Hello")
+
+    def test_extract_title_missing(self):
+        with self.assertRaises(ValueError):
+            extract_title("## Not a title")
+
+
+class TestPageUrl(unittest.TestCase):
+    def test_page_url(self):
+        self.assertEqual(page_url("index.md"), "/")
+        self.assertEqual(page_url(os.path.join("blog", "index.md")), "/blog/")
+        self.assertEqual(page_url("about.md"), "/about.html")
+
+
+class TestRewriteSourceLink(unittest.TestCase):
+    def test_rewrite_source_link(self):
+        self.assertEqual(rewrite_source_link("/blog/post.md#intro"), "/blog/post.html#intro")
+        self.assertEqual(rewrite_source_link("/blog/index.md"), "/blog/")
+        self.assertEqual(rewrite_source_link("../about.md?x=1"), "../about.html?x=1")
+        self.assertEqual(rewrite_source_link("guide/index.md"), "guide/")
+        self.assertEqual(rewrite_source_link("index.md"), "./")
+
+    def test_leaves_other_links(self):
+        for href in ("https://example.com/readme.md", "/about.html", "#top", "mailto:a@b.c"):
+            self.assertEqual(rewrite_source_link(href), href)
+
+
+class TestGeneratePagesRecursive(unittest.TestCase):
+    def test_generates_nested_pages(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            content_dir = os.path.join(tmp, "content")
+            os.makedirs(os.path.join(content_dir, "blog"))
+            with open(os.path.join(content_dir, "index.md"), "w") as f:
+                f.write("# Home\n\nWelcome")
+            with open(os.path.join(content_dir, "blog", "index.md"), "w") as f:
+                f.write("# Blog")
+            template_path = os.path.join(tmp, "template.html")
+            with open(template_path, "w") as f:
+                f.write("<title>{{ Title }}</title>{{ TOC }}{{ Content }}")
+
+            dest_dir = os.path.join(tmp, "public")
+            urls = generate_pages_recursive(content_dir, template_path, dest_dir)
+
+            self.assertEqual(urls, ["/", "/blog/"])
+            with open(os.path.join(dest_dir, "index.html")) as f:
+                self.assertEqual(
+                    f.read(),
+                    '<title>Home</title><nav class="toc"><ul><li><a href="#home">Home</a>'
+                    '</li></ul></nav><div><h1 id="home">Home</h1><p>Welcome</p></div>',
+                )
+
+
+class TestParseSource(unittest.TestCase):
+    def test_large_file_path_matches_small(self):
+        source = "---\r\ntitle: Front\r\n---\r\n# Heading\r\n\r\npara\r\n\r\n- a\r\n- b\r\n"
+        with tempfile.NamedTemporaryFile("wb", suffix=".md", delete=False) as f:
+            f.write(source.encode())
+        threshold = generate.LARGE_SOURCE_BYTES
+        try:
+            title, node = parse_source(f.name)
+            generate.LARGE_SOURCE_BYTES = 0
+            large_title, large_node = parse_source(f.name)
+        finally:
+            generate.LARGE_SOURCE_BYTES = threshold
+            os.remove(f.name)
+        self.assertEqual(title, "Front")
+        self.assertEqual(large_title, title)
+        self.assertEqual(large_node.to_html(), node.to_html())
+        self.assertEqual(
+            node.to_html(), "<div><h1>Heading</h1><p>para</p><ul><li>a</li><li>b</li></ul></div>"
+        )
+
+    def test_unclosed_front_matter_renders_as_content(self):
+        with tempfile.NamedTemporaryFile("wb", suffix=".md", delete=False) as f:
+            f.write(b"---\n\n# Heading\n\npara")
+        threshold = generate.LARGE_SOURCE_BYTES
+        try:
+            results = [parse_source(f.name)]
+            generate.LARGE_SOURCE_BYTES = 0
+            results.append(parse_source(f.name))
+        finally:
+            generate.LARGE_SOURCE_BYTES = threshold
+            os.remove(f.name)
+        for title, node in results:
+            self.assertEqual(title, "Heading")
+            self.assertEqual(node.to_html(), "<div><p>---</p><h1>Heading</h1><p>para</p></div>")
+
+
+class TestLargePages(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content_dir = os.path.join(self.tmp.name, "content")
+        os.makedirs(self.content_dir)
+        self.template_path = os.path.join(self.tmp.name, "template.html")
+        with open(self.template_path, "w") as f:
+            f.write("<head>{{ Head }}</head>{{ TOC }}<main>{{ Content }}</main>")
+        self.threshold = generate.LARGE_SOURCE_BYTES
+
+    def tearDown(self):
+        generate.LARGE_SOURCE_BYTES = self.threshold
+        self.tmp.cleanup()
+
+    def write_source(self, markdown: str) -> None:
+        with open(os.path.join(self.content_dir, "big.md"), "w") as f:
+            f.write(markdown)
+
+    def build(self, threshold: int, dest: str, search_index: SearchIndex = None) -> str:
+        generate.LARGE_SOURCE_BYTES = threshold
+        links = LinkGraph()
+        pipeline = Pipeline([LinkRewriter(generate.rewrite_source_link), ExternalLinks(), links])
+        dest_dir = os.path.join(self.tmp.name, dest)
+        generate_pages_recursive(
+            self.content_dir,
+            self.template_path,
+            dest_dir,
+            search_index,
+            pipeline=pipeline,
+            head_hints=links.head_hints,
+        )
+        with open(os.path.join(dest_dir, "big.html"), encoding="utf-8") as f:
+            return f.read()
+
+    def test_streamed_page_matches_whole_tree(self):
+        self.write_source(
+            "---\ntitle: Big\n---\n# Big\n\nSee [the post](/post.md) and "
+            "[elsewhere](https://example.com).\n\n## Part\n\n- one\n- two\n\n## Part"
+        )
+        indexes = SearchIndex(), SearchIndex()
+        whole = self.build(2**62, "whole", indexes[0])
+        streamed = self.build(0, "streamed", indexes[1])
+        self.assertEqual(streamed, whole)
+        self.assertIn('<link rel="prefetch" href="/post.html" />', streamed)
+        self.assertIn('rel="noopener"', streamed)
+        self.assertIn('id="part-1"', streamed)
+        self.assertEqual(indexes[1].documents(), indexes[0].documents())
+        self.assertEqual(os.listdir(os.path.join(self.tmp.name, "streamed")), ["big.html"])
+
+    def test_streaming_lowers_peak_memory(self):
+        paragraph = "Some **bold** text with a [link](/p.md) and more words. " * 4
+        self.write_source("# Big\n\n" + "\n\n".join([paragraph] * 1500))
+
+        def peak(threshold: int, dest: str) -> int:
+            tracemalloc.start()
+            try:
+                self.build(threshold, dest)
+                return tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+        whole = peak(2**62, "whole")
+        streamed = peak(0, "streamed")
+        self.assertLess(streamed, whole / 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+
+import highlight
+from highlight import normalize_language, tokenize
+
+
+class TestNormalizeLanguage(unittest.TestCase):
+    def test_aliases_and_attributes(self):
+        self.assertEqual(normalize_language("Py {linenos}"), "python")
+        self.assertEqual(normalize_language("sh"), "bash")
+        self.assertEqual(normalize_language("  "), "")
+
+    def test_names_limited_to_safe_characters(self):
+        self.assertEqual(normalize_language("C++"), "c++")
+        self.assertEqual(normalize_language("objective-c"), "objective-c")
+        self.assertEqual(normalize_language('x"onclick="alert(1)'), "")
+        self.assertEqual(normalize_language("<b>"), "")
+
+
+class TestTokenize(unittest.TestCase):
+    def test_tokens_cover_the_code(self):
+        code = 'const s = "a // b"; // note\nlet n = 42;'
+        tokens = tokenize(code, "javascript")
+        self.assertEqual("".join(text for _, text in tokens), code)
+        self.assertIn(("string", '"a // b"'), tokens)
+        self.assertIn(("comment", "// note"), tokens)
+        self.assertIn(("number", "42"), tokens)
+
+    def test_keywords_need_word_boundaries(self):
+        tokens = tokenize("format = information", "python")
+        self.assertNotIn("keyword", [token_class for token_class, _ in tokens])
+
+    def test_json_keys(self):
+        tokens = tokenize('{"a": "b", "n": null}', "json")
+        self.assertEqual(
+            [token for token in tokens if token[0]],
+            [("attr", '"a"'), ("string", '"b"'), ("attr", '"n"'), ("keyword", "null")],
+        )
+
+    def test_bash_variables_and_comments(self):
+        tokens = tokenize('echo "$HOME" $# # done', "bash")
+        self.assertIn(("variable", "$#"), tokens)
+        self.assertIn(("comment", "# done"), tokens)
+
+
+class TestHighlight(unittest.TestCase):
+    def setUp(self):
+        highlight.highlight_cache.clear()
+
+    def test_escapes_html(self):
+        self.assertEqual(
+            highlight.highlight("a < b && c", "css"), "a &lt; b &amp;&amp; c"
+        )
+
+    def test_unknown_language(self):
+        self.assertIsNone(highlight.highlight("x", "cobol"))
+
+    def test_repeated_snippets_tokenized_once(self):
+        code = "def f():\n    return 1\n"
+        first = highlight.highlight(code, "python")
+        self.assertIs(highlight.highlight(code, "python"), first)
+        info = highlight.highlight_cache.info()
+        self.assertEqual((info.hits, info.misses, info.currsize), (1, 1, 1))
+
+        highlight.highlight(code, "javascript")
+        self.assertEqual(highlight.highlight_cache.info().currsize, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
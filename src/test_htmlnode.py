@@ -1,6 +1,9 @@
+import pickle
 import unittest
 
-from htmlnode import HtmlNode
+from htmlnode import HtmlNode, render_cache
+from leafnode import LeafNode
+from parentnode import ParentNode
 from textnode import TextNode, TextType
 
 
@@ -18,6 +21,109 @@ class TestHtmlNode(unittest.TestCase):
         )
         self.assertEqual(node, node2)
 
+    def test_eq_props_order_insensitive(self):
+        node = LeafNode("a", "link", {"href": "/", "title": "home"})
+        node2 = LeafNode("a", "link", {"title": "home", "href": "/"})
+        self.assertEqual(node, node2)
+
+    def test_not_eq(self):
+        node = ParentNode("p", [LeafNode("b", "bold")])
+        node2 = ParentNode("p", [LeafNode("i", "bold")])
+        self.assertNotEqual(node, node2)
+
+
+class TestStructuralHash(unittest.TestCase):
+    def test_equal_subtrees_share_hash(self):
+        node = ParentNode("ul", [ParentNode("li", [LeafNode(None, "item")])])
+        node2 = ParentNode("ul", [ParentNode("li", [LeafNode(None, "item")])])
+        self.assertEqual(node.structural_hash(), node2.structural_hash())
+
+    def test_hash_distinguishes_props(self):
+        node = LeafNode("a", "link", {"href": "/one"})
+        node2 = LeafNode("a", "link", {"href": "/two"})
+        self.assertNotEqual(node.structural_hash(), node2.structural_hash())
+
+    def test_hash_distinguishes_node_type(self):
+        leaf = LeafNode("p", None)
+        parent = ParentNode("p", None)
+        self.assertNotEqual(leaf.structural_hash(), parent.structural_hash())
+
+    def test_reassignment_invalidates_hash(self):
+        node = LeafNode("b", "bold")
+        before = node.structural_hash()
+        node.value = "bolder"
+        self.assertNotEqual(node.structural_hash(), before)
+
+    def test_in_place_mutation_changes_hash(self):
+        node = LeafNode("a", "link", {"href": "/one"})
+        parent = ParentNode("p", [node])
+        before = parent.structural_hash()
+        node.props["href"] = "/two"
+        self.assertNotEqual(parent.structural_hash(), before)
+
+    def test_mutation_invalidates_every_parent(self):
+        shared = LeafNode("b", "one")
+        first, second = ParentNode("p", [shared]), ParentNode("p", [shared])
+        root = ParentNode("div", [first])
+        before = (root.structural_hash(), second.structural_hash())
+        shared.value = "two"
+        self.assertNotEqual(root.structural_hash(), before[0])
+        self.assertNotEqual(second.structural_hash(), before[1])
+
+    def test_pickle_keeps_tracking(self):
+        node = pickle.loads(pickle.dumps(ParentNode("p", [LeafNode("a", "x", {"href": "/"})])))
+        before = node.structural_hash()
+        node.children[0].props["href"] = "/other"
+        self.assertNotEqual(node.structural_hash(), before)
+
+
+class TestRenderCache(unittest.TestCase):
+    def setUp(self):
+        render_cache.clear()
+
+    def test_identical_subtrees_rendered_once(self):
+        def footer():
+            return ParentNode("footer", [LeafNode("b", "fitz")])
+
+        page = ParentNode("div", [footer()])
+        page.to_html()
+        self.assertEqual(render_cache.info().currsize, 0)
+        # A second render hashes the page and caches it, so an identical
+        # (already hashed) page is not serialized again.
+        page.to_html()
+        other = ParentNode("div", [footer()])
+        other.structural_hash()
+        misses = render_cache.info().misses
+        self.assertEqual(other.to_html(), "<div><footer><b>fitz</b></footer></div>")
+        self.assertEqual(render_cache.info().misses, misses)
+        self.assertGreater(render_cache.info().hits, 0)
+
+    def test_shared_subtree_cached(self):
+        nav = ParentNode("nav", [ParentNode("ul", [ParentNode("li", [LeafNode("a", "home")])])])
+        ParentNode("body", [nav, LeafNode("p", "one")]).to_html()
+        html = ParentNode("body", [nav, LeafNode("p", "two")]).to_html()
+        self.assertEqual(html, "<body><nav><ul><li><a>home</a></li></ul></nav><p>two</p></body>")
+        self.assertEqual(render_cache.info().currsize, 2)  # nav and its list
+        ParentNode("body", [nav, LeafNode("p", "three")]).to_html()
+        self.assertEqual(render_cache.info().hits, 1)
+
+    def test_changed_subtree_not_served_from_cache(self):
+        node = ParentNode("p", [LeafNode("b", "one")])
+        self.assertEqual(node.to_html(), "<p><b>one</b></p>")
+        node.children = [LeafNode("b", "two")]
+        self.assertEqual(node.to_html(), "<p><b>two</b></p>")
+
+    def test_mutated_descendant_not_served_from_cache(self):
+        leaf = LeafNode("b", "one")
+        node = ParentNode("div", [ParentNode("p", [leaf])])
+        self.assertEqual(node.to_html(), "<div><p><b>one</b></p></div>")
+        leaf.value = "two"
+        self.assertEqual(node.to_html(), "<div><p><b>two</b></p></div>")
+        leaf.props = {"class": "x"}
+        self.assertEqual(node.to_html(), '<div><p><b class="x">two</b></p></div>')
+        node.children[0].children.append(LeafNode(None, "!"))
+        self.assertEqual(node.to_html(), '<div><p><b class="x">two</b>!</p></div>')
+
 
 if __name__ == "__main__":
     unittest.main()
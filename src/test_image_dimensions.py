@@ -0,0 +1,96 @@
+import os
+import struct
+import tempfile
+import unittest
+
+from image_dimensions import add_image_attributes, image_size, read_image_size
+from leafnode import LeafNode
+from parentnode import ParentNode
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "static")
+
+
+class TestReadImageSize(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, name: str, data: bytes) -> str:
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_png(self):
+        self.assertEqual(
+            read_image_size(os.path.join(STATIC_DIR, "images", "tolkien.png")), (1026, 388)
+        )
+
+    def test_gif(self):
+        path = self.write("a.gif", b"GIF89a" + struct.pack("<HH", 320, 200) + b"\x00" * 20)
+        self.assertEqual(read_image_size(path), (320, 200))
+
+    def test_jpeg(self):
+        app0 = b"\xff\xe0" + struct.pack(">H", 16) + b"JFIF\x00" + b"\x00" * 9
+        sof0 = b"\xff\xc0" + struct.pack(">HBHH", 17, 8, 480, 640) + b"\x00" * 10
+        path = self.write("a.jpg", b"\xff\xd8" + app0 + sof0)
+        self.assertEqual(read_image_size(path), (640, 480))
+
+    def test_webp_lossy(self):
+        chunk = b"VP8 " + struct.pack("<I", 10) + b"\x00\x00\x00\x9d\x01\x2a"
+        path = self.write("a.webp", b"RIFF\x00\x00\x00\x00WEBP" + chunk + struct.pack("<HH", 800, 600))
+        self.assertEqual(read_image_size(path), (800, 600))
+
+    def test_webp_lossless(self):
+        bits = (100 - 1) | ((50 - 1) << 14)
+        chunk = b"VP8L" + struct.pack("<I", 5) + b"\x2f" + bits.to_bytes(4, "little")
+        path = self.write("a.webp", b"RIFF\x00\x00\x00\x00WEBP" + chunk + b"\x00" * 5)
+        self.assertEqual(read_image_size(path), (100, 50))
+
+    def test_webp_extended(self):
+        chunk = b"VP8X" + struct.pack("<I", 10) + b"\x00" * 4
+        chunk += (1920 - 1).to_bytes(3, "little") + (1080 - 1).to_bytes(3, "little")
+        path = self.write("a.webp", b"RIFF\x00\x00\x00\x00WEBP" + chunk)
+        self.assertEqual(read_image_size(path), (1920, 1080))
+
+    def test_unknown_format(self):
+        path = self.write("a.txt", b"not an image")
+        self.assertIsNone(read_image_size(path))
+
+    def test_truncated_files(self):
+        png = os.path.join(STATIC_DIR, "images", "tolkien.png")
+        with open(png, "rb") as f:
+            ihdr = f.read(16)
+        vp8 = b"RIFF\x00\x00\x00\x00WEBPVP8 " + struct.pack("<I", 10) + b"\x00\x00\x00\x9d\x01\x2a"
+        for name, data in (("a.gif", b"GIF89a\x40"), ("a.png", ihdr), ("a.webp", vp8)):
+            with self.subTest(name):
+                self.assertIsNone(read_image_size(self.write(name, data)))
+
+    def test_cache_invalidated_by_mtime(self):
+        path = self.write("a.gif", b"GIF89a" + struct.pack("<HH", 1, 2))
+        self.assertEqual(image_size(path), (1, 2))
+        self.write("a.gif", b"GIF89a" + struct.pack("<HH", 3, 4))
+        os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1_000_000))
+        self.assertEqual(image_size(path), (3, 4))
+
+
+class TestAddImageAttributes(unittest.TestCase):
+    def test_adds_dimensions_and_loading_hints(self):
+        img = LeafNode("img", "", {"alt": "tolkien", "src": "/images/tolkien.png"})
+        node = ParentNode("div", [ParentNode("p", [img])])
+        add_image_attributes(node, STATIC_DIR)
+        self.assertEqual(
+            img.to_html(),
+            '<img alt="tolkien" src="/images/tolkien.png" width="1026" height="388" loading="lazy" decoding="async">',
+        )
+
+    def test_missing_image_gets_loading_hints_only(self):
+        img = LeafNode("img", "", {"alt": "x", "src": "/images/missing.png"})
+        add_image_attributes(ParentNode("p", [img]), STATIC_DIR)
+        self.assertEqual(img.props, {"alt": "x", "src": "/images/missing.png", "loading": "lazy", "decoding": "async"})
+
+
+if __name__ == "__main__":
+    unittest.main()
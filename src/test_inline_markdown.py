@@ -1,5 +1,6 @@
 import unittest
 
+import inline_markdown
 from textnode import TextNode, TextType
 from inline_markdown import (
     split_nodes_delimiter,
@@ -9,6 +10,7 @@ from inline_markdown import (
     extract_markdown_links,
     text_to_textnodes,
 )
+from inline_markdown import inline_cache, parse_inline
 
 
 class TestSplitNodesDelimiter(unittest.TestCase):
@@ -669,5 +671,40 @@ class TestTextToTextNodes(unittest.TestCase):
         self.assertListEqual(expected, nodes)
 
 
+class TestParseInline(unittest.TestCase):
+    def setUp(self):
+        inline_cache.clear()
+
+    def test_matches_text_to_textnodes(self):
+        text = "A **bold** [link](/x) and `code`"
+        self.assertEqual(list(parse_inline(text)), text_to_textnodes(text))
+
+    def test_repeated_text_shares_one_result(self):
+        first = parse_inline("- item with _emphasis_")
+        second = parse_inline("- item with _emphasis_")
+        self.assertIs(first, second)
+        self.assertIsInstance(first, tuple)
+        info = inline_cache.info()
+        self.assertEqual((info.hits, info.misses), (1, 1))
+
+    def test_shared_nodes_are_frozen(self):
+        node = parse_inline("- item with _emphasis_")[1]
+        with self.assertRaises(AttributeError):
+            node.text = "changed"
+        with self.assertRaises(AttributeError):
+            del node.url
+        self.assertEqual(parse_inline("- item with _emphasis_")[1].text, "emphasis")
+
+    def test_long_text_not_cached(self):
+        text = "word " * (inline_markdown.INLINE_CACHE_MAX_CHARS // 5 + 1)
+        parse_inline(text)
+        self.assertNotIn(text, inline_cache)
+
+    def test_unbalanced_delimiter_not_cached(self):
+        with self.assertRaises(ValueError):
+            parse_inline("a **b")
+        self.assertNotIn("a **b", inline_cache)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,88 @@
+import os
+import tempfile
+import unittest
+
+from listings import tag_slug, write_tag_pages
+from metadata_index import MetadataIndex
+from shard import in_shard
+
+TEMPLATE = "<title>{{ Title }}</title>{{ Head }}{{ TOC }}<main>{{ Content }}</main>{{ Related }}"
+
+
+class TestTagPages(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content_dir = os.path.join(self.tmp.name, "content")
+        self.public_dir = os.path.join(self.tmp.name, "public")
+        os.makedirs(self.content_dir)
+        self.index = MetadataIndex(os.path.join(self.tmp.name, "metadata.sqlite3"))
+
+    def tearDown(self):
+        self.index.close()
+        self.tmp.cleanup()
+
+    def write(self, rel_path: str, markdown: str) -> None:
+        with open(os.path.join(self.content_dir, rel_path), "w") as f:
+            f.write(markdown)
+
+    def read(self, rel_path: str) -> str:
+        with open(os.path.join(self.public_dir, rel_path), encoding="utf-8") as f:
+            return f.read()
+
+    def test_tag_slug(self):
+        self.assertEqual(tag_slug("Jazz Age"), "jazz-age")
+        self.assertEqual(tag_slug("  C++ / Rust "), "c-rust")
+        self.assertEqual(tag_slug("!!"), "")
+
+    def test_pages_listed_from_index(self):
+        self.write("a.md", "---\ndate: 2024-01-02\ntags: [jazz, Novel]\n---\n# A <1>")
+        self.write("b.md", "---\ndate: 2024-03-04\ntags: [jazz]\n---\n# B")
+        self.write("c.md", "---\ntags: [jazz]\n---\n# C")
+        self.write("d.md", "# Untagged")
+        self.index.update(self.content_dir)
+
+        urls = write_tag_pages(self.index, TEMPLATE, self.public_dir)
+
+        self.assertEqual(urls, ["/tags/jazz/", "/tags/novel/", "/tags/"])
+        self.assertEqual(
+            self.read("tags/jazz/index.html"),
+            "<title>Tagged jazz</title><main><h1>Tagged jazz</h1><ul>"
+            '<li><a href="/b.html">B</a> <time datetime="2024-03-04">2024-03-04</time></li>'
+            '<li><a href="/a.html">A &lt;1&gt;</a> <time datetime="2024-01-02">2024-01-02</time></li>'
+            '<li><a href="/c.html">C</a></li>'
+            "</ul></main>",
+        )
+        self.assertIn(
+            '<li><a href="/tags/jazz/">jazz</a> (3)</li><li><a href="/tags/novel/">Novel</a> (1)</li>',
+            self.read("tags/index.html"),
+        )
+
+    def test_tags_sharing_a_slug_share_a_page(self):
+        self.write("a.md", "---\ntags: [jazz age]\n---\n# A")
+        self.write("b.md", "---\ntags: [Jazz-Age, jazz age]\n---\n# B")
+        self.index.update(self.content_dir)
+        write_tag_pages(self.index, TEMPLATE, self.public_dir)
+        page = self.read("tags/jazz-age/index.html")
+        self.assertEqual(page.count("<li>"), 2)
+        self.assertIn("(2)", self.read("tags/index.html"))
+
+    def test_no_tags(self):
+        self.write("a.md", "# A")
+        self.index.update(self.content_dir)
+        self.assertEqual(write_tag_pages(self.index, TEMPLATE, self.public_dir), [])
+        self.assertFalse(os.path.exists(self.public_dir))
+
+    def test_shard(self):
+        for name in ("a", "b", "c", "d"):
+            self.write(f"{name}.md", f"---\ntags: [{name}]\n---\n# {name}")
+        self.index.update(self.content_dir)
+        urls = []
+        for shard in ((1, 2), (2, 2)):
+            written = write_tag_pages(self.index, TEMPLATE, self.public_dir, shard)
+            self.assertTrue(all(in_shard(url[1:] + "index.html", shard) for url in written))
+            urls += written
+        self.assertEqual(sorted(urls), ["/tags/", "/tags/a/", "/tags/b/", "/tags/c/", "/tags/d/"])
+
+
+if __name__ == "__main__":
+    unittest.main()
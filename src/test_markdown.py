@@ -1,6 +1,12 @@
+import os
+import tempfile
 import unittest
+from concurrent.futures import Future
+from unittest import mock
 
-from markdown import markdown_to_html_node
+import markdown
+from markdown import markdown_file_to_html_node, markdown_to_html_node
+from toc import TableOfContents
 
 
 class TestMarkdownToHtmlNode(unittest.TestCase):
@@ -34,6 +40,50 @@ the **same** even with inline stuff
             "<div><pre><code>This is text that _should_ remain\nthe **same** even with inline stuff\n</code></pre></div>",
         )
 
+    def test_codeblock_with_language(self):
+        md = """
+```py
+if x < 1:  # small
+    print("x")
+```
+"""
+        html = markdown_to_html_node(md).to_html()
+        self.assertEqual(
+            html,
+            '<div><pre><code class="language-python">'
+            '<span class="tok-keyword">if</span> x &lt; <span class="tok-number">1</span>:  '
+            '<span class="tok-comment"># small</span>\n    '
+            '<span class="tok-builtin">print</span>(<span class="tok-string">"x"</span>)\n'
+            "</code></pre></div>",
+        )
+
+    def test_codeblock_with_unknown_language(self):
+        md = "```brainfuck\n+[-]\n```"
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            '<div><pre><code class="language-brainfuck">+[-]\n</code></pre></div>',
+        )
+
+    def test_codeblock_without_language_is_escaped(self):
+        md = "```\n<script>alert('x') && 1</script>\n```"
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            "<div><pre><code>&lt;script&gt;alert('x') &amp;&amp; 1&lt;/script&gt;\n</code></pre></div>",
+        )
+
+    def test_codeblock_with_unknown_language_is_escaped(self):
+        md = "```brainfuck\n<script>+[-]</script>\n```"
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            '<div><pre><code class="language-brainfuck">&lt;script&gt;+[-]&lt;/script&gt;\n</code></pre></div>',
+        )
+
+    def test_codeblock_language_cannot_inject_attributes(self):
+        md = '```x"onclick="alert(1)\n+[-]\n```'
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(), "<div><pre><code>+[-]\n</code></pre></div>"
+        )
+
     def test_heading(self):
         md = """
 # Heading 1
@@ -100,3 +150,92 @@ This is a paragraph.
             html,
             "<div><h1>Title</h1><p>This is a paragraph.</p><ul><li>List item 1</li><li>List item 2</li></ul></div>",
         )
+
+
+class TestHeadingAnchors(unittest.TestCase):
+    def test_ids_and_entries(self):
+        toc = TableOfContents()
+        node = markdown_to_html_node("# Intro\n\n## Set **up**\n\n## Set up", toc=toc)
+        self.assertEqual(
+            node.to_html(),
+            '<div><h1 id="intro">Intro</h1><h2 id="set-up">Set <b>up</b></h2>'
+            '<h2 id="set-up-1">Set up</h2></div>',
+        )
+        self.assertEqual(
+            [(entry.level, entry.text) for entry in toc.entries],
+            [(1, "Intro"), (2, "Set up"), (2, "Set up")],
+        )
+
+    def test_no_ids_without_toc(self):
+        self.assertEqual(markdown_to_html_node("# Intro").to_html(), "<div><h1>Intro</h1></div>")
+
+
+class TestMarkdownFileToHtmlNode(unittest.TestCase):
+    def test_matches_in_memory_rendering(self):
+        md = "# Title\n\nThis is a **paragraph**.\n\n- List item 1\n- List item 2\n"
+        with tempfile.NamedTemporaryFile("w", suffix=".md", delete=False) as f:
+            f.write(md)
+        try:
+            node = markdown_file_to_html_node(f.name)
+        finally:
+            os.remove(f.name)
+        self.assertEqual(node.to_html(), markdown_to_html_node(md).to_html())
+
+
+class TestParallelMarkdownToHtmlNode(unittest.TestCase):
+    def setUp(self):
+        self.thresholds = (markdown.PARALLEL_MIN_BLOCKS, markdown.PARALLEL_CHUNK_BLOCKS)
+        markdown.PARALLEL_MIN_BLOCKS, markdown.PARALLEL_CHUNK_BLOCKS = 10, 3
+
+    def tearDown(self):
+        markdown.PARALLEL_MIN_BLOCKS, markdown.PARALLEL_CHUNK_BLOCKS = self.thresholds
+
+    def test_matches_serial_output_in_order(self):
+        md = "\n\n".join(
+            f"## Section {i}" if i % 4 == 0 else f"Paragraph {i} with **bold**"
+            for i in range(25)
+        )
+        self.assertEqual(
+            markdown_to_html_node(md, workers=2).to_html(),
+            markdown_to_html_node(md).to_html(),
+        )
+
+    def test_heading_ids_deduplicated_across_chunks(self):
+        md = "\n\n".join("## Same" if i % 2 == 0 else "Text" for i in range(12))
+        serial, parallel = TableOfContents(), TableOfContents()
+        self.assertEqual(
+            markdown_to_html_node(md, workers=2, toc=parallel).to_html(),
+            markdown_to_html_node(md, toc=serial).to_html(),
+        )
+        self.assertEqual(parallel.entries, serial.entries)
+        self.assertEqual(parallel.entries[-1].slug, "same-5")
+
+    def test_below_threshold_stays_serial(self):
+        def submit(func, *args):
+            future = Future()
+            future.set_result(func(*args))
+            return future
+
+        pool = mock.MagicMock()
+        pool.return_value.__enter__.return_value.submit.side_effect = submit
+        with mock.patch.dict(markdown.POOLS, {"process": pool, "thread": pool}):
+            node = markdown_to_html_node("# Title\n\nText", workers=2)
+            pool.assert_not_called()
+            markdown_to_html_node("\n\n".join(["Text"] * 10), workers=2)
+            pool.assert_called_once_with(max_workers=2)
+        self.assertEqual(node.to_html(), "<div><h1>Title</h1><p>Text</p></div>")
+
+    def test_chunks_submitted_through_bounded_window(self):
+        read = 0
+
+        def blocks():
+            nonlocal read
+            for i in range(100):
+                read += 1
+                yield f"Paragraph {i}"
+
+        rendered = markdown._render_blocks_parallel(blocks(), workers=2, pool="thread")
+        self.assertEqual(next(rendered).to_html(), "<p>Paragraph 0</p>")
+        self.assertLessEqual(read, 2 * 2 * markdown.PARALLEL_CHUNK_BLOCKS)
+        self.assertEqual(len(list(rendered)), 99)
+        self.assertEqual(read, 100)
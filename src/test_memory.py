@@ -0,0 +1,80 @@
+import json
+import unittest
+
+import memory
+from cache import LRUCache
+from memory import (
+    apply_memory_budget,
+    cache_stats,
+    format_bytes,
+    memory_budget,
+    parse_size,
+    peak_rss,
+)
+
+
+class TestParseSize(unittest.TestCase):
+    def test_parse_size(self):
+        self.assertEqual(parse_size("65536"), 65536)
+        self.assertEqual(parse_size("512M"), 512 << 20)
+        self.assertEqual(parse_size("1.5g"), 3 << 29)
+        self.assertEqual(parse_size("64KiB"), 64 << 10)
+
+    def test_invalid(self):
+        for text in ("", "M", "12T", "-1M"):
+            with self.assertRaises(ValueError):
+                parse_size(text)
+
+
+class TestMemoryBudget(unittest.TestCase):
+    def test_apply_memory_budget(self):
+        cache = LRUCache(maxsize=100, sizeof=lambda key, value: len(value))
+        for key in "abcd":
+            cache.put(key, "x" * 100)
+        shares = memory.CACHE_SHARES
+        memory.CACHE_SHARES = {"test": (cache, 0.5)}
+        try:
+            self.assertEqual(apply_memory_budget(500), {"test": 250})
+        finally:
+            memory.CACHE_SHARES = shares
+        self.assertEqual(len(cache), 2)
+
+    def test_memory_budget_is_restored(self):
+        unbounded = LRUCache(maxsize=100, sizeof=lambda key, value: len(value))
+        bounded = LRUCache(maxsize=100, maxbytes=1000, sizeof=lambda key, value: len(value))
+        shares = memory.CACHE_SHARES
+        memory.CACHE_SHARES = {"a": (unbounded, 0.5), "b": (bounded, 0.25)}
+        try:
+            with memory_budget(400) as limits:
+                self.assertEqual(limits, {"a": 200, "b": 100})
+                self.assertEqual((unbounded.maxbytes, bounded.maxbytes), (200, 100))
+        finally:
+            memory.CACHE_SHARES = shares
+        self.assertEqual((unbounded.maxbytes, bounded.maxbytes), (None, 1000))
+
+    def test_cache_stats_are_json_ready(self):
+        cache = LRUCache(maxsize=10)
+        cache.put("a", 1)
+        cache.get("a")
+        cache.get("b")
+        shares = memory.CACHE_SHARES
+        memory.CACHE_SHARES = {"test": (cache, 0.5)}
+        try:
+            stats = json.loads(json.dumps(cache_stats()))
+        finally:
+            memory.CACHE_SHARES = shares
+        self.assertEqual(stats["test"]["hits"], 1)
+        self.assertEqual(stats["test"]["misses"], 1)
+        self.assertEqual(stats["test"]["hit_rate"], 0.5)
+        self.assertEqual(stats["test"]["currsize"], 1)
+
+    def test_peak_rss(self):
+        self.assertGreater(peak_rss(), 1 << 20)
+
+    def test_format_bytes(self):
+        self.assertEqual(format_bytes(512), "512 B")
+        self.assertEqual(format_bytes(3 << 20), "3.0 MiB")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import os
+import tempfile
+import unittest
+
+from metadata_index import MetadataIndex
+
+
+class TestMetadataIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content_dir = os.path.join(self.tmp.name, "content")
+        os.makedirs(os.path.join(self.content_dir, "blog"))
+        self.index = MetadataIndex(os.path.join(self.tmp.name, "state", "metadata.sqlite3"))
+
+    def tearDown(self):
+        self.index.close()
+        self.tmp.cleanup()
+
+    def write(self, rel_path: str, markdown: str, mtime_ns: int, newline: str = None) -> None:
+        path = os.path.join(self.content_dir, rel_path)
+        with open(path, "w", newline=newline) as f:
+            f.write(markdown)
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+    def test_indexes_front_matter_and_titles(self):
+        self.write("blog/a.md", "---\ndate: 2024-01-02\ntags: [jazz, novel]\n---\n# Post A", 1)
+        self.write("blog/b.md", "---\ntitle: Post B\ndate: 2024-03-04\ntags: [jazz]\n---\nbody", 1)
+        self.write("index.md", "# Home", 1)
+
+        update = self.index.update(self.content_dir)
+
+        self.assertEqual(update.changed, ["blog/a.md", "blog/b.md", "index.md"])
+        pages = self.index.pages()
+        self.assertEqual([page.title for page in pages], ["Post B", "Post A", "Home"])
+        self.assertEqual(pages[1].url, "/blog/a.html")
+        self.assertEqual(pages[1].output_path, "blog/a.html")
+        self.assertEqual(pages[1].tags, ["jazz", "novel"])
+        self.assertEqual([page.title for page in self.index.pages(tag="novel")], ["Post A"])
+        self.assertEqual(self.index.tags(), {"jazz": 2, "novel": 1})
+
+    def test_crlf_front_matter(self):
+        self.write("blog/a.md", "---\ntitle: Post A\ntags: [novel]\n---\nbody", 1, newline="\r\n")
+        self.index.update(self.content_dir)
+        self.assertEqual([page.title for page in self.index.pages(tag="novel")], ["Post A"])
+        self.assertEqual(self.index.tags(), {"novel": 1})
+
+    def test_incremental_update(self):
+        self.write("index.md", "# Home", 1)
+        self.write("blog/a.md", "# A", 1)
+        self.index.update(self.content_dir)
+
+        update = self.index.update(self.content_dir)
+        self.assertEqual((update.changed, update.removed, update.unchanged), ([], [], 2))
+
+        self.write("index.md", "# Home", 2)
+        self.assertEqual(self.index.update(self.content_dir).changed, [])
+
+        self.write("index.md", "# New home", 3)
+        os.remove(os.path.join(self.content_dir, "blog", "a.md"))
+        update = self.index.update(self.content_dir)
+        self.assertEqual((update.changed, update.removed), (["index.md"], ["blog/a.md"]))
+        self.assertEqual([page.title for page in self.index.pages()], ["New home"])
+
+
+if __name__ == "__main__":
+    unittest.main()
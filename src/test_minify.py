@@ -0,0 +1,60 @@
+import os
+import tempfile
+import unittest
+
+from minify import minify_css, minify_directory, minify_html
+
+
+class TestMinifyHtml(unittest.TestCase):
+    def test_drops_whitespace_between_block_tags(self):
+        html = "<html>\n  <head>\n    <title>Fitz</title>\n  </head>\n</html>\n"
+        self.assertEqual(minify_html(html), "<html><head><title>Fitz</title></head></html>")
+
+    def test_keeps_single_space_between_inline_tags(self):
+        html = "<p>Hello   <b>big</b>\n   <i>world</i></p>"
+        self.assertEqual(minify_html(html), "<p>Hello <b>big</b> <i>world</i></p>")
+
+    def test_preserves_pre_and_code(self):
+        html = "<div>\n  <pre><code>def f():\n    return 1\n</code></pre>\n</div>"
+        self.assertEqual(
+            minify_html(html), "<div><pre><code>def f():\n    return 1\n</code></pre></div>"
+        )
+
+    def test_strips_comments(self):
+        self.assertEqual(minify_html("<p>a<!-- note -->b</p>"), "<p>ab</p>")
+
+
+class TestMinifyCss(unittest.TestCase):
+    def test_strips_comments_and_whitespace(self):
+        css = "/* theme */\nh1,\nh2 {\n  color: #dda15e;\n  margin: 0 auto;\n}\n"
+        self.assertEqual(minify_css(css), "h1,h2{color:#dda15e;margin:0 auto}")
+
+    def test_preserves_strings(self):
+        css = 'code {\n  font-family: "Courier  New", monospace;\n}'
+        self.assertEqual(minify_css(css), 'code{font-family:"Courier  New",monospace}')
+
+    def test_keeps_descendant_pseudo_selector_space(self):
+        self.assertEqual(minify_css("a :hover { color: red; }"), "a :hover{color:red}")
+
+
+class TestMinifyDirectory(unittest.TestCase):
+    def test_reports_savings_per_type(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with open(os.path.join(tmp, "index.html"), "w") as f:
+                f.write("<div>\n  <p>x</p>\n</div>\n")
+            with open(os.path.join(tmp, "index.css"), "w") as f:
+                f.write("p {\n  color: red;\n}\n")
+            with open(os.path.join(tmp, "image.png"), "wb") as f:
+                f.write(b"\x89PNG")
+
+            totals = minify_directory(tmp, workers=1)
+
+            self.assertEqual(totals[".html"], (1, 24, 19))
+            self.assertEqual(totals[".css"], (1, 20, 12))
+            self.assertNotIn(".png", totals)
+            with open(os.path.join(tmp, "index.html")) as f:
+                self.assertEqual(f.read(), "<div><p>x</p></div>")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+
+from htmlnode import HtmlNode
+from leafnode import LeafNode
+from markdown import markdown_to_html_node
+from node_codec import (
+    decode_html_node,
+    decode_html_nodes,
+    decode_text_nodes,
+    encode_html_node,
+    encode_html_nodes,
+    encode_text_nodes,
+)
+from parentnode import ParentNode
+from textnode import TextNode, TextType
+
+
+class TestHtmlNodeCodec(unittest.TestCase):
+    def test_round_trip_rendered_document(self):
+        md = "# Título\n\nSome **bold** and a [link](/a)\n\n- one\n- two\n\n![img](/i.png)"
+        node = markdown_to_html_node(md)
+        decoded = decode_html_node(encode_html_node(node))
+        self.assertEqual(decoded, node)
+        self.assertEqual(decoded.to_html(), node.to_html())
+
+    def test_preserves_node_types_and_none_fields(self):
+        nodes = [
+            LeafNode(None, "plain"),
+            LeafNode("img", "", {"src": "/a.png"}),
+            HtmlNode("div", None, {}, []),
+            ParentNode("p", [LeafNode("b", "x")]),
+        ]
+        decoded = decode_html_nodes(encode_html_nodes(nodes))
+        self.assertEqual([type(node) for node in decoded], [LeafNode, LeafNode, HtmlNode, ParentNode])
+        self.assertIsNone(decoded[0].tag)
+        self.assertIsNone(decoded[0].props)
+        self.assertEqual(decoded[1].value, "")
+        self.assertEqual((decoded[2].props, decoded[2].children), ({}, []))
+        self.assertIsNone(decoded[3].value)
+
+    def test_multi_byte_varints(self):
+        children = [LeafNode("i", "x" * 300, {f"data-{i}": str(i)}) for i in range(200)]
+        node = ParentNode("div", children)
+        self.assertEqual(decode_html_node(encode_html_node(node)), node)
+
+    def test_string_table_deduplicates_tags_and_props(self):
+        node = ParentNode("ul", [ParentNode("li", [LeafNode("a", "x", {"href": "/"})]) for _ in range(50)])
+        encoded = encode_html_node(node)
+        self.assertEqual(encoded.count(b"href"), 1)
+        self.assertEqual(encoded.count(b"li"), 1)
+
+    def test_rejects_other_streams(self):
+        with self.assertRaises(ValueError):
+            decode_html_node(encode_text_nodes([]))
+
+
+class TestTextNodeCodec(unittest.TestCase):
+    def test_round_trip(self):
+        nodes = [
+            TextNode("plain ", TextType.TEXT),
+            TextNode("bold", TextType.BOLD),
+            TextNode("link", TextType.LINK, "https://example.com"),
+            TextNode("é", TextType.IMAGE, "/é.png"),
+        ]
+        self.assertEqual(decode_text_nodes(encode_text_nodes(nodes)), nodes)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+import time
+import unittest
+
+from block_markdown import markdown_to_blocks
+from inline_markdown import (
+    extract_markdown_images,
+    extract_markdown_links,
+    split_nodes_delimiter,
+    text_to_textnodes,
+)
+from leafnode import LeafNode
+from markdown import markdown_to_html_node
+from parentnode import ParentNode
+from textnode import TextNode, TextType
+
+# Doubling the input of a linear algorithm roughly doubles its run time; a
+# quadratic one quadruples it. Anything at or above this ratio fails.
+MAX_GROWTH = 3.0
+REPEAT = 5
+ATTEMPTS = 3
+
+
+def best_time(func, arg) -> float:
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        try:
+            func(arg)
+        except ValueError:
+            pass
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+class ScalingTestCase(unittest.TestCase):
+    def assertScalesLinearly(self, func, make_input, n):
+        """Assert func(make_input(2n)) takes less than MAX_GROWTH x func(make_input(n))."""
+        small, large = make_input(n), make_input(2 * n)
+        best_time(func, small)  # warm up regex and allocator caches
+        # A genuinely quadratic function fails every attempt; a noisy
+        # neighbour on the build machine rarely spoils all of them.
+        growth = min(
+            best_time(func, large) / best_time(func, small) for _ in range(ATTEMPTS)
+        )
+        self.assertLess(
+            growth, MAX_GROWTH, f"{func.__name__} grew {growth:.1f}x when input doubled"
+        )
+
+
+class TestPathologicalInline(ScalingTestCase):
+    def test_unmatched_asterisks(self):
+        def split(text):
+            return split_nodes_delimiter([TextNode(text, TextType.TEXT)], "*", TextType.ITALIC)
+
+        self.assertScalesLinearly(split, lambda n: "*" * (2 * n + 1), 100_000)
+
+    def test_unmatched_underscores_through_text_to_textnodes(self):
+        self.assertScalesLinearly(text_to_textnodes, lambda n: "a_" * n + "_", 50_000)
+
+    def test_open_brackets(self):
+        self.assertScalesLinearly(extract_markdown_links, lambda n: "[" * n, 20_000)
+
+    def test_open_image_brackets(self):
+        self.assertScalesLinearly(extract_markdown_images, lambda n: "![" * n, 20_000)
+
+    def test_unterminated_link_urls(self):
+        self.assertScalesLinearly(extract_markdown_links, lambda n: "[a](" * n, 20_000)
+
+    def test_many_links_on_one_line(self):
+        self.assertScalesLinearly(text_to_textnodes, lambda n: "see [a](/b) " * n, 5_000)
+
+    def test_long_single_line(self):
+        def render(markdown):
+            return markdown_to_html_node(markdown).to_html()
+
+        self.assertScalesLinearly(render, lambda n: "word **bold** " * n, 5_000)
+
+
+class TestPathologicalBlocks(ScalingTestCase):
+    def test_many_blank_lines(self):
+        self.assertScalesLinearly(markdown_to_blocks, lambda n: "\n" * n, 200_000)
+
+    def test_deeply_nested_quote_markers(self):
+        def render(markdown):
+            return markdown_to_html_node(markdown).to_html()
+
+        self.assertScalesLinearly(render, lambda n: ">" * n + " quote", 50_000)
+
+    def test_deep_node_tree(self):
+        def make_tree(depth):
+            node = LeafNode("b", "leaf")
+            for _ in range(depth):
+                node = ParentNode("span", [node])
+            return node
+
+        def render_fresh(depth):
+            return make_tree(depth).to_html()
+
+        self.assertScalesLinearly(render_fresh, lambda n: n, 200)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from preview import LiveReloadHub, PageWatcher, diff_blocks, inject_live_reload
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def apply_patches(blocks: list[str], patches: list[dict]) -> list[str]:
+    """Mirror of the injected script's splice loop."""
+    blocks = list(blocks)
+    for patch in patches:
+        blocks[patch["index"] : patch["index"] + patch["remove"]] = patch["html"]
+    return blocks
+
+
+class TestDiffBlocks(unittest.TestCase):
+    def test_single_changed_block(self):
+        old = ["<h1>T</h1>", "<p>a</p>", "<p>b</p>"]
+        new = ["<h1>T</h1>", "<p>A</p>", "<p>b</p>"]
+        self.assertEqual(diff_blocks(old, new), [{"index": 1, "remove": 1, "html": ["<p>A</p>"]}])
+
+    def test_unchanged(self):
+        self.assertEqual(diff_blocks(["<p>a</p>"], ["<p>a</p>"]), [])
+
+    def test_patches_apply_in_order(self):
+        old = ["<p>1</p>", "<p>2</p>", "<p>3</p>", "<p>4</p>", "<p>5</p>"]
+        new = ["<p>0</p>", "<p>1</p>", "<p>3</p>", "<p>4!</p>", "<p>5</p>", "<p>6</p>"]
+        self.assertEqual(apply_patches(old, diff_blocks(old, new)), new)
+
+
+class TestInjectLiveReload(unittest.TestCase):
+    def test_injects_before_body_close(self):
+        html = inject_live_reload("<html><body><p>x</p></body></html>")
+        self.assertIn("EventSource", html)
+        self.assertTrue(html.endswith("</script></body></html>"))
+
+
+class TestPageWatcher(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = self.tmp.name
+        shutil.copy(os.path.join(PROJECT_ROOT, "template.html"), root)
+        os.mkdir(os.path.join(root, "static"))
+        os.mkdir(os.path.join(root, "content"))
+        self.src_path = os.path.join(root, "content", "index.md")
+        self.hub = LiveReloadHub()
+        self.client = self.hub.subscribe()
+        self.watcher = PageWatcher(root, self.hub)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write_source(self, markdown: str) -> None:
+        with open(self.src_path, "w") as f:
+            f.write(markdown)
+        stat = os.stat(self.src_path)
+        os.utime(self.src_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    def test_edit_publishes_only_changed_block(self):
+        self.write_source("# Title\n\nfirst\n\nsecond")
+        self.assertEqual(self.watcher.poll(), ["/"])
+        self.assertEqual(self.client.get_nowait(), {"url": "/", "reload": True})
+
+        self.assertEqual(self.watcher.poll(), [])
+
+        self.write_source("# Title\n\nfirst\n\nsecond, edited")
+        self.assertEqual(self.watcher.poll(), ["/"])
+        self.assertEqual(
+            self.client.get_nowait(),
+            {"url": "/", "patches": [{"index": 2, "remove": 1, "html": ["<p>second, edited</p>"]}]},
+        )
+        with open(os.path.join(self.tmp.name, "public", "index.html")) as f:
+            self.assertIn('<div data-fitz-live="">', f.read())
+
+    def test_title_change_requests_reload(self):
+        self.write_source("# Title\n\nbody")
+        self.watcher.poll()
+        self.client.get_nowait()
+        self.write_source("# New title\n\nbody")
+        self.watcher.poll()
+        self.assertEqual(self.client.get_nowait(), {"url": "/", "reload": True})
+
+    def test_toc_change_requests_reload(self):
+        self.write_source("# Title\n\n## One\n\nbody")
+        self.watcher.poll()
+        self.client.get_nowait()
+        self.write_source("# Title\n\n## Two\n\nbody")
+        self.watcher.poll()
+        self.assertEqual(self.client.get_nowait(), {"url": "/", "reload": True})
+
+    def test_renders_like_the_build(self):
+        with open(os.path.join(self.tmp.name, "static", "index.css"), "w") as f:
+            f.write("p { color: red }")
+        watcher = PageWatcher(self.tmp.name, self.hub)
+        self.write_source("# Title\n\nSee [post](/blog/post.md) and [x](https://example.com).")
+        watcher.poll()
+        with open(os.path.join(self.tmp.name, "public", "index.html")) as f:
+            html = f.read()
+        self.assertIn('<a href="/blog/post.html">post</a>', html)
+        self.assertIn('<a href="https://example.com" rel="noopener">x</a>', html)
+        self.assertIn('<link rel="prefetch" href="/blog/post.html" />', html)
+        self.assertIn("<style>p{color:red}</style>", html)
+
+    def test_prime_skips_built_pages(self):
+        self.write_source("# Title\n\nbody")
+        self.watcher.prime()
+        self.assertEqual(self.watcher.poll(), [])
+        self.assertFalse(os.path.exists(os.path.join(self.tmp.name, "public")))
+
+
+if __name__ == "__main__":
+    unittest.main()
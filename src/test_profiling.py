@@ -0,0 +1,82 @@
+import contextlib
+import io
+import os
+import pstats
+import shutil
+import tempfile
+import time
+import unittest
+
+from main import PROFILE_DIR, STATE_DIR, build, parse_args
+from profiling import Profiler, page_outliers
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def busy_loop(seconds: float) -> list[str]:
+    out = []
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        out.append(str(len(out)))
+    return out
+
+
+class TestPageOutliers(unittest.TestCase):
+    def test_outliers(self):
+        timings = {"/a": 0.01, "/b": 0.012, "/c": 0.011, "/slow": 0.5, "/slower": 0.9}
+        self.assertEqual(page_outliers(timings), ["/slower", "/slow"])
+
+    def test_too_few_pages(self):
+        self.assertEqual(page_outliers({"/only": 1.0}), [])
+
+
+class TestProfiler(unittest.TestCase):
+    def test_writes_reports(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with Profiler(tmp, interval=0.001) as profiler:
+                with profiler.stage("busy"):
+                    kept = busy_loop(0.1)
+                profiler.page_timings.update({"/a": 0.01, "/b": 0.01, "/c": 0.2})
+            self.assertTrue(kept)
+
+            stats = pstats.Stats(profiler.reports["pstats"])
+            self.assertTrue(any(func[2] == "busy_loop" for func in stats.stats))
+            with open(profiler.reports["stacks"]) as f:
+                stacks = f.read()
+            self.assertIn("busy_loop (test_profiling.py:", stacks)
+            self.assertRegex(stacks.splitlines()[0], r" \d+$")
+            with open(profiler.reports["allocations"]) as f:
+                allocations = f.read()
+            self.assertTrue(allocations.startswith("== busy ("))
+            self.assertIn("test_profiling.py", allocations)
+            with open(profiler.reports["pages"]) as f:
+                self.assertEqual(f.readline().split()[-3:], ["/c", "<-", "outlier"])
+
+
+class TestProfileBuild(unittest.TestCase):
+    def test_build_with_profile(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            shutil.copytree(os.path.join(PROJECT_ROOT, "static"), os.path.join(tmp, "static"))
+            shutil.copy(os.path.join(PROJECT_ROOT, "template.html"), tmp)
+            os.makedirs(os.path.join(tmp, "content"))
+            with open(os.path.join(tmp, "content", "index.md"), "w") as f:
+                f.write("# Home\n\nHello")
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = build(parse_args(["--profile", "--minify", "--related", "0"]), tmp)
+            self.assertEqual(
+                set(result["profile"]), {"pstats", "stacks", "allocations", "pages"}
+            )
+            self.assertEqual(
+                os.path.dirname(result["profile"]["pstats"]),
+                os.path.join(tmp, STATE_DIR, PROFILE_DIR),
+            )
+            with open(result["profile"]["allocations"]) as f:
+                stages = [line.split()[1] for line in f if line.startswith("==")]
+            self.assertEqual(stages, ["static", "metadata", "render", "minify", "state"])
+            with open(result["profile"]["pages"]) as f:
+                self.assertIn("/", f.read())
+            self.assertEqual(result["slow_pages"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,165 @@
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+import related
+from related import (
+    HAVE_NUMPY,
+    RELATED_MARKER,
+    Related,
+    TermMatrix,
+    mark_related,
+    output_path,
+    related_html,
+    related_posts,
+)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DOCUMENTS = {
+    "/a.html": {"python": 3, "parser": 2, "markdown": 1},
+    "/b.html": {"python": 2, "parser": 1, "speed": 1},
+    "/c.html": {"markdown": 2, "parser": 1},
+    "/d.html": {"gardening": 4, "tomatoes": 2},
+    "/e.html": {"tomatoes": 1, "gardening": 1, "python": 1},
+}
+
+
+class TestRelatedHtml(unittest.TestCase):
+    def test_output_path(self):
+        self.assertEqual(output_path("public", "/"), os.path.join("public", "index.html"))
+        self.assertEqual(
+            output_path("public", "/blog/"), os.path.join("public", "blog", "index.html")
+        )
+        self.assertEqual(output_path("public", "/a.html"), os.path.join("public", "a.html"))
+
+    def test_related_html(self):
+        html = related_html(Related("x", [("/a.html", 0.5), ("/b.html", 0.2)]), {"/a.html": "A & B"})
+        self.assertEqual(
+            html,
+            '<nav class="related"><h2>Related posts</h2><ul>'
+            '<li><a href="/a.html">A &amp; B</a></li><li><a href="/b.html">/b.html</a></li>'
+            "</ul></nav>",
+        )
+        self.assertEqual(related_html(Related("x", []), {}), "")
+
+    def test_mark_related(self):
+        self.assertEqual(mark_related("<p>{{ Related }}</p>"), f"<p>{RELATED_MARKER}</p>")
+
+
+@unittest.skipUnless(HAVE_NUMPY, "NumPy is not installed")
+class TestRelatedPosts(unittest.TestCase):
+    def neighbors(self, results, url):
+        return [other for other, _ in results[url].neighbors]
+
+    def test_scores_match_dense_product(self):
+        import numpy as np
+
+        matrix = TermMatrix(list(DOCUMENTS.values()) + [{}])
+        dense = np.zeros((matrix.rows, matrix.col_ptr.size - 1))
+        dense[matrix.row_of, matrix.indices] = matrix.data
+        rows = np.arange(matrix.rows)
+        np.testing.assert_allclose(matrix.scores(rows), dense @ dense.T)
+        np.testing.assert_allclose(np.diag(dense @ dense.T)[:-1], 1.0)
+
+    def test_batches_bound_rows_and_postings(self):
+        import numpy as np
+
+        matrix = TermMatrix(list(DOCUMENTS.values()))
+        rows = np.arange(matrix.rows)
+        batches = list(matrix.batches(rows, 2, 1))
+        self.assertEqual([list(batch) for batch in batches], [[0], [1], [2], [3], [4]])
+        batches = list(matrix.batches(rows, 2, 1000))
+        self.assertEqual([list(batch) for batch in batches], [[0, 1], [2, 3], [4]])
+
+    def test_nearest_neighbours(self):
+        results, recomputed = related_posts(DOCUMENTS, k=2)
+        self.assertEqual(recomputed, 5)
+        self.assertEqual(self.neighbors(results, "/a.html"), ["/b.html", "/c.html"])
+        self.assertEqual(self.neighbors(results, "/d.html"), ["/e.html"])
+        self.assertNotIn("/a.html", self.neighbors(results, "/a.html"))
+        scores = [score for _, score in results["/a.html"].neighbors]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+
+    def test_matches_full_computation_across_batches(self):
+        small = (related.BATCH_CELLS, related.BATCH_POSTINGS)
+        related.BATCH_CELLS, related.BATCH_POSTINGS = 10, 5
+        try:
+            batched, _ = related_posts(DOCUMENTS, k=3)
+        finally:
+            related.BATCH_CELLS, related.BATCH_POSTINGS = small
+        self.assertEqual(batched, related_posts(DOCUMENTS, k=3)[0])
+
+    def test_unchanged_documents_reuse_everything(self):
+        results, _ = related_posts(DOCUMENTS, k=2)
+        again, recomputed = related_posts(DOCUMENTS, k=2, previous=results)
+        self.assertEqual(recomputed, 0)
+        self.assertEqual(again, results)
+
+    def test_only_changed_rows_recomputed(self):
+        documents = {f"/p{i}.html": {f"t{i}": 1, f"t{i + 1}": 1, "common": 1} for i in range(20)}
+        results, _ = related_posts(documents, k=2)
+        # Same terms with new counts: document frequencies, and so IDF, stay put.
+        documents["/p5.html"] = {"t5": 3, "t6": 1, "common": 1}
+        incremental, recomputed = related_posts(documents, k=2, previous=results)
+        self.assertLess(recomputed, 5)
+        self.assertEqual(incremental, related_posts(documents, k=2)[0])
+
+    def test_deleted_neighbour_is_replaced(self):
+        documents = {f"/p{i}.html": {f"t{i}": 1, f"t{i + 1}": 1, "common": 1} for i in range(20)}
+        results, _ = related_posts(documents, k=2)
+        del documents["/p6.html"]
+        incremental, _ = related_posts(documents, k=2, previous=results)
+        self.assertEqual(len(incremental["/p5.html"].neighbors), 2)
+        self.assertNotIn("/p6.html", self.neighbors(incremental, "/p5.html"))
+
+    def test_larger_k_recomputes(self):
+        results, _ = related_posts(DOCUMENTS, k=1)
+        again, recomputed = related_posts(DOCUMENTS, k=3, previous=results)
+        self.assertEqual(recomputed, len(DOCUMENTS))
+        self.assertEqual(again, related_posts(DOCUMENTS, k=3)[0])
+
+        fewer, recomputed = related_posts(DOCUMENTS, k=2, previous=again)
+        self.assertEqual(recomputed, 0)
+        self.assertEqual(fewer, related_posts(DOCUMENTS, k=2)[0])
+
+
+@unittest.skipUnless(HAVE_NUMPY, "NumPy is not installed")
+class TestRelatedBuild(unittest.TestCase):
+    def test_pages_list_related_posts(self):
+        from main import build, parse_args
+
+        with tempfile.TemporaryDirectory() as tmp:
+            shutil.copy(os.path.join(PROJECT_ROOT, "template.html"), tmp)
+            os.makedirs(os.path.join(tmp, "content"))
+            for name, text in (
+                ("a", "# Python parsers\n\nWriting a markdown parser in python"),
+                ("b", "# Fast python\n\nMaking the python parser fast"),
+                ("c", "# Tomatoes\n\nGrowing tomatoes in the garden"),
+            ):
+                with open(os.path.join(tmp, "content", f"{name}.md"), "w") as f:
+                    f.write(text)
+
+            with contextlib.redirect_stdout(io.StringIO()):
+                first = build(parse_args(["--related", "1"]), tmp)
+                second = build(parse_args(["--related", "1"]), tmp)
+            self.assertEqual(first["related"], {"pages": 3, "recomputed": 3})
+            self.assertEqual(second["related"], {"pages": 3, "recomputed": 0})
+            with open(os.path.join(tmp, "public", "a.html")) as f:
+                page = f.read()
+            self.assertIn('<nav class="related"><h2>Related posts</h2><ul><li><a href="/b.html">Fast python</a>', page)
+            self.assertNotIn(RELATED_MARKER, page)
+
+            with contextlib.redirect_stdout(io.StringIO()):
+                third = build(parse_args(["--related", "3"]), tmp)
+            self.assertEqual(third["related"], {"pages": 3, "recomputed": 3})
+            with open(os.path.join(tmp, "public", "a.html")) as f:
+                nav = f.read().partition('<nav class="related">')[2]
+            self.assertEqual(nav.count("<li>"), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+import contextlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from main import build, parse_args
+from markdown import markdown_to_html_node
+from search_index import SearchIndex, shard_name, tokenize
+
+
+class TestTokenize(unittest.TestCase):
+    def test_lowercases_and_drops_short_tokens(self):
+        self.assertEqual(tokenize("The Great Gatsby, a novel"), ["the", "great", "gatsby", "novel"])
+
+    def test_shard_name(self):
+        self.assertEqual(shard_name("gatsby"), "ga")
+        self.assertEqual(shard_name("été"), "uc3a974")
+
+
+class TestSearchIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.out_dir = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_indexes_text_node_content(self):
+        index = SearchIndex()
+        node = markdown_to_html_node("# Gatsby\n\nThe **green** light ![dock](/dock.png)")
+        index.add_page("/", node, "Gatsby")
+        index.write(self.out_dir)
+
+        with open(os.path.join(self.out_dir, "gr.json")) as f:
+            self.assertEqual(json.load(f), {"green": [0, 1]})
+        with open(os.path.join(self.out_dir, "do.json")) as f:
+            self.assertEqual(json.load(f), {"dock": [0, 1]})
+        with open(os.path.join(self.out_dir, "pages.json")) as f:
+            pages = json.load(f)
+        self.assertEqual(pages["pages"], [["/", "Gatsby"]])
+        self.assertIn("ga", pages["shards"])
+
+    def test_edit_rewrites_only_affected_shards(self):
+        index = SearchIndex()
+        index.add_page("/a", markdown_to_html_node("alpha beta"), "A")
+        index.add_page("/b", markdown_to_html_node("gamma delta"), "B")
+        index.write(self.out_dir)
+
+        index = SearchIndex.load(self.out_dir)
+        index.add_page("/a", markdown_to_html_node("alpha bravo"), "A")
+        self.assertEqual(sorted(index.write(self.out_dir)), ["br.json", "pages.json"])
+        self.assertFalse(os.path.exists(os.path.join(self.out_dir, "be.json")))
+
+        index.add_page("/a", markdown_to_html_node("alpha bravo bravo"), "A")
+        self.assertEqual(index.write(self.out_dir), ["br.json"])
+
+    def test_remove_page(self):
+        index = SearchIndex()
+        index.add_page("/a", markdown_to_html_node("alpha"), "A")
+        index.add_page("/b", markdown_to_html_node("alpha"), "B")
+        index.write(self.out_dir)
+        index.remove_page("/a")
+        index.write(self.out_dir)
+
+        loaded = SearchIndex.load(self.out_dir)
+        self.assertEqual(loaded.pages, [None, ["/b", "B"]])
+        self.assertEqual(loaded.postings["al"], {"alpha": {1: 1}})
+
+
+class TestIncrementalBuild(unittest.TestCase):
+    def test_one_page_edit_rewrites_only_its_shards(self):
+        project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        with tempfile.TemporaryDirectory() as tmp:
+            shutil.copy(os.path.join(project_root, "template.html"), tmp)
+            content_dir = os.path.join(tmp, "content")
+            os.makedirs(content_dir)
+            for name, text in (("a", "alpha beta"), ("b", "gamma delta"), ("c", "epsilon")):
+                with open(os.path.join(content_dir, f"{name}.md"), "w") as f:
+                    f.write(f"# {name.upper()}\n\n{text}")
+
+            def run() -> dict:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    return build(parse_args(["--related", "0"]), tmp)
+
+            self.assertGreater(run()["search"]["written"], 3)
+            self.assertEqual(run()["search"]["written"], 0)
+            with open(os.path.join(content_dir, "a.md"), "w") as f:
+                f.write("# A\n\nalpha zeta")
+            os.remove(os.path.join(content_dir, "c.md"))
+            # ze.json and pages.json; the emptied be and ep shards are removed.
+            self.assertEqual(run()["search"]["written"], 2)
+            search_dir = os.path.join(tmp, "public", "search")
+            self.assertFalse(os.path.exists(os.path.join(search_dir, "be.json")))
+
+            fresh = SearchIndex()
+            for name, text in (("a", "alpha zeta"), ("b", "gamma delta")):
+                fresh.add_page(f"/{name}.html", markdown_to_html_node(f"# {name.upper()}\n\n{text}"))
+            index = SearchIndex.load(os.path.join(tmp, "public", "search"))
+            self.assertEqual(
+                {url: terms for url, (_, terms) in index.documents().items()},
+                {url: terms for url, (_, terms) in fresh.documents().items()},
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
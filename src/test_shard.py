@@ -0,0 +1,91 @@
+import json
+import os
+import tempfile
+import unittest
+
+from markdown import markdown_to_html_node
+from search_index import SearchIndex
+from shard import (
+    MANIFEST_FILE,
+    in_shard,
+    merge_shards,
+    parse_shard,
+    write_shard_manifest,
+)
+
+
+class TestParseShard(unittest.TestCase):
+    def test_parse(self):
+        self.assertEqual(parse_shard("2/4"), (2, 4))
+
+    def test_invalid(self):
+        for spec in ("0/4", "5/4", "2", "a/b"):
+            with self.assertRaises(ValueError):
+                parse_shard(spec)
+
+
+class TestInShard(unittest.TestCase):
+    def test_every_path_in_exactly_one_shard(self):
+        paths = [f"blog/post-{i}.md" for i in range(200)]
+        owners = [[i for i in range(1, 5) if in_shard(path, (i, 4))] for path in paths]
+        self.assertTrue(all(len(owner) == 1 for owner in owners))
+        self.assertEqual({owner[0] for owner in owners}, {1, 2, 3, 4})
+
+    def test_separator_independent(self):
+        self.assertEqual(
+            in_shard(os.path.join("a", "b.md"), (1, 3)), in_shard("a/b.md", (1, 3))
+        )
+
+
+class TestMergeShards(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def make_part(self, shard, files, pages=()):
+        part_dir = os.path.join(self.tmp.name, f"part-{shard[0]}")
+        os.makedirs(part_dir)
+        for rel_path, content in files.items():
+            path = os.path.join(part_dir, rel_path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                f.write(content)
+        index = SearchIndex()
+        for url, markdown in pages:
+            index.add_page(url, markdown_to_html_node(markdown), url)
+        if pages:
+            index.write(os.path.join(part_dir, "search"))
+        write_shard_manifest(part_dir, shard)
+        return part_dir
+
+    def test_merges_parts(self):
+        part1 = self.make_part((1, 2), {"index.html": "home", "images/a.png": "a"}, [("/", "gatsby")])
+        part2 = self.make_part((2, 2), {"blog/index.html": "blog"}, [("/blog/", "daisy gatsby")])
+        dest = os.path.join(self.tmp.name, "public")
+
+        merged = merge_shards([part1, part2], dest)
+
+        self.assertIn("blog/index.html", merged)
+        self.assertIn("images/a.png", merged)
+        self.assertFalse(os.path.exists(os.path.join(dest, MANIFEST_FILE)))
+        with open(os.path.join(dest, "search", "pages.json")) as f:
+            self.assertEqual(json.load(f)["pages"], [["/", "/"], ["/blog/", "/blog/"]])
+        with open(os.path.join(dest, "search", "ga.json")) as f:
+            self.assertEqual(json.load(f), {"gatsby": [0, 1, 1, 1]})
+
+    def test_missing_shard(self):
+        part1 = self.make_part((1, 2), {"index.html": "home"})
+        with self.assertRaises(ValueError):
+            merge_shards([part1], os.path.join(self.tmp.name, "public"))
+
+    def test_conflicting_contents(self):
+        part1 = self.make_part((1, 2), {"index.html": "home"})
+        part2 = self.make_part((2, 2), {"index.html": "other"})
+        with self.assertRaises(ValueError):
+            merge_shards([part1, part2], os.path.join(self.tmp.name, "public"))
+
+
+if __name__ == "__main__":
+    unittest.main()
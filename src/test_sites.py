@@ -0,0 +1,147 @@
+import contextlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import memory
+from deploy import site_archive_path
+from main import SHARED_STATIC, SITES_DIR, STATE_DIR, STATE_DB, build, parse_args
+from sites import link_tree, load_sites
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestSites(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        shutil.copy(os.path.join(PROJECT_ROOT, "template.html"), self.root)
+        self.write("static/index.css", "h1 { color: red; }\n")
+        self.write("static/de/logo.txt", "de logo")
+        self.write("shared/fonts/site.css", "body  {  margin: 0;  }\n")
+        self.write("shared/logo.txt", "shared logo")
+        for locale in ("en", "de"):
+            self.write(f"content/{locale}/index.md", f"# Home {locale}\n\n- [Blog](/blog/)\n- Shared _item_")
+        self.sites_path = self.write(
+            "sites.json",
+            json.dumps(
+                {
+                    "shared_static": "shared",
+                    "sites": [
+                        {"name": "en", "content": "content/en", "output": "public/en"},
+                        {
+                            "name": "de",
+                            "content": "content/de",
+                            "static": "static/de",
+                            "output": "public/de",
+                        },
+                    ],
+                }
+            ),
+        )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, rel_path: str, text: str) -> str:
+        path = os.path.join(self.root, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        return path
+
+    def read(self, rel_path: str) -> str:
+        with open(os.path.join(self.root, rel_path), encoding="utf-8") as f:
+            return f.read()
+
+    def build(self, *argv: str) -> dict:
+        with contextlib.redirect_stdout(io.StringIO()):
+            return build(parse_args(["--sites", self.sites_path, *argv]), self.root)
+
+    def test_builds_every_site(self):
+        result = self.build()
+        self.assertEqual(set(result["sites"]), {"en", "de"})
+        self.assertIn("Home en", self.read("public/en/index.html"))
+        self.assertIn("Home de", self.read("public/de/index.html"))
+        self.assertTrue(os.path.exists(os.path.join(self.root, "public/en/index.css")))
+        for name in ("en", "de"):
+            state = os.path.join(self.root, STATE_DIR, SITES_DIR, name, STATE_DB)
+            self.assertTrue(os.path.exists(state))
+
+    def test_shared_static_is_hardlinked(self):
+        result = self.build()
+        staged = os.path.join(self.root, STATE_DIR, SHARED_STATIC, "fonts", "site.css")
+        for name in ("en", "de"):
+            path = os.path.join(self.root, "public", name, "fonts", "site.css")
+            self.assertTrue(os.path.samefile(path, staged))
+        self.assertFalse(
+            os.path.samefile(staged, os.path.join(self.root, "shared", "fonts", "site.css"))
+        )
+        self.assertEqual(result["sites"]["de"]["shared_static"], {"linked": 1, "copied": 0})
+
+    def test_site_static_overrides_shared(self):
+        self.build()
+        self.assertEqual(self.read("public/de/logo.txt"), "de logo")
+        self.assertEqual(self.read("public/en/logo.txt"), "shared logo")
+
+    def test_caches_shared_between_sites(self):
+        def inline_hits(sites_path: str) -> int:
+            for cache, _ in memory.CACHE_SHARES.values():
+                cache.clear()
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = build(parse_args(["--sites", sites_path, "--related", "0"]), self.root)
+            return result["caches"]["inline"]["hits"]
+
+        with open(self.sites_path) as f:
+            config = json.load(f)
+        config["sites"] = config["sites"][:1]
+        one_site = self.write("one-site.json", json.dumps(config))
+        # Alone, each site would get what one site gets; the second does better.
+        self.assertGreater(inline_hits(self.sites_path), 2 * inline_hits(one_site))
+
+    def test_output_defaults_to_public_name(self):
+        path = self.write("default.json", json.dumps({"sites": [{"name": "fr", "content": "c"}]}))
+        sites, _ = load_sites(path, self.root)
+        self.assertEqual(sites[0].public_dir, os.path.join(self.root, "public", "fr"))
+
+    def test_minify_does_not_write_through_links(self):
+        self.build("--minify")
+        staged = os.path.join(self.root, STATE_DIR, SHARED_STATIC, "fonts", "site.css")
+        with open(staged, encoding="utf-8") as f:
+            self.assertEqual(f.read(), "body  {  margin: 0;  }\n")
+        self.assertEqual(self.read("public/en/fonts/site.css"), "body{margin:0}")
+
+    def test_invalid_site_names(self):
+        for name in ("", "..", "a/b"):
+            path = self.write("bad.json", json.dumps({"sites": [{"name": name, "content": "c", "output": "o"}]}))
+            with self.assertRaises(ValueError):
+                load_sites(path, self.root)
+
+
+class TestLinkTree(unittest.TestCase):
+    def test_skips_existing_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            src, dest = os.path.join(tmp, "src"), os.path.join(tmp, "dest")
+            os.makedirs(os.path.join(src, "a"))
+            os.makedirs(dest)
+            for path in ("a/x.txt", "y.txt"):
+                with open(os.path.join(src, path), "w") as f:
+                    f.write(path)
+            with open(os.path.join(dest, "y.txt"), "w") as f:
+                f.write("mine")
+            self.assertEqual(link_tree(src, dest), (1, 0))
+            with open(os.path.join(dest, "y.txt")) as f:
+                self.assertEqual(f.read(), "mine")
+
+
+class TestSiteArchivePath(unittest.TestCase):
+    def test_site_archive_path(self):
+        self.assertEqual(site_archive_path("out/changes.tar.gz", "de"), "out/changes-de.tar.gz")
+        self.assertEqual(site_archive_path("changes.zip", "en"), "changes-en.zip")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import markdown
+from cache import LRUCache
+from markdown import markdown_to_html_node
+from toc import TableOfContents
+
+THREADS = 8
+
+
+def corpus(page: int) -> str:
+    return "\n\n".join(
+        [
+            f"# Page {page}",
+            "Intro with **bold**, _italic_ and a [link](/blog/post.md).",
+            "## Setup",
+            f"```python\ndef page_{page}():\n    return {page}  # answer\n```",
+            "- one\n- two with `code`\n- three",
+            "## Setup",
+            "> quoted\n> text",
+            "```json\n{\"page\": %d, \"ok\": true}\n```" % page,
+            "1. first\n2. second",
+            "![alt](/images/tolkien.png)",
+        ]
+    )
+
+
+def render(md: str, **kwargs) -> tuple[str, list]:
+    toc = TableOfContents()
+    html = markdown_to_html_node(md, toc=toc, **kwargs).to_html()
+    return html, toc.entries
+
+
+class TestConcurrentRendering(unittest.TestCase):
+    def test_threads_match_serial_output(self):
+        pages = [corpus(page % 5) for page in range(200)]
+        expected = [render(md) for md in pages]
+        with ThreadPoolExecutor(THREADS) as pool:
+            results = list(pool.map(render, pages))
+        self.assertEqual(results, expected)
+
+    def test_thread_pool_blocks_match_serial_output(self):
+        thresholds = (markdown.PARALLEL_MIN_BLOCKS, markdown.PARALLEL_CHUNK_BLOCKS)
+        markdown.PARALLEL_MIN_BLOCKS, markdown.PARALLEL_CHUNK_BLOCKS = 10, 3
+        try:
+            md = "\n\n".join(corpus(page) for page in range(3))
+            expected = render(md)
+            with ThreadPoolExecutor(THREADS) as pool:
+                results = list(
+                    pool.map(lambda _: render(md, workers=2, pool="thread"), range(16))
+                )
+        finally:
+            markdown.PARALLEL_MIN_BLOCKS, markdown.PARALLEL_CHUNK_BLOCKS = thresholds
+        self.assertEqual(results, [expected] * 16)
+
+
+class TestConcurrentCache(unittest.TestCase):
+    def test_bounds_hold_under_contention(self):
+        cache = LRUCache(maxsize=50, maxbytes=400, sizeof=lambda key, value: len(value))
+        start = threading.Barrier(THREADS)
+
+        def worker(n: int) -> None:
+            start.wait()
+            for i in range(2000):
+                key = (n * i) % 120
+                value = cache.get(key)
+                if value is not None:
+                    self.assertEqual(value, str(key))
+                else:
+                    cache.put(key, str(key))
+
+        with ThreadPoolExecutor(THREADS) as pool:
+            list(pool.map(worker, range(1, THREADS + 1)))
+        info = cache.info()
+        self.assertLessEqual(info.currsize, 50)
+        self.assertLessEqual(info.currbytes, 400)
+        self.assertEqual(info.hits + info.misses, THREADS * 2000)
+        self.assertEqual(info.currbytes, sum(len(str(key)) for key in range(120) if key in cache))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+
+from toc import TableOfContents, slugify
+
+
+class TestSlugify(unittest.TestCase):
+    def test_slugify(self):
+        self.assertEqual(slugify("Hello, World!"), "hello-world")
+        self.assertEqual(slugify("  snake_case and  spaces "), "snake-case-and-spaces")
+        self.assertEqual(slugify("Überblick"), "überblick")
+        self.assertEqual(slugify("???"), "section")
+
+
+class TestTableOfContents(unittest.TestCase):
+    def test_deduplicates_slugs(self):
+        toc = TableOfContents()
+        slugs = [toc.add(2, text) for text in ("FAQ", "FAQ", "FAQ 1", "FAQ")]
+        self.assertEqual(slugs, ["faq", "faq-1", "faq-1-1", "faq-2"])
+
+    def test_nested_html(self):
+        toc = TableOfContents()
+        for level, text in ((1, "A"), (2, "B"), (3, "C"), (2, "D"), (1, "E")):
+            toc.add(level, text)
+        self.assertEqual(
+            toc.to_html(),
+            '<nav class="toc"><ul><li><a href="#a">A</a><ul>'
+            '<li><a href="#b">B</a><ul><li><a href="#c">C</a></li></ul></li>'
+            '<li><a href="#d">D</a></li></ul></li>'
+            '<li><a href="#e">E</a></li></ul></nav>',
+        )
+
+    def test_skipped_level_continues_list(self):
+        toc = TableOfContents()
+        for level, text in ((1, "A"), (3, "B"), (2, "C")):
+            toc.add(level, text)
+        self.assertEqual(
+            toc.to_html(),
+            '<nav class="toc"><ul><li><a href="#a">A</a><ul>'
+            '<li><a href="#b">B</a></li><li><a href="#c">C</a></li></ul></li></ul></nav>',
+        )
+
+    def test_empty(self):
+        self.assertEqual(TableOfContents().to_html(), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
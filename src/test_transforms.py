@@ -0,0 +1,174 @@
+import contextlib
+import io
+import os
+import re
+import shutil
+import tempfile
+import unittest
+
+from leafnode import LeafNode
+from main import build, parse_args
+from markdown import markdown_to_html_node
+from parentnode import ParentNode
+from transforms import (
+    ExternalLinks,
+    LinkGraph,
+    LinkRewriter,
+    PageStats,
+    Pipeline,
+    Plugin,
+    internal_target,
+    is_external,
+)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class Recorder(Plugin):
+    def __init__(self, tags=None):
+        self.tags = tags
+        self.events = []
+
+    def begin_page(self, url):
+        self.events.append(("begin", url))
+
+    def visit(self, node):
+        self.events.append(node.tag)
+
+    def end_page(self, url):
+        self.events.append(("end", url))
+
+
+class TestPipeline(unittest.TestCase):
+    def test_visits_in_document_order(self):
+        node = markdown_to_html_node("# A\n\nText [link](/x) ![img](/y.png)")
+        recorder = Recorder()
+        Pipeline([recorder]).run(node, "/page.html")
+        self.assertEqual(
+            recorder.events,
+            [("begin", "/page.html"), "div", "h1", None, "p", None, "a", None, None, "img",
+             ("end", "/page.html")],
+        )
+
+    def test_tag_dispatch_and_registration_order(self):
+        links, everything = Recorder(frozenset({"a"})), Recorder()
+        order = []
+        links.visit = lambda node: order.append("links")
+        everything.visit = lambda node: order.append(f"all:{node.tag}")
+        tree = ParentNode("p", [ParentNode("a", [LeafNode(None, "x")], {"href": "/"})])
+        Pipeline([everything, links]).run(tree)
+        self.assertEqual(order, ["all:p", "all:a", "links", "all:None"])
+
+    def test_timings_per_plugin(self):
+        pipeline = Pipeline([ExternalLinks(), PageStats()])
+        pipeline.run(markdown_to_html_node("[a](https://example.com)"))
+        self.assertEqual(set(pipeline.timings), {"ExternalLinks", "PageStats"})
+        self.assertTrue(all(seconds > 0 for seconds in pipeline.timings.values()))
+
+
+class TestPlugins(unittest.TestCase):
+    def test_external_links(self):
+        node = markdown_to_html_node("[a](https://example.com) [b](/local) [c](//cdn.example)")
+        node.children[0].children[4].props["rel"] = "nofollow"
+        Pipeline([ExternalLinks()]).run(node)
+        self.assertEqual(
+            node.to_html(),
+            '<div><p><a href="https://example.com" rel="noopener">a</a> '
+            '<a href="/local">b</a> <a href="//cdn.example" rel="nofollow noopener">c</a>'
+            "</p></div>",
+        )
+
+    def test_external_links_match_is_external(self):
+        node = markdown_to_html_node("[m](mailto:me@example.com) [t](tel:+15550100) [x](#top)")
+        Pipeline([ExternalLinks()]).run(node)
+        links = node.children[0].children[::2]
+        self.assertEqual(
+            [link.props.get("rel") for link in links], ["noopener", "noopener", None]
+        )
+        self.assertEqual([is_external(link.props["href"]) for link in links], [True, True, False])
+
+    def test_link_rewriter(self):
+        node = markdown_to_html_node("[a](/a) [b](/b)")
+        rewriter = LinkRewriter(lambda href, url: url + href if href == "/a" else href)
+        Pipeline([rewriter]).run(node, "/base")
+        self.assertEqual(
+            node.to_html(), '<div><p><a href="/base/a">a</a> <a href="/b">b</a></p></div>'
+        )
+
+    def test_page_stats(self):
+        stats = PageStats()
+        pipeline = Pipeline([stats])
+        markdown = "Three **bold** words\n\n[x](https://e.com) ![i](/i.png)"
+        pipeline.run(markdown_to_html_node(markdown), "/a")
+        pipeline.run(markdown_to_html_node("```\nnot counted\n```"), "/b")
+        self.assertEqual(
+            stats.pages["/a"], {"words": 4, "links": 1, "external_links": 1, "images": 1}
+        )
+        self.assertEqual(stats.totals()["pages"], 2)
+        self.assertEqual(stats.totals()["words"], 4)
+
+
+class TestLinkGraph(unittest.TestCase):
+    def test_internal_target(self):
+        self.assertEqual(internal_target("other.html#x", "/blog/post.html"), "/blog/other.html")
+        self.assertEqual(internal_target("../index.html", "/blog/post.html"), "/")
+        self.assertEqual(internal_target("/about.html?a=1", "/"), "/about.html")
+        for href in ("https://example.com/", "//cdn.example/x", "mailto:a@b.c", "#top"):
+            self.assertIsNone(internal_target(href, "/"))
+
+    def test_ranks_next_pages(self):
+        graph = LinkGraph(prefetch_limit=2, preload={"/index.css": "style"})
+        markdown = "[a](/a.html) [b](/b.html) [c](c.html) [c](/c.html) [self](#top) [me](/)"
+        Pipeline([graph]).run(markdown_to_html_node(markdown), "/")
+        Pipeline([graph]).run(markdown_to_html_node("[home](/)"), "/a.html")
+
+        self.assertEqual(graph.links["/"], ["/c.html", "/a.html", "/b.html"])
+        self.assertEqual(graph.inbound(), {"/c.html": 1, "/a.html": 1, "/b.html": 1, "/": 1})
+        self.assertEqual(
+            graph.head_hints("/"),
+            '<link rel="preload" href="/index.css" as="style" />\n    '
+            '<link rel="prefetch" href="/c.html" />\n    '
+            '<link rel="prefetch" href="/a.html" />',
+        )
+
+    def test_assets_are_not_prefetched(self):
+        graph = LinkGraph()
+        markdown = "[css](/index.css) [img](img/a.png) [zip](/a.zip) [dir](/blog/) [x](/about)"
+        Pipeline([graph]).run(markdown_to_html_node(markdown), "/")
+        self.assertEqual(graph.links["/"], ["/blog/", "/about"])
+
+    def test_previous_graph_breaks_ties(self):
+        previous = {"/x.html": ["/b.html"], "/y.html": ["/b.html", "/a.html"]}
+        graph = LinkGraph(previous=previous)
+        markdown = "[a](/a.html) [b](/b.html) [c](/c.html) [c](/c.html)"
+        Pipeline([graph]).run(markdown_to_html_node(markdown), "/")
+        self.assertEqual(graph.links["/"], ["/c.html", "/b.html", "/a.html"])
+
+    def test_build_reads_stored_graph(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            shutil.copy(os.path.join(PROJECT_ROOT, "template.html"), tmp)
+            os.makedirs(os.path.join(tmp, "content"))
+            pages = {
+                "index.md": "# Home\n\n[a](/a.md) [b](/b.md)",
+                "a.md": "# A\n\n[b](/b.md)",
+                "b.md": "# B",
+                "c.md": "# C\n\n[b](/b.md)",
+            }
+            for name, text in pages.items():
+                with open(os.path.join(tmp, "content", name), "w") as f:
+                    f.write(text)
+
+            def home_hints() -> list[str]:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    build(parse_args(["--related", "0"]), tmp)
+                with open(os.path.join(tmp, "public", "index.html")) as f:
+                    return re.findall(r'rel="prefetch" href="([^"]+)"', f.read())
+
+            # The first build has no graph to go on; later ones rank /b.html
+            # first, as the page most linked to across the site.
+            self.assertEqual(home_hints(), ["/a.html", "/b.html"])
+            self.assertEqual(home_hints(), ["/b.html", "/a.html"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -26,3 +26,19 @@ class TextNode:
 
     def __repr__(self) -> str:
         return f"TextNode({self.text}, {self.text_type}, {self.url})"
+
+
+class FrozenTextNode(TextNode):
+    """A TextNode that cannot be changed, safe to share between callers."""
+
+    def __init__(self, text: str, text_type: TextType, url: str = ""):
+        fields = self.__dict__
+        fields["text"] = text
+        fields["text_type"] = text_type
+        fields["url"] = url
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
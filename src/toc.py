@@ -0,0 +1,86 @@
+import re
+from typing import NamedTuple
+
+from htmlnode import HtmlNode
+from leafnode import LeafNode
+from parentnode import ParentNode
+
+HEADING_TAGS = {f"h{level}" for level in range(1, 7)}
+SLUG_STRIP_PATTERN = re.compile(r"[^\w\s-]")
+SLUG_SPACE_PATTERN = re.compile(r"[\s_-]+")
+
+
+class TocEntry(NamedTuple):
+    level: int
+    text: str
+    slug: str
+
+
+def slugify(text: str) -> str:
+    """Lowercase text, drop punctuation and join words with "-"."""
+    slug = SLUG_STRIP_PATTERN.sub("", text.lower())
+    return SLUG_SPACE_PATTERN.sub("-", slug).strip("-") or "section"
+
+
+def plain_text(nodes: list[HtmlNode]) -> str:
+    """Concatenated leaf text of a heading's rendered children."""
+    parts = []
+    stack = list(reversed(nodes))
+    while stack:
+        node = stack.pop()
+        if node.children:
+            stack.extend(reversed(node.children))
+        elif node.value:
+            parts.append(node.value)
+    return "".join(parts).strip()
+
+
+class TableOfContents:
+    """Headings of one page in document order, filled in while it renders.
+
+    add() hands out slugs that are unique within the page: a repeated
+    heading gets "-1", "-2", ... appended, so anchors stay stable as long as
+    the headings before them do.
+    """
+
+    def __init__(self):
+        self.entries: list[TocEntry] = []
+        self._used: set[str] = set()
+
+    def add(self, level: int, text: str) -> str:
+        base = slug = slugify(text)
+        suffix = 0
+        while slug in self._used:
+            suffix += 1
+            slug = f"{base}-{suffix}"
+        self._used.add(slug)
+        self.entries.append(TocEntry(level, text, slug))
+        return slug
+
+    def to_html_node(self) -> HtmlNode | None:
+        """Nested lists of links to every heading, or None for a page without any."""
+        if not self.entries:
+            return None
+        root = ParentNode("ul", [])
+        # (level, list) pairs for the lists currently open, innermost last.
+        stack = [(self.entries[0].level, root)]
+        for entry in self.entries:
+            while len(stack) > 1 and entry.level < stack[-1][0]:
+                _, popped = stack.pop()
+                if entry.level > stack[-1][0]:
+                    # h1, h3, h2: the h2 continues the list the h3 opened.
+                    stack.append((entry.level, popped))
+                    break
+            level, current = stack[-1]
+            if entry.level > level and current.children:
+                nested = ParentNode("ul", [])
+                current.children[-1].children.append(nested)
+                stack.append((entry.level, nested))
+                current = nested
+            link = ParentNode("a", [LeafNode(None, entry.text)], {"href": f"#{entry.slug}"})
+            current.children.append(ParentNode("li", [link]))
+        return ParentNode("nav", [root], {"class": "toc"})
+
+    def to_html(self) -> str:
+        node = self.to_html_node()
+        return node.to_html() if node is not None else ""
@@ -0,0 +1,260 @@
+"""Post-processing of rendered trees by plugins fused into one traversal.
+
+A plugin subclasses Plugin and overrides any of its hooks. Pipeline.run walks
+a page's tree once, in document order, and calls every interested plugin on
+each node, so adding a plugin adds a call per node rather than another walk.
+Plugins may change a node's props and children in place (children are read
+after the node is visited) but must not replace the node itself.
+"""
+import html
+import time
+from urllib.parse import urljoin, urlsplit
+
+from htmlnode import HtmlNode
+
+
+class Plugin:
+    # Tags whose nodes visit() is called for; None means every node.
+    tags: frozenset[str] | None = None
+
+    @property
+    def name(self) -> str:
+        return type(self).__name__
+
+    def begin_page(self, url: str) -> None:
+        pass
+
+    def visit(self, node: HtmlNode) -> None:
+        pass
+
+    def end_page(self, url: str) -> None:
+        pass
+
+
+class Pipeline:
+    def __init__(self, plugins: list[Plugin] = ()):
+        self.plugins: list[Plugin] = []
+        self.timings: dict[str, float] = {}
+        self._by_tag: dict[str, list[Plugin]] = {}
+        self._any_tag: list[Plugin] = []
+        for plugin in plugins:
+            self.add(plugin)
+
+    def add(self, plugin: Plugin) -> None:
+        self.plugins.append(plugin)
+        self.timings.setdefault(plugin.name, 0.0)
+        if plugin.tags is None:
+            self._any_tag.append(plugin)
+            for plugins in self._by_tag.values():
+                plugins.append(plugin)
+        else:
+            for tag in plugin.tags:
+                if tag not in self._by_tag:
+                    self._by_tag[tag] = list(self._any_tag)
+                self._by_tag[tag].append(plugin)
+
+    def run(self, node: HtmlNode, url: str = "") -> None:
+        """Apply every plugin to the tree rooted at node in a single pass."""
+        if not self.plugins:
+            return
+        self.begin(url)
+        self.walk(node)
+        self.end(url)
+
+    def begin(self, url: str) -> None:
+        """Start a page that is walked in parts (see walk), e.g. block by block."""
+        timings = self.timings
+        clock = time.perf_counter
+        for plugin in self.plugins:
+            start = clock()
+            plugin.begin_page(url)
+            timings[plugin.name] += clock() - start
+
+    def walk(self, node: HtmlNode) -> None:
+        """Visit the tree rooted at node, as part of the page begun last."""
+        if not self.plugins:
+            return
+        timings = self.timings
+        clock = time.perf_counter
+        by_tag, any_tag = self._by_tag, self._any_tag
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            for plugin in by_tag.get(current.tag, any_tag):
+                start = clock()
+                plugin.visit(current)
+                timings[plugin.name] += clock() - start
+            if current.children:
+                stack.extend(reversed(current.children))
+
+    def end(self, url: str) -> None:
+        timings = self.timings
+        clock = time.perf_counter
+        for plugin in self.plugins:
+            start = clock()
+            plugin.end_page(url)
+            timings[plugin.name] += clock() - start
+
+    def format_timings(self) -> str:
+        return "\n".join(
+            f"{name}: {seconds * 1000:.1f} ms"
+            for name, seconds in sorted(self.timings.items(), key=lambda item: -item[1])
+        )
+
+
+def is_external(href: str) -> bool:
+    """Whether href leaves the site (has a scheme or starts with //)."""
+    parts = urlsplit(href)
+    return bool(parts.netloc) or parts.scheme not in ("", "http", "https")
+
+
+class ExternalLinks(Plugin):
+    """Add rel="noopener" (keeping any existing rel values) to off-site links."""
+
+    tags = frozenset({"a"})
+
+    def visit(self, node: HtmlNode) -> None:
+        href = (node.props or {}).get("href", "")
+        if not href or not is_external(href):
+            return
+        rel = node.props.get("rel", "").split()
+        if "noopener" not in rel:
+            node.props = {**node.props, "rel": " ".join(rel + ["noopener"])}
+
+
+class LinkRewriter(Plugin):
+    """Pass every link's href through rewrite(href, page_url); a new value replaces it."""
+
+    tags = frozenset({"a"})
+
+    def __init__(self, rewrite):
+        self.rewrite = rewrite
+        self.url = ""
+
+    def begin_page(self, url: str) -> None:
+        self.url = url
+
+    def visit(self, node: HtmlNode) -> None:
+        href = (node.props or {}).get("href")
+        if href is None:
+            return
+        rewritten = self.rewrite(href, self.url)
+        if rewritten != href:
+            node.props = {**node.props, "href": rewritten}
+
+
+class PageStats(Plugin):
+    """Count words, links and images per page."""
+
+    def __init__(self):
+        self.pages: dict[str, dict[str, int]] = {}
+        self._current: dict[str, int] = {}
+
+    def begin_page(self, url: str) -> None:
+        self._current = {"words": 0, "links": 0, "external_links": 0, "images": 0}
+
+    def visit(self, node: HtmlNode) -> None:
+        stats = self._current
+        if node.tag == "a":
+            stats["links"] += 1
+            if is_external((node.props or {}).get("href", "")):
+                stats["external_links"] += 1
+        elif node.tag == "img":
+            stats["images"] += 1
+        elif node.value and node.tag != "code":
+            stats["words"] += len(node.value.split())
+
+    def end_page(self, url: str) -> None:
+        self.pages[url] = self._current
+
+    def totals(self) -> dict[str, int]:
+        totals = {"pages": len(self.pages)}
+        for stats in self.pages.values():
+            for key, count in stats.items():
+                totals[key] = totals.get(key, 0) + count
+        return totals
+
+
+def internal_target(href: str, page_url: str) -> str | None:
+    """The site path a link on page_url points to, or None if it leaves the site."""
+    parts = urlsplit(href)
+    if parts.scheme or parts.netloc or not parts.path:
+        return None
+    path = urljoin(page_url, parts.path)
+    if path.endswith("/index.html"):
+        path = path[: -len("index.html")]
+    return path
+
+
+def is_page_path(path: str) -> bool:
+    """Whether a site path names a page (a directory or an .html file) rather than an asset."""
+    name = path.rpartition("/")[2]
+    return not name or name.endswith(".html") or "." not in name
+
+
+def inbound_links(links: dict[str, list[str]]) -> dict[str, int]:
+    """Number of pages linking to each target of a link graph."""
+    counts = {}
+    for targets in links.values():
+        for target in targets:
+            counts[target] = counts.get(target, 0) + 1
+    return counts
+
+
+class LinkGraph(Plugin):
+    """Record every page's links to other pages and turn them into resource hints.
+
+    Runs inside the fused traversal, after any LinkRewriter, so the graph
+    costs no extra parse. Links to assets (stylesheets, images, downloads)
+    are not part of it. A page's likely next pages are the ones it links to
+    most often; ties go to the pages most linked to across the site in the
+    previous build's graph, then to earlier links.
+    """
+
+    tags = frozenset({"a"})
+
+    def __init__(
+        self,
+        prefetch_limit: int = 3,
+        preload: dict[str, str] = None,
+        previous: dict[str, list[str]] = None,
+    ):
+        self.prefetch_limit = prefetch_limit
+        # href -> "as" destination, e.g. {"/index.css": "style"}
+        self.preload = preload or {}
+        self.links: dict[str, list[str]] = {}
+        self.popularity = inbound_links(previous or {})
+        self._url = ""
+        self._counts: dict[str, int] = {}
+
+    def begin_page(self, url: str) -> None:
+        self._url = url
+        self._counts = {}
+
+    def visit(self, node: HtmlNode) -> None:
+        target = internal_target((node.props or {}).get("href", ""), self._url)
+        if target is not None and target != self._url and is_page_path(target):
+            self._counts[target] = self._counts.get(target, 0) + 1
+
+    def end_page(self, url: str) -> None:
+        # dicts keep first-seen order, and sorted() is stable.
+        self.links[url] = sorted(
+            self._counts,
+            key=lambda target: (-self._counts[target], -self.popularity.get(target, 0)),
+        )
+
+    def inbound(self) -> dict[str, int]:
+        """Number of pages linking to each target."""
+        return inbound_links(self.links)
+
+    def head_hints(self, url: str) -> str:
+        """<link> preload tags for critical assets and prefetch tags for url's next pages."""
+        tags = [
+            f'<link rel="preload" href="{html.escape(href)}" as="{destination}" />'
+            for href, destination in self.preload.items()
+        ]
+        tags.extend(
+            f'<link rel="prefetch" href="{html.escape(target)}" />'
+            for target in self.links.get(url, [])[: self.prefetch_limit]
+        )
+        return "\n    ".join(tags)
@@ -0,0 +1,65 @@
+// Client for the prefix-sharded index written by src/search_index.py.
+// pages.json is fetched on first use; each shard only when a query needs it.
+const fitzSearch = (() => {
+  const base = "/search/";
+  const shards = new Map();
+  let manifest = null;
+
+  const fetchJson = (name) => fetch(base + name).then((r) => r.json());
+
+  const shardName = (token, prefixLength) => {
+    const prefix = [...token].slice(0, prefixLength).join("");
+    if (/^[\x00-\x7f]*$/.test(prefix)) return prefix;
+    const bytes = new TextEncoder().encode(prefix);
+    return "u" + [...bytes].map((b) => b.toString(16).padStart(2, "0")).join("");
+  };
+
+  const loadShard = (name) => {
+    if (!shards.has(name)) shards.set(name, fetchJson(name + ".json"));
+    return shards.get(name);
+  };
+
+  return async function search(query) {
+    manifest = manifest || (await fetchJson("pages.json"));
+    const tokens = query.toLowerCase().match(/[\p{L}\p{N}]{2,}/gu) || [];
+    const scores = new Map();
+    for (const token of tokens) {
+      const name = shardName(token, manifest.prefix_length);
+      if (!manifest.shards.includes(name)) continue;
+      const postings = (await loadShard(name))[token] || [];
+      for (let i = 0; i < postings.length; i += 2) {
+        scores.set(postings[i], (scores.get(postings[i]) || 0) + postings[i + 1]);
+      }
+    }
+    return [...scores.entries()]
+      .sort((a, b) => b[1] - a[1])
+      .map(([id]) => ({ url: manifest.pages[id][0], title: manifest.pages[id][1] }));
+  };
+})();
+
+// Hooks up the search box in template.html, if the page has one. Nothing is
+// fetched until the reader types a query.
+(() => {
+  const form = document.getElementById("search");
+  if (!form) return;
+  const input = form.querySelector("input");
+  const results = form.querySelector("ol");
+  let latest = 0;
+
+  form.addEventListener("submit", (event) => event.preventDefault());
+  input.addEventListener("input", async () => {
+    const query = ++latest;
+    const hits = input.value.trim() ? (await fitzSearch(input.value)).slice(0, 10) : [];
+    if (query !== latest) return;
+    results.replaceChildren(
+      ...hits.map(({ url, title }) => {
+        const link = document.createElement("a");
+        link.href = url;
+        link.textContent = title || url;
+        const item = document.createElement("li");
+        item.append(link);
+        return item;
+      }),
+    );
+  });
+})();